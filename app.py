@@ -1,30 +1,51 @@
 """
-This is a simple Flask application that returns a greeting message
-when the root endpoint is accessed.
+IAM Backend Flask application.
+
+:func:`create_app` builds the application. Blueprints and the Swagger UI
+are set up inside the factory. Every route module in ``BLUEPRINTS`` is
+imported there, since Flask needs all URL rules before the first request;
+what is deferred is the two imports that dominate boot time, the OpenAI
+client stack behind the chat agent and flasgger, which are only imported
+when they are used. ``SWAGGER_ENABLED=false`` skips the
+Swagger UI entirely (recommended in production); when enabled, the spec is
+still only generated on the first request to ``/apispec_1.json``.
+``SWAGGER_SPEC_FILE`` serves a spec rendered at build time with
+``python -m lib.openapi_spec build`` instead, without parsing docstrings.
+
+``app`` is created on first access, so ``gunicorn app:app`` and
+``python app.py`` keep working. ``python -m lib.startup_report`` reports
+where boot time goes.
 """
 
-from flask import Flask, request, jsonify
-from flasgger import Swagger
-from routes.auth_routes import auth_routes
-from routes.task_routes import task_routes
-from routes.profile_routes import profile_routes
-from routes.task_template_routes import task_template_routes
-from routes.mind_task_routes import mind_task_routes
-from routes.body_task_routes import body_task_routes
-from routes.achievement_routes import achievement_routes
-from routes.goal_routes import goal_routes
-from routes.task_log_routes import task_log_routes
-from routes.failure_routes import failure_routes
-from routes.bot_rule_routes import bot_rule_routes
-from routes.chat_ia_routes import chat_ia_routes
-from routes.stats_routes import stats_routes
-from routes.task_recommendation_routes import task_recommendation_routes
+import importlib
+import logging
 import os
+import threading
+import time
+
+from flask import Flask, request, jsonify
+from lib import cache_bus, compression, json_provider, openapi_spec, query_stats
 
-app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
-# JWT Secret Key - In production, use environment variable
-app.config['SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
+# (module, blueprint attribute), registered in this order
+BLUEPRINTS = (
+    ('routes.auth_routes', 'auth_routes'),
+    ('routes.task_routes', 'task_routes'),
+    ('routes.profile_routes', 'profile_routes'),
+    ('routes.task_template_routes', 'task_template_routes'),
+    ('routes.mind_task_routes', 'mind_task_routes'),
+    ('routes.body_task_routes', 'body_task_routes'),
+    ('routes.task_bulk_routes', 'task_bulk_routes'),
+    ('routes.achievement_routes', 'achievement_routes'),
+    ('routes.goal_routes', 'goal_routes'),
+    ('routes.task_log_routes', 'task_log_routes'),
+    ('routes.failure_routes', 'failure_routes'),
+    ('routes.bot_rule_routes', 'bot_rule_routes'),
+    ('routes.chat_ia_routes', 'chat_ia_routes'),
+    ('routes.stats_routes', 'stats_routes'),
+    ('routes.task_recommendation_routes', 'task_recommendation_routes'),
+)
 
 # Swagger configuration and shared schema definitions (Swagger 2.0)
 swagger_template = {
@@ -67,6 +88,25 @@ swagger_template = {
                 "user": {"$ref": "#/definitions/User"}
             }
         },
+        "BulkTaskResult": {
+            "type": "object",
+            "properties": {
+                "created": {"type": "integer", "example": 2},
+                "failed": {"type": "integer", "example": 1},
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "index": {"type": "integer", "example": 0},
+                            "status": {"type": "integer", "example": 201},
+                            "task": {"type": "object"},
+                            "error": {"type": "string", "example": "Template not found: yoga_99"}
+                        }
+                    }
+                }
+            }
+        },
         "Task": {
             "type": "object",
             "properties": {
@@ -95,43 +135,120 @@ swagger_template = {
     }
 }
 
-swagger = Swagger(app, template=swagger_template)
 
-# Handle preflight OPTIONS requests BEFORE blueprints
-@app.before_request
-def handle_preflight():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'ok'})
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def init_swagger(app):
+    """Attach the Swagger UI when ``SWAGGER_ENABLED`` (default true).
+
+    With ``SWAGGER_SPEC_FILE`` the spec is served from that file, with or
+    without the UI.
+    """
+    swagger = None
+    if app.config['SWAGGER_ENABLED']:
+        from flasgger import Swagger
+        swagger = Swagger(app, template=swagger_template)
+    openapi_spec.init_app(app)
+    return swagger
+
+
+def init_cors(app):
+    """Answer preflight requests and add CORS headers to every response."""
+    # Handle preflight OPTIONS requests BEFORE blueprints
+    @app.before_request
+    def handle_preflight():
+        if request.method == 'OPTIONS':
+            response = jsonify({'status': 'ok'})
+            response.headers['Access-Control-Allow-Origin'] = 'http://localhost:5173'
+            response.headers['Access-Control-Allow-Credentials'] = 'true'
+            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, If-None-Match, If-Modified-Since'
+            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+            response.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor, ETag, Last-Modified'
+            return response, 200
+
+    # CORS configuration - Apply to all responses
+    @app.after_request
+    def after_request(response):
         response.headers['Access-Control-Allow-Origin'] = 'http://localhost:5173'
         response.headers['Access-Control-Allow-Credentials'] = 'true'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, If-None-Match, If-Modified-Since'
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        return response, 200
-
-# CORS configuration - Apply to all responses
-@app.after_request
-def after_request(response):
-    response.headers['Access-Control-Allow-Origin'] = 'http://localhost:5173'
-    response.headers['Access-Control-Allow-Credentials'] = 'true'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    return response
-
-# Register the blueprints
-app.register_blueprint(auth_routes)
-app.register_blueprint(task_routes)
-app.register_blueprint(profile_routes)
-app.register_blueprint(task_template_routes)
-app.register_blueprint(mind_task_routes)
-app.register_blueprint(body_task_routes)
-app.register_blueprint(achievement_routes)
-app.register_blueprint(goal_routes)
-app.register_blueprint(task_log_routes)
-app.register_blueprint(failure_routes)
-app.register_blueprint(bot_rule_routes)
-app.register_blueprint(chat_ia_routes)
-app.register_blueprint(stats_routes)
-app.register_blueprint(task_recommendation_routes)
+        response.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor, ETag, Last-Modified'
+        return response
+
+
+def register_blueprints(app):
+    """Import the route modules and register their blueprints.
+
+    The imports are eager; route modules keep their own heavy dependencies
+    (the OpenAI client) behind function-level imports instead.
+    """
+    for module_name, attribute in BLUEPRINTS:
+        app.register_blueprint(getattr(importlib.import_module(module_name), attribute))
+
+
+def create_app(config=None):
+    """Build the Flask application.
+
+    Args:
+        config (dict, optional): Settings applied over the defaults.
+
+    Returns:
+        Flask: The configured application.
+    """
+    started = time.perf_counter()
+    app = Flask(__name__)
+
+    # JWT Secret Key - In production, use environment variable
+    app.config['SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
+    app.config['SWAGGER_ENABLED'] = _env_bool('SWAGGER_ENABLED', True)
+    app.config['SWAGGER_SPEC_FILE'] = os.getenv('SWAGGER_SPEC_FILE')
+    if config:
+        app.config.update(config)
+
+    # Encode/decode JSON with orjson when available (JSON_PROVIDER)
+    json_provider.init_app(app)
+
+    init_swagger(app)
+    init_cors(app)
+
+    # Count database queries per request and per route
+    query_stats.init_app(app)
+
+    # Compress large JSON/text responses (gzip, or brotli when installed)
+    compression.init_app(app)
+
+    # Pick the cache invalidation bus now, so a risky CACHE_BUS=auto is logged at boot
+    cache_bus.get_bus()
+
+    register_blueprints(app)
+
+    app.config['STARTUP_TIME_MS'] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info("Application created in %.1f ms", app.config['STARTUP_TIME_MS'])
+    return app
+
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # ``app`` is built on first access (gunicorn app:app, ``from app import app``).
+    global _app  # noqa: PLW0603
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = create_app()
+    return _app
+
 
 if __name__ == '__main__':
-    app.run()
\ No newline at end of file
+    create_app().run()
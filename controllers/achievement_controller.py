@@ -1,5 +1,6 @@
 """Achievement controller for handling achievement operations."""
 from flask import jsonify, request
+from lib.pagination import page_response, parse_page_args
 from services.achievement_service import (
     get_user_achievements,
     get_achievement_by_id,
@@ -15,8 +16,13 @@ def get_my_achievements():
         tuple: JSON response with achievements and status code.
     """
     user_id = request.user.get('user_id')
-    achievements = get_user_achievements(user_id)
-    return jsonify(achievements), 200
+    try:
+        limit, cursor = parse_page_args(request.args)
+        achievements = get_user_achievements(user_id, fields=request.args.get('fields'),
+                                             limit=limit + 1, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response(achievements, 'awarded_at', limit)
 
 
 def award_achievement(data):
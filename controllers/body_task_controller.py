@@ -1,9 +1,12 @@
 """Body task controller for handling body task operations."""
 from flask import jsonify, request
+from lib.pagination import page_response, parse_page_args
+from services.task_bulk_service import create_tasks_bulk
 from services.body_task_service import (
     get_user_body_tasks,
     get_body_task_by_id,
     create_body_task,
+    create_body_tasks,
     update_body_task,
     complete_body_task,
     delete_body_task
@@ -19,8 +22,13 @@ def get_my_body_tasks():
     user_id = request.user.get('user_id')
     status = request.args.get('status')  # Optional query parameter
     
-    tasks = get_user_body_tasks(user_id, status)
-    return jsonify(tasks), 200
+    try:
+        limit, cursor = parse_page_args(request.args)
+        tasks = get_user_body_tasks(user_id, status, fields=request.args.get('fields'),
+                                    limit=limit + 1, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response(tasks, 'created_at', limit)
 
 
 def get_body_task(task_id):
@@ -71,6 +79,28 @@ def create_new_body_task(data):
     return jsonify(task), 201
 
 
+def create_body_tasks_bulk(data):
+    """Create several body tasks at once.
+    
+    Args:
+        data (list): Task objects (``template_id`` or ``template_key`` each).
+    
+    Returns:
+        tuple: JSON response with per-item results and status code
+            (201 when every task was created, 207 otherwise).
+    """
+    user_id = request.user.get('user_id')
+    
+    try:
+        results = create_tasks_bulk(data, user_id, create_body_tasks)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    created = sum(1 for result in results if result['status'] == 201)
+    body = {'results': results, 'created': created, 'failed': len(results) - created}
+    return jsonify(body), 201 if created == len(results) else 207
+
+
 def update_body_task_data(task_id, data):
     """Update a body task.
     
@@ -5,7 +5,8 @@ from services.bot_rule_service import (
     get_bot_rule_by_id,
     create_bot_rule,
     update_bot_rule,
-    delete_bot_rule
+    delete_bot_rule,
+    evaluate_bot_rules
 )
 
 
@@ -16,7 +17,10 @@ def get_bot_rules():
         tuple: JSON response with rules and status code.
     """
     active_only = request.args.get('active_only', 'false').lower() == 'true'
-    rules = get_all_bot_rules(active_only)
+    try:
+        rules = get_all_bot_rules(active_only, fields=request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(rules), 200
 
 
@@ -50,7 +54,10 @@ def create_rule(data):
     if not all(field in data for field in required_fields):
         return jsonify({'error': 'name, condition, and action are required'}), 400
     
-    rule = create_bot_rule(data)
+    try:
+        rule = create_bot_rule(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     if rule is None:
         return jsonify({'error': 'Failed to create rule'}), 500
@@ -71,7 +78,10 @@ def update_rule(rule_id, data):
     data.pop('id', None)
     data.pop('created_at', None)
     
-    rule = update_bot_rule(rule_id, data)
+    try:
+        rule = update_bot_rule(rule_id, data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     if rule is None:
         return jsonify({'error': 'Rule not found or update failed'}), 404
@@ -94,3 +104,25 @@ def delete_rule(rule_id):
         return jsonify({'error': 'Rule not found'}), 404
     
     return jsonify(rule), 200
+
+
+def evaluate_rules(data):
+    """Find the active rules that match an event.
+    
+    Args:
+        data (dict): Request body with the ``event`` and an optional ``limit``.
+    
+    Returns:
+        tuple: JSON response with the matching rules and status code.
+    """
+    event = data.get('event')
+    if isinstance(event, dict) and 'user_id' not in event:
+        event = dict(event, user_id=request.user.get('user_id'))
+    try:
+        limit = data.get('limit')
+        if limit is not None:
+            limit = int(limit)
+        rules = evaluate_bot_rules(event, limit)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(rules), 200
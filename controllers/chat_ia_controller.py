@@ -1,8 +1,9 @@
 """Chat IA controller for handling chat session and message operations."""
-from flask import jsonify, request
+from flask import Response, current_app, jsonify, request, stream_with_context
 from datetime import datetime
-import asyncio
 import logging
+from lib import event_loop
+from lib.pagination import page_response, parse_page_args
 from services.chat_ia_service import (
     get_user_chat_sessions,
     get_chat_session_by_id,
@@ -13,10 +14,11 @@ from services.chat_ia_service import (
     create_message,
     delete_message
 )
-from services.agent_service import get_agent_service
 
 logger = logging.getLogger(__name__)
 
+FALLBACK_REPLY = 'I apologize, but I encountered an error processing your message. Please try again.'
+
 
 def get_my_chat_sessions():
     """Get authenticated user's chat sessions.
@@ -25,7 +27,10 @@ def get_my_chat_sessions():
         tuple: JSON response with sessions and status code.
     """
     user_id = request.user.get('user_id')
-    sessions = get_user_chat_sessions(user_id)
+    try:
+        sessions = get_user_chat_sessions(user_id, fields=request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(sessions), 200
 
 
@@ -146,8 +151,18 @@ def get_messages(session_id):
     if session.get('user_id') != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    messages = get_session_messages(session_id)
-    return jsonify(messages), 200
+    try:
+        limit, cursor = parse_page_args(request.args)
+        messages = get_session_messages(session_id, fields=request.args.get('fields'),
+                                        limit=limit + 1, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response(messages, 'created_at', limit)
+
+
+def _sse(event, data):
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {current_app.json.dumps(data)}\n\n"
 
 
 def create_new_message(session_id, data):
@@ -188,33 +203,18 @@ def create_new_message(session_id, data):
     assistant_message = None
     if data.get('role') == 'user':
         try:
-            # Get conversation history (last 10 messages for context)
-            all_messages = get_session_messages(session_id)
-            recent_messages = all_messages[-11:-1] if len(all_messages) > 1 else []
-            
-            # Build conversation context for the agent
-            conversation_history = []
-            for msg in recent_messages:
-                conversation_history.append({
-                    'role': msg.get('role', 'user'),
-                    'content': msg.get('content', '')
-                })
-            
-            # Get agent service
+            # Get agent service (imported here: the OpenAI client stack is
+            # only loaded once a chat message needs it). The agent resumes
+            # the session from its stored messages if it is not in memory.
+            from services.agent_service import get_agent_service
             agent_service = get_agent_service()
             
-            # Add conversation history to the agent's conversation
-            if conversation_history and session_id not in agent_service.agent.conversations:
-                conversation = agent_service.agent.get_or_create_conversation(session_id)
-                for msg in conversation_history:
-                    conversation.add_message(msg['role'], msg['content'])
-            
             # Use the user's message directly without extra prompt
             prompt = data.get('content')
             
-            # Generate response using agent (run async in sync context)
+            # Generate response using agent (on the worker's background event loop)
             logger.info(f"Generating AI response for session {session_id}")
-            result = asyncio.run(
+            result = event_loop.run(
                 agent_service.agent.ask(
                     prompt,
                     conversation_id=session_id,
@@ -252,7 +252,7 @@ def create_new_message(session_id, data):
             assistant_data = {
                 'session_id': session_id,
                 'role': 'assistant',
-                'content': 'I apologize, but I encountered an error processing your message. Please try again.'
+                'content': FALLBACK_REPLY
             }
             assistant_message = create_message(assistant_data)
     
@@ -267,6 +267,94 @@ def create_new_message(session_id, data):
         return jsonify(user_message), 201
 
 
+def stream_new_message(session_id, data):
+    """Create a user message and stream the AI response as server-sent events.
+    
+    Events, in order: ``user_message`` (the stored message), then ``token``,
+    ``tool_call_start`` and ``tool_call_finish`` while the agent works, and
+    ``assistant_message`` with the reply, stored once the turn is over
+    (``error`` comes before it if the agent failed).
+    
+    Args:
+        session_id (str): Session ID.
+        data (dict): Message data (``content``; ``role`` must be ``user``).
+    
+    Returns:
+        Response: Event stream, or a JSON error response and status code.
+    """
+    user_id = request.user.get('user_id')
+    
+    # Verify session belongs to user
+    session = get_chat_session_by_id(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    if session.get('user_id') != user_id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    if not data.get('content'):
+        return jsonify({'error': 'content is required'}), 400
+    
+    if data.setdefault('role', 'user') != 'user':
+        return jsonify({'error': 'Only user messages can be streamed'}), 400
+    
+    data['session_id'] = session_id
+    
+    user_message = create_message(data)
+    if user_message is None:
+        return jsonify({'error': 'Failed to create message'}), 500
+    
+    update_chat_session(session_id, {'last_message_at': datetime.utcnow().isoformat()})
+    
+    def events():
+        yield _sse('user_message', user_message)
+        try:
+            from services.agent_service import get_agent_service
+            agent = get_agent_service().agent
+            
+            result = {}
+            stream = agent.ask_stream(
+                data['content'],
+                conversation_id=session_id,
+                user_context={
+                    "user_id": user_id,
+                    "session_id": session_id
+                }
+            )
+            for event in event_loop.iterate(stream):
+                event_type = event.pop('type')
+                if event_type == 'done':
+                    result = event['result']
+                else:
+                    yield _sse(event_type, event)
+            
+            if result.get('success'):
+                ai_response = result.get('response') or 'I apologize, but I had trouble generating a response.'
+            else:
+                logger.error(f"AI response generation failed: {result.get('error')}")
+                ai_response = 'I apologize, but I encountered an error. Please try again.'
+                yield _sse('error', {'error': 'AI response failed'})
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Error streaming AI response: {str(e)}", exc_info=True)
+            ai_response = FALLBACK_REPLY
+            yield _sse('error', {'error': 'AI response failed'})
+        
+        # Store the assistant message once, with the whole reply
+        assistant_message = create_message({
+            'session_id': session_id,
+            'role': 'assistant',
+            'content': ai_response
+        })
+        update_chat_session(session_id, {'last_message_at': datetime.utcnow().isoformat()})
+        yield _sse('assistant_message', assistant_message)
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 def delete_message_by_id(message_id):
     """Delete a chat message.
     
@@ -1,5 +1,6 @@
 """Failure controller for handling failure tracking operations."""
 from flask import jsonify, request
+from lib.pagination import page_response, parse_page_args
 from services.failure_service import (
     get_user_failures,
     get_failure_by_id,
@@ -17,8 +18,13 @@ def get_my_failures():
     user_id = request.user.get('user_id')
     severity = request.args.get('severity')  # Optional filter
     
-    failures = get_user_failures(user_id, severity)
-    return jsonify(failures), 200
+    try:
+        limit, cursor = parse_page_args(request.args)
+        failures = get_user_failures(user_id, severity, fields=request.args.get('fields'),
+                                     limit=limit + 1, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response(failures, 'created_at', limit)
 
 
 def create_failure_record(data):
@@ -1,5 +1,6 @@
 """Goal controller for handling goal operations."""
 from flask import jsonify, request
+from lib.pagination import page_response, parse_page_args
 from services.goal_service import (
     get_user_goals,
     get_goal_by_id,
@@ -22,8 +23,13 @@ def get_my_goals():
     if is_active is not None:
         is_active = is_active.lower() == 'true'
     
-    goals = get_user_goals(user_id, is_active)
-    return jsonify(goals), 200
+    try:
+        limit, cursor = parse_page_args(request.args)
+        goals = get_user_goals(user_id, is_active, fields=request.args.get('fields'),
+                               limit=limit + 1, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response(goals, 'created_at', limit)
 
 
 def get_goal(goal_id):
@@ -15,7 +15,10 @@ def get_user_profile():
         tuple: JSON response with profile data and status code.
     """
     user_id = request.user.get('user_id')
-    profile = get_profile_by_user_id(user_id)
+    try:
+        profile = get_profile_by_user_id(user_id, fields=request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     if profile is None:
         return jsonify({'error': 'Profile not found'}), 404
@@ -28,8 +28,10 @@ def get_all_metrics(domain=None):
         tuple: JSON response with metrics and status code.
     """
     try:
-        metrics = get_metric_catalog(domain)
+        metrics = get_metric_catalog(domain, fields=request.args.get('fields'))
         return jsonify(metrics), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -139,8 +141,10 @@ def get_snapshots_for_user():
         end_date = request.args.get('end_date')
         limit = request.args.get('limit', 100, type=int)
         
-        snapshots = get_user_snapshots(user_id, start_date, end_date, limit)
+        snapshots = get_user_snapshots(user_id, start_date, end_date, limit, fields=request.args.get('fields'))
         return jsonify(snapshots), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -185,6 +189,8 @@ def create_new_snapshot(data):
         
         snapshot = create_snapshot(data)
         return jsonify(snapshot), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -215,6 +221,8 @@ def update_snapshot_by_id(snapshot_id, data):
         
         updated_snapshot = update_snapshot(snapshot_id, data)
         return jsonify(updated_snapshot), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,27 @@
+"""Task bulk controller for operations spanning mind and body tasks."""
+from flask import jsonify, request
+from services.task_bulk_service import complete_tasks_bulk
+
+
+def complete_tasks(data):
+    """Complete several mind and body tasks of the authenticated user.
+    
+    Args:
+        data (dict): ``mind_task_ids`` and/or ``body_task_ids`` arrays.
+    
+    Returns:
+        tuple: JSON response with completed tasks, total XP and skipped
+            IDs, and status code.
+    """
+    user_id = request.user.get('user_id')
+    
+    try:
+        result = complete_tasks_bulk(
+            user_id,
+            data.get('mind_task_ids', []),
+            data.get('body_task_ids', [])
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(result), 200
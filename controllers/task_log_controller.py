@@ -1,8 +1,11 @@
 """Task log controller for handling task log operations."""
 from flask import jsonify, request
+from lib.pagination import page_response, parse_page_args
 from services.task_log_service import (
     get_user_task_logs,
-    create_task_log
+    create_task_log,
+    enqueue_task_log,
+    is_task_log_buffered
 )
 
 
@@ -15,8 +18,13 @@ def get_my_task_logs():
     user_id = request.user.get('user_id')
     task_table = request.args.get('task_table')  # Optional filter
     
-    logs = get_user_task_logs(user_id, task_table)
-    return jsonify(logs), 200
+    try:
+        limit, cursor = parse_page_args(request.args)
+        logs = get_user_task_logs(user_id, task_table, fields=request.args.get('fields'),
+                                  limit=limit + 1, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response(logs, 'timestamp', limit)
 
 
 def create_log(data):
@@ -26,7 +34,8 @@ def create_log(data):
         data (dict): Log data.
     
     Returns:
-        tuple: JSON response with created log and status code.
+        tuple: JSON response with created log and status code (202 when
+            logs are buffered).
     """
     user_id = request.user.get('user_id')
     
@@ -36,6 +45,10 @@ def create_log(data):
     
     data['user_id'] = user_id
     
+    if is_task_log_buffered():
+        # Accepted: written to the spill file, inserted on the next flush
+        return jsonify(enqueue_task_log(data)), 202
+    
     log = create_task_log(data)
     
     if log is None:
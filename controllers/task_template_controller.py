@@ -1,5 +1,5 @@
 """Task template controller for handling task template operations."""
-from flask import jsonify
+from flask import jsonify, request
 from services.task_template_service import (
     get_all_task_templates,
     get_task_template_by_id,
@@ -17,7 +17,10 @@ def get_all_templates():
     Returns:
         tuple: JSON response with templates and status code.
     """
-    templates = get_all_task_templates()
+    try:
+        templates = get_all_task_templates(fields=request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(templates), 200
 
 
@@ -64,7 +67,10 @@ def get_templates_by_cat(category):
     Returns:
         tuple: JSON response with templates and status code.
     """
-    templates = get_templates_by_category(category)
+    try:
+        templates = get_templates_by_category(category, fields=request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(templates), 200
 
 
@@ -1,16 +1,36 @@
 """
 Robust AI Agent Service with OpenAI Integration and MCP Support
 Handles intelligent actions, function calling, and multi-agent orchestration
+
+AIAgent.ask awaits the AsyncOpenAI client and runs the (synchronous) tool
+functions in worker threads, so a single event loop can overlap many chat
+turns. OPENAI_ASYNC_CLIENT=false falls back to the blocking client, called
+in worker threads.
+AIAgent.ask_stream streams the same turn as events (tokens, tool calls).
+
+Independent tool calls of one turn run concurrently (TOOL_CALL_CONCURRENCY,
+default 4), each bounded by TOOL_CALL_TIMEOUT seconds (default 30); tools
+registered with serial=True (writes) always run alone.
+
+Conversations live in a bounded ConversationStore (LRU, idle TTL and an
+approximate memory budget); an evicted conversation is resumed from the
+agent's history_loader.
 """
 
 import os
 import json
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Callable
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Any, Optional, Callable, Tuple
 from datetime import datetime
+from types import SimpleNamespace
 from dotenv import load_dotenv
-from openai import OpenAI, OpenAIError
+from openai import AsyncOpenAI, OpenAI, OpenAIError
 from functools import wraps
+from lib import cache
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +40,21 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+async def _iterate_stream(stream):
+    """Iterate a streamed completion from either the async or the blocking client"""
+    if hasattr(stream, "__aiter__"):
+        async for chunk in stream:
+            yield chunk
+    else:
+        # Each chunk of the blocking stream is a socket read: do it off the loop
+        chunks = iter(stream)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+
 class AgentError(Exception):
     """Custom exception for agent-related errors"""
     pass
@@ -31,8 +66,16 @@ class FunctionRegistry:
     def __init__(self):
         self._functions: Dict[str, Callable] = {}
         self._schemas: Dict[str, Dict] = {}
+        self._options: Dict[str, Dict[str, Any]] = {}
     
-    def register(self, name: str, description: str, parameters: Dict[str, Any]):
+    def register(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        serial: bool = False,
+        timeout: Optional[float] = None
+    ):
         """
         Decorator to register a function for agent use
         
@@ -40,9 +83,12 @@ class FunctionRegistry:
             name: Function name
             description: Function description for the agent
             parameters: JSON schema for function parameters
+            serial: Never run concurrently with other tool calls (writes)
+            timeout: Seconds a call may take (None: the agent's default)
         """
         def decorator(func: Callable):
             self._functions[name] = func
+            self._options[name] = {"serial": serial, "timeout": timeout}
             self._schemas[name] = {
                 "type": "function",
                 "function": {
@@ -62,6 +108,10 @@ class FunctionRegistry:
         """Get a registered function by name"""
         return self._functions.get(name)
     
+    def get_options(self, name: str) -> Dict[str, Any]:
+        """Get the execution options (serial, timeout) of a function"""
+        return self._options.get(name, {"serial": False, "timeout": None})
+    
     def get_schemas(self) -> List[Dict]:
         """Get all function schemas for OpenAI"""
         return list(self._schemas.values())
@@ -71,6 +121,18 @@ class FunctionRegistry:
         return list(self._functions.keys())
 
 
+# Rough per-message cost of the dict and its small strings, in bytes
+_MESSAGE_OVERHEAD = 240
+
+
+def _message_bytes(message: Dict[str, Any]) -> int:
+    """Approximate memory held by one conversation message"""
+    size = _MESSAGE_OVERHEAD + len(message.get("content") or "")
+    if message.get("tool_calls"):
+        size += len(json.dumps(message["tool_calls"]))
+    return size
+
+
 class AgentConversation:
     """Manages conversation history and context"""
     
@@ -83,9 +145,19 @@ class AgentConversation:
             "total_tokens": 0,
             "function_calls": 0
         }
+        self._bytes = 0
         
         # Add system message
         self.add_message("system", system_prompt)
+        self._recount()
+    
+    @property
+    def approx_bytes(self) -> int:
+        """Approximate memory held by the history (the shared system prompt excluded)"""
+        return self._bytes
+    
+    def _recount(self):
+        self._bytes = sum(_message_bytes(message) for message in self.messages[1:]) + _MESSAGE_OVERHEAD
     
     def add_message(self, role: str, content: str, tool_calls: Optional[List] = None):
         """Add a message to conversation history"""
@@ -99,14 +171,19 @@ class AgentConversation:
         if len(self.messages) > self.max_history:
             # Keep system message and trim oldest messages
             self.messages = [self.messages[0]] + self.messages[-(self.max_history-1):]
+            self._recount()
+        else:
+            self._bytes += _message_bytes(message)
     
     def add_tool_message(self, tool_call_id: str, content: str):
         """Add a tool/function response message"""
-        self.messages.append({
+        message = {
             "role": "tool",
             "tool_call_id": tool_call_id,
             "content": content
-        })
+        }
+        self.messages.append(message)
+        self._bytes += _message_bytes(message)
     
     def get_messages(self) -> List[Dict]:
         """Get all conversation messages"""
@@ -116,6 +193,213 @@ class AgentConversation:
         """Clear conversation history except system prompt"""
         system_msg = self.messages[0] if self.messages else None
         self.messages = [system_msg] if system_msg else []
+        self._recount()
+
+
+class ConversationStore:
+    """
+    Bounded store of active conversations, keyed by conversation id
+    
+    Conversations are evicted least-recently-used first when there are more
+    than max_conversations of them or they hold more than max_bytes
+    (approximately), and when idle for ttl seconds. An evicted conversation
+    is rebuilt on its next use from history_loader (e.g. the stored chat
+    messages of a session), so eviction only costs a database read.
+    
+    The limits are checked when a conversation is added and, since
+    conversations grow as messages are added, by enforce_limits() at the
+    end of every agent turn.
+    
+    Args:
+        name: Name for the cache registry (stats at /api/debug/cache-stats)
+        max_conversations: Maximum number of conversations (int or callable)
+        ttl: Idle seconds before a conversation is dropped; 0 keeps it (float or callable)
+        max_bytes: Approximate memory budget; 0 disables it (int or callable)
+        history_loader: Returns the messages ({"role", "content"}) to resume
+            a conversation with, or an empty list
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        max_conversations=1000,
+        ttl=1800.0,
+        max_bytes=0,
+        history_loader: Optional[Callable[[str], List[Dict[str, Any]]]] = None
+    ):
+        self.table = f"conversations:{name}"
+        self.history_loader = history_loader
+        self._max_conversations = max_conversations
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[AgentConversation, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rehydrations = 0
+        self.evictions = {"lru": 0, "ttl": 0, "bytes": 0}
+        cache.register(self)
+    
+    @staticmethod
+    def _setting(value):
+        return value() if callable(value) else value
+    
+    @property
+    def max_conversations(self) -> int:
+        return int(self._setting(self._max_conversations))
+    
+    @property
+    def ttl(self) -> float:
+        return float(self._setting(self._ttl))
+    
+    @property
+    def max_bytes(self) -> int:
+        return int(self._setting(self._max_bytes))
+    
+    def _expired(self, last_used: float, now: float) -> bool:
+        ttl = self.ttl
+        return ttl > 0 and now - last_used >= ttl
+    
+    def _evict(self, now: float):
+        # Idle conversations first, then the least recently used over budget
+        for conversation_id, (_, last_used) in list(self._entries.items()):
+            if not self._expired(last_used, now):
+                break
+            del self._entries[conversation_id]
+            self.evictions["ttl"] += 1
+        while len(self._entries) > self.max_conversations:
+            self._entries.popitem(last=False)
+            self.evictions["lru"] += 1
+        max_bytes = self.max_bytes
+        if max_bytes > 0:
+            total = self.approx_bytes
+            while total > max_bytes and self._entries:
+                _, (conversation, _) = self._entries.popitem(last=False)
+                total -= conversation.approx_bytes
+                self.evictions["bytes"] += 1
+    
+    def enforce_limits(self):
+        """Evict over the limits again, e.g. after conversations grew during a turn"""
+        with self._lock:
+            self._evict(time.monotonic())
+    
+    @property
+    def approx_bytes(self) -> int:
+        """Approximate memory held by all stored conversations"""
+        return sum(conversation.approx_bytes for conversation, _ in list(self._entries.values()))
+    
+    def get(self, conversation_id: str) -> Optional[AgentConversation]:
+        """Return a stored conversation (marking it used) or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None or self._expired(entry[1], now):
+                if entry is not None:
+                    del self._entries[conversation_id]
+                    self.evictions["ttl"] += 1
+                return None
+            self._entries[conversation_id] = (entry[0], now)
+            self._entries.move_to_end(conversation_id)
+            return entry[0]
+    
+    def get_or_create(self, conversation_id: str, system_prompt: str) -> AgentConversation:
+        """Return the conversation, rebuilding it from history_loader when it is not stored"""
+        conversation = self._lookup(conversation_id)
+        if conversation is not None:
+            return conversation
+        return self._create(conversation_id, system_prompt, self._load_history(conversation_id))
+    
+    async def get_or_create_async(self, conversation_id: str, system_prompt: str) -> AgentConversation:
+        """get_or_create for coroutines: history_loader runs in a worker thread, off the event loop"""
+        conversation = self._lookup(conversation_id)
+        if conversation is not None:
+            return conversation
+        history = []
+        if self.history_loader is not None:
+            history = await asyncio.to_thread(self._load_history, conversation_id)
+        return self._create(conversation_id, system_prompt, history)
+    
+    def _lookup(self, conversation_id: str) -> Optional[AgentConversation]:
+        conversation = self.get(conversation_id)
+        if conversation is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return conversation
+    
+    def _load_history(self, conversation_id: str) -> List[Dict[str, Any]]:
+        if self.history_loader is None:
+            return []
+        try:
+            return self.history_loader(conversation_id) or []
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Could not load history for conversation {conversation_id}: {str(e)}")
+            return []
+    
+    def _create(self, conversation_id: str, system_prompt: str, history: List[Dict[str, Any]]) -> AgentConversation:
+        conversation = AgentConversation(system_prompt)
+        for message in history:
+            conversation.add_message(message.get("role", "user"), message.get("content") or "")
+        if history:
+            self.rehydrations += 1
+        
+        with self._lock:
+            # Another request may have created it meanwhile
+            entry = self._entries.get(conversation_id)
+            if entry is not None:
+                return entry[0]
+            self._put(conversation_id, conversation)
+        return conversation
+    
+    def _put(self, conversation_id: str, conversation: AgentConversation):
+        now = time.monotonic()
+        self._entries[conversation_id] = (conversation, now)
+        self._entries.move_to_end(conversation_id)
+        self._evict(now)
+    
+    def __setitem__(self, conversation_id: str, conversation: AgentConversation):
+        with self._lock:
+            self._put(conversation_id, conversation)
+    
+    def __getitem__(self, conversation_id: str) -> AgentConversation:
+        conversation = self.get(conversation_id)
+        if conversation is None:
+            raise KeyError(conversation_id)
+        return conversation
+    
+    def __contains__(self, conversation_id: str) -> bool:
+        entry = self._entries.get(conversation_id)
+        return entry is not None and not self._expired(entry[1], time.monotonic())
+    
+    def __delitem__(self, conversation_id: str):
+        with self._lock:
+            del self._entries[conversation_id]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def invalidate(self, key: Optional[str] = None):
+        """Drop a conversation (every conversation when None)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "rehydrations": self.rehydrations,
+            "evictions": dict(self.evictions),
+            "size": len(self._entries),
+            "max_conversations": self.max_conversations,
+            "ttl": self.ttl,
+            "approx_bytes": self.approx_bytes,
+            "max_bytes": self.max_bytes
+        }
 
 
 class AIAgent:
@@ -130,7 +414,9 @@ class AIAgent:
         model: str = "gpt-4-turbo-preview",
         temperature: float = 0.7,
         max_tokens: int = 4000,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        use_async_client: Optional[bool] = None,
+        history_loader: Optional[Callable[[str], List[Dict[str, Any]]]] = None
     ):
         """
         Initialize AI Agent
@@ -141,6 +427,9 @@ class AIAgent:
             temperature: Response randomness (0-2)
             max_tokens: Maximum tokens in response
             system_prompt: System instructions for the agent
+            use_async_client: Await AsyncOpenAI in ask() (default: OPENAI_ASYNC_CLIENT, true)
+            history_loader: Returns the stored messages of a conversation that
+                is not in memory (e.g. evicted), to resume it
         """
         self.name = name
         self.model = model
@@ -154,6 +443,18 @@ class AIAgent:
         
         self.client = OpenAI(api_key=api_key)
         
+        # Async client, created for the event loop that runs ask()
+        if use_async_client is None:
+            use_async_client = os.getenv("OPENAI_ASYNC_CLIENT", "true").strip().lower() not in ("0", "false", "no", "off")
+        self.use_async_client = use_async_client
+        self._api_key = api_key
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Tool calls of one turn: how many run at once, and for how long
+        self.tool_concurrency = max(1, int(os.getenv("TOOL_CALL_CONCURRENCY", "4")))
+        self.tool_timeout = float(os.getenv("TOOL_CALL_TIMEOUT", "30"))
+        
         # Function registry
         self.function_registry = FunctionRegistry()
         
@@ -165,8 +466,16 @@ When calling functions, ensure you have all required parameters."""
         
         self.system_prompt = system_prompt or default_prompt
         
-        # Active conversations (supports multiple concurrent conversations)
-        self.conversations: Dict[str, AgentConversation] = {}
+        # Active conversations (supports multiple concurrent conversations),
+        # bounded by AGENT_MAX_CONVERSATIONS, AGENT_CONVERSATION_TTL (idle
+        # seconds) and AGENT_CONVERSATION_MAX_BYTES (approximate)
+        self.conversations = ConversationStore(
+            name,
+            max_conversations=lambda: int(os.getenv("AGENT_MAX_CONVERSATIONS", "1000")),
+            ttl=lambda: float(os.getenv("AGENT_CONVERSATION_TTL", "1800")),
+            max_bytes=lambda: int(os.getenv("AGENT_CONVERSATION_MAX_BYTES", str(64 * 1024 * 1024))),
+            history_loader=history_loader
+        )
         
         # Agent statistics
         self.stats = {
@@ -174,12 +483,21 @@ When calling functions, ensure you have all required parameters."""
             "successful_requests": 0,
             "failed_requests": 0,
             "total_tokens_used": 0,
-            "total_function_calls": 0
+            "total_function_calls": 0,
+            "function_timeouts": 0
         }
+        self._stats_lock = threading.Lock()
         
         logger.info(f"Agent '{name}' initialized with model '{model}'")
     
-    def register_function(self, name: str, description: str, parameters: Dict[str, Any]):
+    def register_function(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        serial: bool = False,
+        timeout: Optional[float] = None
+    ):
         """
         Register a function that the agent can call
         
@@ -187,6 +505,8 @@ When calling functions, ensure you have all required parameters."""
             name: Function name
             description: What the function does
             parameters: JSON schema for parameters
+            serial: Never run concurrently with other tool calls (writes)
+            timeout: Seconds a call may take (None: TOOL_CALL_TIMEOUT)
             
         Example:
             @agent.register_function(
@@ -205,13 +525,25 @@ When calling functions, ensure you have all required parameters."""
                 # Implementation
                 pass
         """
-        return self.function_registry.register(name, description, parameters)
+        return self.function_registry.register(name, description, parameters, serial=serial, timeout=timeout)
+    
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        AsyncOpenAI client for the running event loop
+        
+        An httpx connection pool cannot be shared between event loops, so a
+        new client is created when ask() runs on a different loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = AsyncOpenAI(api_key=self._api_key)
+            self._async_client_loop = loop
+        return self._async_client
     
     def get_or_create_conversation(self, conversation_id: str) -> AgentConversation:
-        """Get existing conversation or create new one"""
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = AgentConversation(self.system_prompt)
-        return self.conversations[conversation_id]
+        """Get existing conversation or create new one (resumed from the history loader, if any)"""
+        return self.conversations.get_or_create(conversation_id, self.system_prompt)
     
     def execute_function(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -235,7 +567,8 @@ When calling functions, ensure you have all required parameters."""
             logger.info(f"Executing function: {function_name} with args: {arguments}")
             result = func(**arguments)
             
-            self.stats["total_function_calls"] += 1
+            with self._stats_lock:
+                self.stats["total_function_calls"] += 1
             
             return {
                 "success": True,
@@ -249,24 +582,164 @@ When calling functions, ensure you have all required parameters."""
             }
     
     def process_tool_calls(self, tool_calls: List) -> List[Dict]:
-        """Process multiple tool calls from the agent"""
-        results = []
+        """Process multiple tool calls from the agent (see process_tool_calls_async)"""
+        from lib import event_loop
+        return event_loop.run(self.process_tool_calls_async(tool_calls))
+    
+    def _tool_call_batches(self, tool_calls: List) -> List[List]:
+        """
+        Group tool calls into batches that may run concurrently
         
+        Consecutive calls to ordinary functions share a batch; a serial
+        function gets a batch of its own, so it never overlaps another call
+        and keeps its place in the order the model gave.
+        """
+        batches: List[List] = []
+        batch_open = False
         for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
-            
-            # Execute the function
-            result = self.execute_function(function_name, function_args)
-            
-            results.append({
-                "tool_call_id": tool_call.id,
-                "function_name": function_name,
-                "result": result
-            })
+            if self.function_registry.get_options(tool_call.function.name)["serial"]:
+                batches.append([tool_call])
+                batch_open = False
+            elif batch_open:
+                batches[-1].append(tool_call)
+            else:
+                batches.append([tool_call])
+                batch_open = True
+        return batches
+    
+    async def _run_tool_call(self, tool_call, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Execute one tool call in a worker thread, within its timeout"""
+        function_name = tool_call.function.name
+        try:
+            function_args = json.loads(tool_call.function.arguments or "{}")
+        except json.JSONDecodeError as e:
+            result = {"success": False, "error": f"Invalid arguments for '{function_name}': {e}"}
+        else:
+            timeout = self.function_registry.get_options(function_name)["timeout"] or self.tool_timeout
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(
+                        asyncio.to_thread(self.execute_function, function_name, function_args),
+                        timeout if timeout > 0 else None
+                    )
+                except asyncio.TimeoutError:
+                    # The worker thread cannot be interrupted; it finishes on its own.
+                    with self._stats_lock:
+                        self.stats["function_timeouts"] += 1
+                    logger.error(f"Function '{function_name}' timed out after {timeout}s")
+                    result = {"success": False, "error": f"Function '{function_name}' timed out after {timeout}s"}
+        
+        return {
+            "tool_call_id": tool_call.id,
+            "function_name": function_name,
+            "result": result
+        }
+    
+    async def process_tool_calls_async(self, tool_calls: List) -> List[Dict]:
+        """
+        Process tool calls without blocking the event loop
+        
+        Registered functions are synchronous (database calls), so each one
+        runs in a worker thread. Independent calls run concurrently, at most
+        tool_concurrency at a time; serial functions run alone. Results are
+        returned in the order of tool_calls.
+        """
+        semaphore = asyncio.Semaphore(self.tool_concurrency)
+        results = []
+        
+        for batch in self._tool_call_batches(tool_calls):
+            results.extend(await asyncio.gather(*(self._run_tool_call(tool_call, semaphore) for tool_call in batch)))
         
         return results
     
+    async def create_completion(self, messages: List[Dict], stream: bool = False):
+        """Request a chat completion, awaiting the async client when enabled"""
+        schemas = self.function_registry.get_schemas()
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "tools": schemas if schemas else None,
+            "tool_choice": "auto" if schemas else None,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens
+        }
+        if stream:
+            kwargs["stream"] = True
+        if self.use_async_client:
+            return await self.async_client.chat.completions.create(**kwargs)
+        # The blocking client must not stall the other turns sharing the loop
+        return await asyncio.to_thread(self.client.chat.completions.create, **kwargs)
+    
+    async def _start_turn(self, prompt: str, conversation_id: str, user_context: Optional[Dict[str, Any]]) -> AgentConversation:
+        """Add the user's prompt (with its context) to the conversation"""
+        conversation = await self.conversations.get_or_create_async(conversation_id, self.system_prompt)
+        
+        # Add user context to prompt if provided
+        if user_context:
+            enhanced_prompt = f"{prompt}\n\nContext: {json.dumps(user_context)}"
+        else:
+            enhanced_prompt = prompt
+        
+        conversation.add_message("user", enhanced_prompt)
+        return conversation
+    
+    def _add_tool_results(self, conversation: AgentConversation, tool_results: List[Dict]):
+        """Add tool responses to conversation"""
+        for tool_result in tool_results:
+            conversation.add_tool_message(
+                tool_result["tool_call_id"],
+                json.dumps(tool_result["result"])
+            )
+    
+    def _final_result(
+        self,
+        conversation: AgentConversation,
+        conversation_id: str,
+        content: Optional[str],
+        function_call_history: List[Dict],
+        iteration: int
+    ) -> Dict[str, Any]:
+        """Record the final answer of a turn and build ask()'s result"""
+        conversation.add_message("assistant", content or "")
+        
+        self.stats["successful_requests"] += 1
+        
+        return {
+            "success": True,
+            "response": content,
+            "function_calls": function_call_history,
+            "conversation_id": conversation_id,
+            "iterations": iteration,
+            "metadata": {
+                "model": self.model,
+                "tokens_used": conversation.metadata["total_tokens"],
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        }
+    
+    def _max_iterations_result(self, conversation_id: str, max_iterations: int, function_call_history: List[Dict]) -> Dict[str, Any]:
+        logger.warning(f"Max iterations ({max_iterations}) reached for conversation {conversation_id}")
+        return {
+            "success": False,
+            "error": "Maximum function call iterations reached",
+            "response": "I encountered too many function calls. Please try rephrasing your request.",
+            "function_calls": function_call_history
+        }
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        self.stats["failed_requests"] += 1
+        if isinstance(error, OpenAIError):
+            logger.error(f"OpenAI API error: {str(error)}")
+            return {
+                "success": False,
+                "error": f"OpenAI API error: {str(error)}"
+            }
+        logger.error(f"Unexpected error in agent.ask: {str(error)}")
+        return {
+            "success": False,
+            "error": f"Unexpected error: {str(error)}"
+        }
+    
     async def ask(
         self,
         prompt: str,
@@ -289,15 +762,7 @@ When calling functions, ensure you have all required parameters."""
         self.stats["total_requests"] += 1
         
         try:
-            conversation = self.get_or_create_conversation(conversation_id)
-            
-            # Add user context to prompt if provided
-            if user_context:
-                enhanced_prompt = f"{prompt}\n\nContext: {json.dumps(user_context)}"
-            else:
-                enhanced_prompt = prompt
-            
-            conversation.add_message("user", enhanced_prompt)
+            conversation = await self._start_turn(prompt, conversation_id, user_context)
             
             # Iterative function calling
             iteration = 0
@@ -307,19 +772,12 @@ When calling functions, ensure you have all required parameters."""
                 iteration += 1
                 
                 # Create completion
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=conversation.get_messages(),
-                    tools=self.function_registry.get_schemas() if self.function_registry.get_schemas() else None,
-                    tool_choice="auto" if self.function_registry.get_schemas() else None,
-                    temperature=self.temperature,
-                    max_tokens=self.max_tokens
-                )
+                response = await self.create_completion(conversation.get_messages())
                 
                 message = response.choices[0].message
                 
                 # Update stats
-                if hasattr(response, 'usage'):
+                if getattr(response, 'usage', None):
                     self.stats["total_tokens_used"] += response.usage.total_tokens
                     conversation.metadata["total_tokens"] += response.usage.total_tokens
                 
@@ -332,60 +790,101 @@ When calling functions, ensure you have all required parameters."""
                     )
                     
                     # Process all tool calls
-                    tool_results = self.process_tool_calls(message.tool_calls)
+                    tool_results = await self.process_tool_calls_async(message.tool_calls)
                     function_call_history.extend(tool_results)
-                    
-                    # Add tool responses to conversation
-                    for tool_result in tool_results:
-                        conversation.add_tool_message(
-                            tool_result["tool_call_id"],
-                            json.dumps(tool_result["result"])
-                        )
+                    self._add_tool_results(conversation, tool_results)
                     
                     # Continue loop to let agent process results
                     continue
                 else:
                     # No more function calls, we have final response
-                    conversation.add_message("assistant", message.content or "")
-                    
-                    self.stats["successful_requests"] += 1
-                    
-                    return {
-                        "success": True,
-                        "response": message.content,
-                        "function_calls": function_call_history,
-                        "conversation_id": conversation_id,
-                        "iterations": iteration,
-                        "metadata": {
-                            "model": self.model,
-                            "tokens_used": conversation.metadata["total_tokens"],
-                            "timestamp": datetime.utcnow().isoformat()
-                        }
-                    }
+                    return self._final_result(conversation, conversation_id, message.content, function_call_history, iteration)
             
             # Max iterations reached
-            logger.warning(f"Max iterations ({max_iterations}) reached for conversation {conversation_id}")
-            return {
-                "success": False,
-                "error": "Maximum function call iterations reached",
-                "response": "I encountered too many function calls. Please try rephrasing your request.",
-                "function_calls": function_call_history
-            }
+            return self._max_iterations_result(conversation_id, max_iterations, function_call_history)
             
-        except OpenAIError as e:
-            self.stats["failed_requests"] += 1
-            logger.error(f"OpenAI API error: {str(e)}")
-            return {
-                "success": False,
-                "error": f"OpenAI API error: {str(e)}"
-            }
         except Exception as e:
-            self.stats["failed_requests"] += 1
-            logger.error(f"Unexpected error in agent.ask: {str(e)}")
-            return {
-                "success": False,
-                "error": f"Unexpected error: {str(e)}"
-            }
+            return self._error_result(e)
+        finally:
+            # The turn grew the conversation: re-check the memory budget
+            self.conversations.enforce_limits()
+    
+    async def ask_stream(
+        self,
+        prompt: str,
+        conversation_id: str = "default",
+        user_context: Optional[Dict[str, Any]] = None,
+        max_iterations: int = 5
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of ask(): yields events while the turn runs
+        
+        Completions are requested with stream=True, so the answer reaches
+        the caller token by token. Each event is a dict with a "type":
+            token: {"content"} - next fragment of the assistant's answer
+            tool_call_start: {"id", "name", "arguments"}
+            tool_call_finish: {"id", "name", "success"}
+            done: {"result"} - what ask() would have returned; always last
+        
+        Args:
+            prompt: User prompt/question
+            conversation_id: Conversation identifier for context
+            user_context: Additional context (user_id, metadata, etc.)
+            max_iterations: Maximum function call iterations
+        """
+        self.stats["total_requests"] += 1
+        
+        try:
+            conversation = await self._start_turn(prompt, conversation_id, user_context)
+            function_call_history = []
+            
+            for iteration in range(1, max_iterations + 1):
+                stream = await self.create_completion(conversation.get_messages(), stream=True)
+                
+                # Tool calls arrive in fragments, keyed by their index
+                content_parts: List[str] = []
+                tool_calls: Dict[int, Dict[str, Any]] = {}
+                async for chunk in _iterate_stream(stream):
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield {"type": "token", "content": delta.content}
+                    for fragment in delta.tool_calls or []:
+                        tool_call = tool_calls.setdefault(fragment.index, {
+                            "id": None, "type": "function", "function": {"name": "", "arguments": ""}
+                        })
+                        if fragment.id:
+                            tool_call["id"] = fragment.id
+                        if fragment.function:
+                            tool_call["function"]["name"] += fragment.function.name or ""
+                            tool_call["function"]["arguments"] += fragment.function.arguments or ""
+                content = "".join(content_parts)
+                
+                if not tool_calls:
+                    yield {"type": "done", "result": self._final_result(conversation, conversation_id, content, function_call_history, iteration)}
+                    return
+                
+                calls = [tool_calls[index] for index in sorted(tool_calls)]
+                conversation.add_message("assistant", content, tool_calls=calls)
+                for call in calls:
+                    yield {"type": "tool_call_start", "id": call["id"], "name": call["function"]["name"], "arguments": call["function"]["arguments"]}
+                
+                tool_results = await self.process_tool_calls_async([
+                    SimpleNamespace(id=call["id"], function=SimpleNamespace(**call["function"])) for call in calls
+                ])
+                function_call_history.extend(tool_results)
+                self._add_tool_results(conversation, tool_results)
+                for tool_result in tool_results:
+                    yield {"type": "tool_call_finish", "id": tool_result["tool_call_id"], "name": tool_result["function_name"], "success": tool_result["result"].get("success", False)}
+            
+            yield {"type": "done", "result": self._max_iterations_result(conversation_id, max_iterations, function_call_history)}
+            
+        except Exception as e:
+            yield {"type": "done", "result": self._error_result(e)}
+        finally:
+            self.conversations.enforce_limits()
     
     def clear_conversation(self, conversation_id: str = "default"):
         """Clear a specific conversation history"""
@@ -404,6 +903,7 @@ When calling functions, ensure you have all required parameters."""
         return {
             **self.stats,
             "active_conversations": len(self.conversations),
+            "conversation_store": self.conversations.stats(),
             "registered_functions": len(self.function_registry.list_functions())
         }
     
@@ -0,0 +1,338 @@
+"""In-process caches for frequently read tables.
+
+:class:`SnapshotCache` keeps a whole (small) table in memory, indexed by
+any number of columns, and reloads it after ``ttl`` seconds as a safety net.
+:class:`LRUCache` keeps the most recently used rows of a large table by key,
+each for at most ``ttl`` seconds. The owning service keeps either one
+current by calling ``put`` and ``remove`` from its write functions.
+
+Every cache registers itself by table name so that
+:func:`invalidate_all` (used when a new data-access backend is installed),
+:func:`get_cache_stats` and the cross-process invalidation bus
+(lib.cache_bus) can reach it. Writes made through a cache are published on
+the bus, and events from other workers drop the affected entries here.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from lib import cache_bus
+
+# Returned by LRUCache.get when the key is not cached (None is a value).
+MISSING = object()
+
+_registry: Dict[str, Any] = {}
+
+
+def register(cache) -> None:
+    """Make a cache reachable by its table name."""
+    _registry[cache.table] = cache
+
+
+def invalidate_all() -> None:
+    """Drop the contents of every registered cache."""
+    for cache in list(_registry.values()):
+        cache.invalidate()
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters of every registered cache, keyed by table."""
+    return {table: cache.stats() for table, cache in _registry.items()}
+
+
+def _on_remote_write(table: str, key: Any) -> None:
+    cache = _registry.get(table)
+    if cache is not None:
+        cache.invalidate(key)
+
+
+cache_bus.subscribe(_on_remote_write)
+
+
+class SnapshotCache:
+    """Whole-table cache with column indexes and a TTL.
+
+    Args:
+        table (str): Table name (used for registration and stats).
+        loader (callable): Returns every row of the table.
+        indexes (iterable): Columns to index; lookups on other columns are
+            not supported.
+        ttl (float or callable): Seconds a snapshot is served before it is
+            reloaded; ``0`` disables the cache (every read calls ``loader``).
+        key (str): Primary key column.
+    """
+
+    def __init__(self, table: str, loader: Callable[[], List[dict]],
+                 indexes: Iterable[str] = ('id',), ttl=300.0, key: str = 'id'):
+        self.table = table
+        self.key = key
+        self._loader = loader
+        self._indexes = tuple(indexes)
+        self._ttl = ttl
+        # (rows by key, {column: {value: [keys]}}, loaded_at), swapped atomically
+        self._state: Optional[Tuple[Dict[Any, dict], Dict[str, Dict[Any, List[Any]]], float]] = None
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[Any, str]] = None
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        register(self)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl() if callable(self._ttl) else self._ttl
+
+    def _build(self, rows: Dict[Any, dict], loaded_at: float):
+        index = {column: {} for column in self._indexes}
+        for row_id, row in rows.items():
+            for column in self._indexes:
+                index[column].setdefault(row.get(column), []).append(row_id)
+        return rows, index, loaded_at
+
+    def _snapshot(self):
+        cache_bus.poll()
+        ttl = self.ttl
+        if ttl <= 0:
+            self.misses += 1
+            return None
+        state = self._state
+        if state is not None and time.monotonic() - state[2] < ttl:
+            self.hits += 1
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or time.monotonic() - state[2] >= ttl:
+                self.misses += 1
+                self.loads += 1
+                rows = {row[self.key]: row for row in self._loader()}
+                state = self._state = self._build(rows, time.monotonic())
+            else:
+                self.hits += 1
+            return state
+
+    @property
+    def version(self) -> Optional[str]:
+        """Digest of the current contents, equal across workers holding the
+        same rows (None when the cache is disabled)."""
+        state = self._snapshot()
+        if state is None:
+            return None
+        cached = self._version
+        if cached is not None and cached[0] is state:
+            return cached[1]
+        rows = sorted((str(key), sorted(row.items())) for key, row in state[0].items())
+        digest = hashlib.sha1(repr(rows).encode('utf-8')).hexdigest()[:16]
+        self._version = (state, digest)
+        return digest
+
+    # ---- reads ------------------------------------------------------
+    def all(self) -> Optional[List[dict]]:
+        """Every row, or None when the cache is disabled."""
+        state = self._snapshot()
+        if state is None:
+            return None
+        return [dict(row) for row in state[0].values()]
+
+    def find(self, column: str, value: Any) -> Optional[List[dict]]:
+        """Rows whose ``column`` equals ``value``, or None when disabled."""
+        return self.find_many(column, (value,))
+
+    def find_many(self, column: str, values: Iterable[Any]) -> Optional[List[dict]]:
+        """Rows whose ``column`` is any of ``values``, or None when disabled."""
+        state = self._snapshot()
+        if state is None:
+            return None
+        rows, index, _ = state
+        return [
+            dict(rows[row_id])
+            for value in dict.fromkeys(values)
+            for row_id in index[column].get(value, ())
+        ]
+
+    # ---- writes -----------------------------------------------------
+    def put(self, row: Optional[dict]) -> Optional[dict]:
+        """Insert or replace a row after a write; returns the row."""
+        if row is None:
+            return row
+        with self._lock:
+            if self._state is not None:
+                rows = dict(self._state[0])
+                rows[row[self.key]] = dict(row)
+                self._state = self._build(rows, self._state[2])
+        cache_bus.publish(self.table, row[self.key])
+        return row
+
+    def remove(self, row_id: Any) -> None:
+        """Drop a row after a delete."""
+        with self._lock:
+            if self._state is not None and row_id in self._state[0]:
+                rows = dict(self._state[0])
+                del rows[row_id]
+                self._state = self._build(rows, self._state[2])
+        cache_bus.publish(self.table, row_id)
+
+    def invalidate(self, key: Any = None) -> None:  # noqa: ARG002
+        """Forget the snapshot; the next read reloads the table.
+
+        The snapshot is dropped whole even for a single ``key``: the event
+        does not carry the new row, and reloading a small table is one query.
+        """
+        with self._lock:
+            self._state = None
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads,
+            'hit_ratio': round(self.hits / total, 3) if total else 0.0,
+            'size': len(state[0]) if state is not None else 0,
+            'ttl': self.ttl,
+        }
+
+
+class LRUCache:
+    """Bounded key/value cache with least-recently-used eviction and a TTL.
+
+    ``None`` values are cached too, so lookups of rows that do not exist
+    are also answered from memory until a write or the TTL clears them.
+
+    A read-through takes :meth:`generation` before it queries the database
+    and passes it to :meth:`store`, which then skips rows that a
+    concurrent ``put`` or ``invalidate`` of the same key has superseded::
+
+        value = cache.get(key)
+        if value is MISSING:
+            generation = cache.generation()
+            value = cache.store(key, load(key), generation)
+
+    Args:
+        table (str): Table name (used for registration, stats and the bus).
+        maxsize (int or callable): Maximum number of entries.
+        ttl (float or callable): Seconds an entry is served; ``0`` disables
+            the cache.
+    """
+
+    def __init__(self, table: str, maxsize=1024, ttl=60.0):
+        self.table = table
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: 'OrderedDict[Any, Tuple[Any, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Write clock: bumped by put/invalidate, with the clock of each
+        # key's last write. Writes older than _floor are forgotten.
+        self._clock = 0
+        self._written: Dict[Any, int] = {}
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_stores = 0
+        register(self)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl() if callable(self._ttl) else self._ttl
+
+    @property
+    def maxsize(self) -> int:
+        return int(self._maxsize() if callable(self._maxsize) else self._maxsize)
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value for ``key`` or :data:`MISSING`."""
+        cache_bus.poll()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() >= entry[1]:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[0]
+        return dict(value) if isinstance(value, dict) else value
+
+    def generation(self) -> int:
+        """Current write clock; take it before reading a missed key."""
+        with self._lock:
+            return self._clock
+
+    def _bump(self, key: Any) -> None:
+        # Called with the lock held
+        self._clock += 1
+        if key is None or len(self._written) >= max(1024, 2 * self.maxsize):
+            self._written.clear()
+            self._floor = self._clock
+        else:
+            self._written[key] = self._clock
+
+    def _set(self, key: Any, value: Any, ttl: float) -> None:
+        # Called with the lock held
+        self._entries[key] = (dict(value) if isinstance(value, dict) else value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def store(self, key: Any, value: Any, generation: Optional[int] = None) -> Any:
+        """Remember a value just read from the database; returns it.
+
+        Args:
+            key: Cache key.
+            value: The row read (or None).
+            generation (int, optional): :meth:`generation` taken before
+                the read; the value is not cached when ``key`` was written
+                or invalidated since.
+        """
+        ttl = self.ttl
+        if ttl <= 0:
+            return value
+        with self._lock:
+            if generation is not None and max(self._floor, self._written.get(key, 0)) > generation:
+                self.stale_stores += 1
+                return value
+            self._set(key, value, ttl)
+        return value
+
+    def put(self, key: Any, value: Any) -> Any:
+        """Write-through after a write: store and tell the other workers."""
+        ttl = self.ttl
+        with self._lock:
+            self._bump(key)
+            if ttl > 0:
+                self._set(key, value, ttl)
+        cache_bus.publish(self.table, key)
+        return value
+
+    def remove(self, key: Any) -> None:
+        """Forget ``key`` after a delete and tell the other workers."""
+        self.invalidate(key)
+        cache_bus.publish(self.table, key)
+
+    def invalidate(self, key: Any = None) -> None:
+        """Forget ``key`` (every entry when None)."""
+        with self._lock:
+            self._bump(key)
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'stale_stores': self.stale_stores,
+            'hit_ratio': round(self.hits / total, 3) if total else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+        }
@@ -0,0 +1,235 @@
+"""Cross-process cache invalidation bus.
+
+Each gunicorn worker keeps its own in-process caches (see lib.cache). When
+one worker writes a cached table, the others must drop their copy. Writers
+call :func:`publish` with ``(table, key)``; every worker calls :func:`poll`
+(the caches do this on read, at most once per ``CACHE_BUS_POLL_INTERVAL``
+seconds) and hands events published by *other* processes to the
+subscribed callbacks.
+
+The transport is chosen with ``CACHE_BUS``:
+
+- ``auto`` (default): ``sqlite`` when more than one gunicorn worker is
+  configured (``WEB_CONCURRENCY`` or ``-w``/``--workers`` in
+  ``GUNICORN_CMD_ARGS``), ``none`` otherwise. Under gunicorn with no worker
+  count in the environment (e.g. set in a config file) a warning is logged.
+- ``none``: single-process deployments; nothing is sent.
+- ``sqlite``: events are rows in a SQLite file (``CACHE_BUS_PATH``, default
+  ``<tmp>/iam-cache-bus.sqlite3``) shared by the workers of one host. WAL
+  mode keeps publishes and polls from blocking each other, and events
+  older than ``CACHE_BUS_RETENTION`` seconds (default 300) are pruned.
+
+Polling on read rather than from a background thread keeps the bus
+fork-safe and free when nothing reads a cache; a cached value is at most
+``CACHE_BUS_POLL_INTERVAL`` seconds (default 0.5) stale after a write in
+another worker.
+"""
+
+import json
+import logging
+import os
+import shlex
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Event = Tuple[str, Any]
+
+
+class InvalidationBus(ABC):
+    """Transport for ``(table, key)`` invalidation events."""
+
+    name = 'base'
+
+    @abstractmethod
+    def publish(self, table: str, key: Any = None) -> None:
+        """Announce that ``key`` of ``table`` changed (None: whole table)."""
+
+    @abstractmethod
+    def poll(self) -> List[Event]:
+        """Return events published by other processes since the last poll."""
+
+    def close(self) -> None:
+        """Release resources held by the bus."""
+
+
+class NullBus(InvalidationBus):
+    """Bus for single-process deployments: nothing to tell anyone."""
+
+    name = 'none'
+
+    def publish(self, table: str, key: Any = None) -> None:
+        pass
+
+    def poll(self) -> List[Event]:
+        return []
+
+
+class SQLiteBus(InvalidationBus):
+    """Bus backed by a SQLite file shared by the processes of one host.
+
+    Args:
+        path (str): Database file.
+        retention (float): Seconds events are kept before being pruned.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, retention: float = 300.0):
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._origin = ''
+        self._last_seq = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process; a forked child opens its own.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_events ('
+                'seq INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, '
+                'table_name TEXT NOT NULL, key TEXT, created_at REAL NOT NULL)'
+            )
+            self._last_seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM cache_events').fetchone()[0]
+            self._origin = f'{socket.gethostname()}:{os.getpid()}'
+            self._pid = os.getpid()
+            self._conn = conn
+        return self._conn
+
+    def publish(self, table: str, key: Any = None) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                'INSERT INTO cache_events (origin, table_name, key, created_at) VALUES (?, ?, ?, ?)',
+                (self._origin, table, json.dumps(key, default=str), now)
+            )
+            conn.execute('DELETE FROM cache_events WHERE created_at < ?', (now - self.retention,))
+
+    def poll(self) -> List[Event]:
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                'SELECT seq, origin, table_name, key FROM cache_events WHERE seq > ? ORDER BY seq',
+                (self._last_seq,)
+            ).fetchall()
+            if rows:
+                self._last_seq = rows[-1][0]
+            return [(table, json.loads(key)) for _, origin, table, key in rows if origin != self._origin]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+_bus: Optional[InvalidationBus] = None
+_bus_lock = threading.Lock()
+_subscribers: List[Callable[[str, Any], None]] = []
+_last_poll = 0.0
+
+
+def configured_workers() -> Optional[int]:
+    """Gunicorn worker count set through the environment, or None."""
+    workers = os.getenv('WEB_CONCURRENCY')
+    args = shlex.split(os.getenv('GUNICORN_CMD_ARGS', ''))
+    for i, arg in enumerate(args):
+        if arg in ('-w', '--workers') and i + 1 < len(args):
+            workers = args[i + 1]
+        elif arg.startswith('--workers='):
+            workers = arg.split('=', 1)[1]
+        elif arg.startswith('-w') and arg[2:].isdigit():
+            workers = arg[2:]
+    try:
+        return int(workers) if workers else None
+    except ValueError:
+        return None
+
+
+def _create_default_bus() -> InvalidationBus:
+    bus_name = os.getenv('CACHE_BUS', 'auto').lower()
+    if bus_name == 'auto':
+        workers = configured_workers()
+        if workers is not None and workers > 1:
+            bus_name = 'sqlite'
+        else:
+            bus_name = 'none'
+            if workers is None and 'gunicorn' in sys.modules:
+                logger.warning(
+                    "CACHE_BUS=auto cannot tell how many gunicorn workers run; caches are not "
+                    "invalidated across workers. Set CACHE_BUS=sqlite when running more than one."
+                )
+    if bus_name == 'none':
+        return NullBus()
+    if bus_name == 'sqlite':
+        path = os.getenv('CACHE_BUS_PATH', os.path.join(tempfile.gettempdir(), 'iam-cache-bus.sqlite3'))
+        return SQLiteBus(path, retention=float(os.getenv('CACHE_BUS_RETENTION', '300')))
+    raise ValueError(f"Unknown CACHE_BUS: {bus_name}")
+
+
+def get_bus() -> InvalidationBus:
+    """Return the configured invalidation bus."""
+    global _bus  # noqa: PLW0603
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = _create_default_bus()
+    return _bus
+
+
+def set_bus(bus: Optional[InvalidationBus]) -> None:
+    """Install a bus (None falls back to the one configured by ``CACHE_BUS``)."""
+    global _bus, _last_poll  # noqa: PLW0603
+    with _bus_lock:
+        if _bus is not None:
+            _bus.close()
+        _bus = bus
+        _last_poll = 0.0
+
+
+def subscribe(callback: Callable[[str, Any], None]) -> None:
+    """Call ``callback(table, key)`` for every event from another process."""
+    _subscribers.append(callback)
+
+
+def publish(table: str, key: Any = None) -> None:
+    """Tell the other processes that ``key`` of ``table`` changed."""
+    try:
+        get_bus().publish(table, key)
+    except Exception:  # noqa: BLE001
+        # A missed invalidation is bounded by the cache TTL; never fail the write.
+        logger.exception("Failed to publish cache invalidation for %s", table)
+
+
+def poll(force: bool = False) -> int:
+    """Dispatch pending events, at most once per poll interval.
+
+    Returns:
+        int: Number of events dispatched.
+    """
+    global _last_poll  # noqa: PLW0603
+    now = time.monotonic()
+    if not force and now - _last_poll < float(os.getenv('CACHE_BUS_POLL_INTERVAL', '0.5')):
+        return 0
+    _last_poll = now
+    try:
+        events = get_bus().poll()
+    except Exception:  # noqa: BLE001
+        logger.exception("Failed to poll cache invalidations")
+        return 0
+    for table, key in events:
+        for callback in _subscribers:
+            callback(table, key)
+    return len(events)
@@ -0,0 +1,145 @@
+"""Response compression negotiated with ``Accept-Encoding``.
+
+JSON and text responses larger than ``COMPRESSION_MIN_SIZE`` bytes (default
+1024) are compressed with brotli when the client accepts it and the
+``brotli`` package is installed, and with gzip otherwise.
+``COMPRESSION_LEVEL`` sets the gzip level (1-9, default 6) and
+``COMPRESSION_BROTLI_QUALITY`` the brotli quality (0-11, default 4);
+``COMPRESSION_ENABLED=false`` turns compression off.
+
+Streamed responses (generators, server-sent events) are compressed chunk by
+chunk and flushed after every chunk, so each event still reaches the client
+as soon as it is produced; the size threshold does not apply to them.
+
+A compressed body is a different representation, so a strong ``ETag`` is
+turned into a weak one; If-None-Match uses weak comparison, so clients
+revalidate the compressed variant against the same tag.
+"""
+
+import gzip
+import logging
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/',
+)
+
+
+def _env_bool(name: str, default: bool = True) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def enabled() -> bool:
+    return _env_bool('COMPRESSION_ENABLED')
+
+
+def min_size() -> int:
+    return int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+
+
+def gzip_level() -> int:
+    return int(os.getenv('COMPRESSION_LEVEL', '6'))
+
+
+def brotli_quality() -> int:
+    return int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
+
+def available_encodings() -> tuple:
+    """Encodings this process can produce, in order of preference."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a whole body with ``encoding`` (``br`` or ``gzip``)."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality())
+    return gzip.compress(data, compresslevel=gzip_level(), mtime=0)
+
+
+def compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """Compress an iterable of chunks, flushing after each one."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality())
+        for chunk in chunks:
+            data = compressor.process(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            yield data + compressor.flush()
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(gzip_level(), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        yield data + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _is_compressible(response) -> bool:
+    mimetype = response.mimetype or ''
+    return any(mimetype == t or (t.endswith('/') and mimetype.startswith(t)) for t in COMPRESSIBLE_TYPES)
+
+
+def negotiate(request) -> Optional[str]:
+    """Best encoding both sides support, or None."""
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def compress_response(request, response):
+    """Compress ``response`` in place when worthwhile; returns it."""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or request.method == 'HEAD'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or not _is_compressible(response)
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size():
+            return response
+        response.set_data(compress(data, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app) -> None:
+    """Compress the responses of ``app``."""
+    from flask import request
+
+    if not enabled():
+        return
+    if brotli is None:
+        logger.info("brotli is not installed; responses are compressed with gzip only")
+
+    @app.after_request
+    def _compress_response(response):
+        return compress_response(request, response)
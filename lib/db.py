@@ -1,15 +1,206 @@
-"""Database module for the Flask application."""
+"""Database module for the Flask application.
+
+Services reach the database through :func:`get_supabase`, which returns the
+active data-access backend. Every backend exposes the PostgREST fluent API
+(``from_(table).select(...).eq(...).execute()``), so service code does not
+care whether it talks to Supabase or to the in-process stand-in used for
+offline load tests and benchmarks.
+
+The backend is chosen with the ``DB_BACKEND`` environment variable
+(``supabase`` by default, or ``memory``) or installed explicitly with
+:func:`set_backend`.
+"""
 
 import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+from lib import cache, query_stats
 
 load_dotenv()
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-supabase: Client = create_client(url, key)
+
+# Error codes for rows the database refuses, as opposed to a failure to
+# reach it: Postgres data exceptions (22), integrity constraint violations
+# (23) and undefined columns (42), PostgREST request (PGRST1xx) and schema
+# cache (PGRST2xx) errors.
+_REJECTION_CODES = ('22', '23', '42', 'PGRST1', 'PGRST2')
+
+
+def is_rejection(error: Exception) -> bool:
+    """Whether ``error`` means the database refused the data it was sent."""
+    code = getattr(error, 'code', None)
+    return isinstance(code, str) and code.startswith(_REJECTION_CODES)
+
+
+class QueryResponse:
+    """Result of an executed query, shaped like ``postgrest.APIResponse``."""
+
+    __slots__ = ('data', 'count')
+
+    def __init__(self, data: List[Any], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self):
+        return f"QueryResponse(data={self.data!r}, count={self.count!r})"
+
+
+class DatabaseBackend(ABC):
+    """Interface every data-access backend implements."""
+
+    name = 'base'
+
+    @abstractmethod
+    def from_(self, table: str):
+        """Return a PostgREST-style query builder for ``table``."""
+        ...
+
+    def table(self, table: str):
+        """Alias of :meth:`from_`, matching the supabase client."""
+        return self.from_(table)
+
+    def after_fork(self):
+        """Drop per-process state inherited from the parent process."""
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool statistics for this process."""
+        return {'backend': self.name, 'pid': os.getpid()}
+
+    def close(self):
+        """Release connections held by the backend."""
+
+
+class SupabaseBackend(DatabaseBackend):
+    """Backend that forwards queries to a Supabase/PostgREST project.
+
+    The PostgREST client is created lazily on first use, so importing the
+    service layer does not require credentials, and it sends every request
+    through a pooled keep-alive transport (see :mod:`lib.http_pool`). The
+    client is per process: after a fork (e.g. gunicorn ``--preload``) the
+    child drops the inherited client without touching its sockets and builds
+    its own on the next query.
+    """
+
+    name = 'supabase'
+
+    def __init__(self, url: Optional[str] = None, key: Optional[str] = None):
+        self.url = url or os.getenv("SUPABASE_URL")
+        self.key = key or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        self._client = None
+        self._transport = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _create_client(self):
+        from lib.http_pool import PooledPostgrestClient, PooledTransport, http2_enabled
+
+        if not self.url or not self.key:
+            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required")
+
+        transport = PooledTransport(http2=http2_enabled())
+        client = PooledPostgrestClient(
+            f"{self.url.rstrip('/')}/rest/v1",
+            api_key=self.key,
+            transport=transport,
+        )
+        return client, transport
+
+    @property
+    def client(self):
+        """Return this process's PostgREST client, creating it if needed."""
+        if self._pid != os.getpid():
+            self.after_fork()
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client, self._transport = self._create_client()
+        return self._client
+
+    def from_(self, table: str):
+        return self.client.from_(table)
+
+    def after_fork(self):
+        # The inherited sockets belong to the parent; closing them here would
+        # tear down its TLS sessions, so just forget them.
+        self._client = None
+        self._transport = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        if self._transport is None:
+            return {'backend': self.name, 'pid': self._pid, 'initialized': False}
+        return {
+            'backend': self.name,
+            'pid': self._pid,
+            'initialized': True,
+            **self._transport.pool_stats(),
+        }
+
+    def close(self):
+        if self._client is not None:
+            self._client.aclose()
+        self._client = None
+        self._transport = None
+
+
+_backend: Optional[DatabaseBackend] = None
+_backend_lock = threading.Lock()
+
+
+def _create_default_backend() -> DatabaseBackend:
+    backend_name = os.getenv("DB_BACKEND", "supabase").lower()
+    if backend_name == 'memory':
+        from lib.memory_db import InMemoryBackend
+        return InMemoryBackend(latency=float(os.getenv("DB_MEMORY_LATENCY_MS", "0")) / 1000)
+    if backend_name == 'supabase':
+        return SupabaseBackend()
+    raise ValueError(f"Unknown DB_BACKEND: {backend_name}")
+
+
+def set_backend(backend: Optional[DatabaseBackend]):
+    """Install the backend used by :func:`get_supabase`.
+
+    Args:
+        backend (DatabaseBackend, optional): Backend instance, or None to
+            fall back to the one configured by ``DB_BACKEND``.
+    """
+    global _backend  # noqa: PLW0603
+    with _backend_lock:
+        _backend = backend
+    # Cached rows belong to the previous backend.
+    cache.invalidate_all()
+
+
+def get_supabase() -> DatabaseBackend:
+    """Return the active data-access backend.
+
+    During a request the backend is wrapped so its queries are counted
+    (see lib.query_stats).
+    """
+    global _backend  # noqa: PLW0603
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_default_backend()
+    stats = query_stats.current()
+    if stats is not None:
+        return query_stats.TrackedBackend(_backend, stats)
+    return _backend
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Return connection pool statistics of the active backend."""
+    return get_supabase().pool_stats()
+
+
+def _after_fork_in_child():
+    if _backend is not None:
+        _backend.after_fork()
 
 
-def get_supabase():
-    """Return the Supabase client."""
-    return supabase
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
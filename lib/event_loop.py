@@ -0,0 +1,187 @@
+"""Long-lived event loop for running coroutines from synchronous handlers.
+
+Flask handlers are synchronous, and ``asyncio.run`` per request creates and
+closes an event loop each time, along with every async client bound to it
+(the AsyncOpenAI client and its connection pool). :func:`run` hands the
+coroutine to one event loop per process instead, which runs forever in a
+daemon thread, and blocks until it finishes::
+
+    result = run(agent.ask(prompt, conversation_id=session_id))
+    for event in iterate(agent.ask_stream(prompt, conversation_id=session_id)):
+        ...
+
+Coroutines submitted by concurrent requests share the loop, so their
+awaits overlap. Each one runs in a copy of the caller's ``contextvars``
+context, as with ``asyncio.run``, so per-request query accounting keeps
+working. ``ASYNC_RUN_TIMEOUT`` bounds the wait in seconds (default 120;
+``0`` waits forever); on timeout the coroutine is cancelled.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+# run()'s default timeout: read ASYNC_RUN_TIMEOUT
+_ENV_TIMEOUT = object()
+
+
+def default_timeout() -> Optional[float]:
+    timeout = float(os.getenv('ASYNC_RUN_TIMEOUT', '120'))
+    return timeout if timeout > 0 else None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide background event loop, started on first use."""
+    global _loop, _thread  # noqa: PLW0603
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='async-bridge', daemon=True)
+                thread.start()
+                _loop, _thread = loop, thread
+    return _loop
+
+
+def _settle(task: asyncio.Task, future: concurrent.futures.Future) -> None:
+    if task.cancelled():
+        future.cancel()
+        return
+    try:
+        if task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+    except concurrent.futures.InvalidStateError:
+        pass  # the caller cancelled it meanwhile
+
+
+def submit(coro: Coroutine) -> concurrent.futures.Future:
+    """Schedule ``coro`` on the background loop without waiting.
+
+    Cancelling the returned future cancels the coroutine.
+    """
+    loop = get_loop()
+    context = contextvars.copy_context()
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def start():
+        # The future stays pending (not running) so that it can be cancelled.
+        if future.cancelled():
+            coro.close()
+            return
+        task = context.run(loop.create_task, coro)
+        task.add_done_callback(lambda done: _settle(done, future))
+
+        def cancel_task(done):
+            if done.cancelled():
+                loop.call_soon_threadsafe(task.cancel)
+
+        future.add_done_callback(cancel_task)
+
+    loop.call_soon_threadsafe(start)
+    return future
+
+
+def run(coro: Coroutine, timeout: Any = _ENV_TIMEOUT) -> Any:
+    """Run ``coro`` on the background loop and return its result.
+
+    Args:
+        coro: The coroutine to run.
+        timeout (float, optional): Seconds to wait (default:
+            ``ASYNC_RUN_TIMEOUT``); None waits forever.
+
+    Returns:
+        The coroutine's result.
+
+    Raises:
+        TimeoutError: The coroutine did not finish in time (it is cancelled).
+        RuntimeError: Called from the loop thread, where it would deadlock;
+            await the coroutine instead.
+    """
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("event_loop.run() called from the event loop thread; await the coroutine instead")
+    if timeout is _ENV_TIMEOUT:
+        timeout = default_timeout()
+    future = submit(coro)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Coroutine did not finish within {timeout} s") from None
+
+
+async def _next_item(agen: AsyncIterator) -> Any:
+    return await agen.__anext__()
+
+
+async def _close(agen: AsyncIterator) -> None:
+    await agen.aclose()
+
+
+def iterate(agen: AsyncIterator, timeout: Any = _ENV_TIMEOUT) -> Iterator:
+    """Iterate an async generator from synchronous code.
+
+    Each item is produced on the background loop, so a streamed response
+    can relay them as they come. ``timeout`` bounds the wait for each item.
+    Closing the iterator early (the client went away) closes the generator.
+    """
+    try:
+        while True:
+            try:
+                item = run(_next_item(agen), timeout)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        run(_close(agen), timeout)
+
+
+def shutdown(timeout: float = 5) -> None:
+    """Cancel pending coroutines and stop the loop (a new one starts on next use)."""
+    global _loop, _thread  # noqa: PLW0603
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop = _thread = None
+    if loop is None:
+        return
+
+    async def cancel_pending():
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await loop.shutdown_asyncgens()
+
+    try:
+        asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result(timeout)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Event loop did not shut down cleanly: %s", e)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout)
+    if not thread.is_alive():
+        loop.close()
+
+
+def _after_fork_in_child():
+    # The loop thread does not survive fork(); start a fresh loop on demand.
+    global _loop, _thread, _lock  # noqa: PLW0603
+    _loop = _thread = None
+    _lock = threading.Lock()
+
+
+atexit.register(shutdown)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,112 @@
+"""Concurrent fan-out for independent data-layer reads.
+
+PostgREST calls are blocking HTTP roundtrips, so a request that needs several
+independent reads pays the sum of their latencies when it issues them one
+after another. :func:`fan_out` runs them on a shared thread pool instead so
+the request waits for the slowest one only::
+
+    profile, snapshot = fan_out(
+        (get_profile_by_user_id, user_id),
+        (get_latest_snapshot, user_id),
+    )
+
+Each call runs in a copy of the caller's ``contextvars`` context, so Flask's
+``g``/``current_app`` stay available inside the workers. Calls made from a
+fan-out worker run inline, which keeps nested fan-outs from deadlocking the
+bounded pool. The pool size is set with ``DB_FANOUT_WORKERS`` (default 8;
+``0`` disables fan-out and runs every call sequentially).
+"""
+
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+def _max_workers() -> int:
+    return int(os.getenv('DB_FANOUT_WORKERS', '8'))
+
+
+def _get_executor() -> Optional[ThreadPoolExecutor]:
+    global _executor  # noqa: PLW0603
+    if _max_workers() <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_max_workers(),
+                    thread_name_prefix='db-fanout',
+                    initializer=_mark_worker,
+                )
+    return _executor
+
+
+def _mark_worker():
+    _local.in_worker = True
+
+
+def _normalize(call) -> Callable[[], Any]:
+    if callable(call):
+        return call
+    func, *args = call
+    return lambda: func(*args)
+
+
+def fan_out(*calls) -> List[Any]:
+    """Run independent calls concurrently and return their results in order.
+
+    Args:
+        *calls: Zero-argument callables or ``(func, *args)`` tuples.
+
+    Returns:
+        list: One result per call, in the order given.
+
+    Raises:
+        Exception: The first exception raised by any call, after all of
+            them have finished.
+    """
+    funcs = [_normalize(call) for call in calls]
+    executor = _get_executor()
+    if len(funcs) < 2 or executor is None or getattr(_local, 'in_worker', False):
+        return [func() for func in funcs]
+
+    futures = [
+        executor.submit(contextvars.copy_context().run, func)
+        for func in funcs
+    ]
+    results, error = [], None
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:  # noqa: BLE001
+            results.append(None)
+            error = error or e
+    if error is not None:
+        raise error
+    return results
+
+
+def shutdown():
+    """Stop the worker threads (a new pool is created on next use)."""
+    global _executor  # noqa: PLW0603
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+
+
+def _after_fork_in_child():
+    # Worker threads do not survive fork(); start a fresh pool on demand.
+    global _executor, _executor_lock  # noqa: PLW0603
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,95 @@
+"""Column projection (sparse fieldsets) for PostgREST selects.
+
+List endpoints accept ``?fields=id,status,task_templates.name`` to choose the
+columns they return. :func:`build_select` turns that list into an explicit
+PostgREST column list (``id,status,task_templates(name)``) so only the
+requested columns leave the database.
+
+Embedded resources are addressed as ``<table>.<column>`` (or
+``<table>.*``) and must be allowed by the caller, which keeps clients from
+embedding arbitrary related tables.
+"""
+
+import re
+from typing import Iterable, List, Optional, Union
+
+_IDENTIFIER = re.compile(r'^(\*|[A-Za-z_][A-Za-z0-9_]*)$')
+
+
+def parse_fields(fields: Union[str, Iterable[str], None]) -> Optional[List[str]]:
+    """Normalize a ``fields`` value into a list of column tokens.
+
+    Args:
+        fields (str | list, optional): Comma-separated string or list.
+
+    Returns:
+        list: Column tokens, or None when no projection was requested.
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    tokens = [field.strip() for field in fields if field and field.strip()]
+    return tokens or None
+
+
+def build_select(fields: Union[str, Iterable[str], None], default: str = '*',
+                 embeds: Iterable[str] = ()) -> str:
+    """Translate requested fields into a PostgREST column list.
+
+    Args:
+        fields (str | list, optional): Requested fields; None uses ``default``.
+        default (str): Column list used when no fields were requested.
+        embeds (iterable): Embedded tables the caller may request.
+
+    Returns:
+        str: PostgREST select string.
+
+    Raises:
+        ValueError: If a field name is malformed or embeds a table that is
+            not allowed.
+    """
+    tokens = parse_fields(fields)
+    if not tokens:
+        return default
+
+    allowed_embeds = set(embeds)
+    columns: List[str] = []
+    embedded = {}
+    for token in tokens:
+        table, _, column = token.rpartition('.')
+        if not _IDENTIFIER.match(column) or (table and not _IDENTIFIER.match(table)):
+            raise ValueError(f"Invalid field: {token}")
+        if table:
+            if table not in allowed_embeds:
+                raise ValueError(f"Field cannot be embedded: {token}")
+            embedded.setdefault(table, [])
+            if column not in embedded[table]:
+                embedded[table].append(column)
+        elif column not in columns:
+            columns.append(column)
+
+    parts = columns + [f"{table}({','.join(cols)})" for table, cols in embedded.items()]
+    return ','.join(parts)
+
+
+def project_rows(rows: List[dict], fields: Union[str, Iterable[str], None]) -> List[dict]:
+    """Apply a sparse fieldset to rows that were read in full (e.g. cached).
+
+    Args:
+        rows (list): Full rows.
+        fields (str | list, optional): Requested fields; None keeps every column.
+
+    Returns:
+        list: Rows with only the requested columns.
+
+    Raises:
+        ValueError: If a field name is malformed or embeds a table.
+    """
+    select = build_select(fields)
+    if select == '*':
+        return rows
+    columns = select.split(',')
+    if '*' in columns:
+        return rows
+    return [{column: row.get(column) for column in columns} for row in rows]
@@ -0,0 +1,157 @@
+"""Pooled, keep-alive HTTP transport for the PostgREST client.
+
+The transport keeps persistent HTTP/1.1 (optionally HTTP/2) connections to
+the Supabase REST endpoint and counts how they are used, so connection setup
+cost can be tracked per worker:
+
+- ``requests``: requests sent through the pool
+- ``connections_opened``: new TCP connections established
+- ``waits``: requests that found every pooled connection busy
+- ``reuse_ratio``: share of requests served by an already open connection
+
+Pool sizing is configured with environment variables:
+``SUPABASE_POOL_MAX_CONNECTIONS`` (default 20),
+``SUPABASE_POOL_MAX_KEEPALIVE`` (default 10),
+``SUPABASE_POOL_KEEPALIVE_EXPIRY`` in seconds (default 30) and
+``SUPABASE_HTTP2`` (``true``/``false``, default false; needs the ``h2``
+package).
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+from postgrest import SyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from postgrest.utils import SyncClient
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_pool_limits() -> httpx.Limits:
+    """Build pool limits from the environment."""
+    return httpx.Limits(
+        max_connections=int(os.getenv('SUPABASE_POOL_MAX_CONNECTIONS', '20')),
+        max_keepalive_connections=int(os.getenv('SUPABASE_POOL_MAX_KEEPALIVE', '10')),
+        keepalive_expiry=float(os.getenv('SUPABASE_POOL_KEEPALIVE_EXPIRY', '30')),
+    )
+
+
+def http2_enabled() -> bool:
+    """Return True when HTTP/2 is requested and the ``h2`` package is present."""
+    if not _env_bool('SUPABASE_HTTP2'):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("SUPABASE_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+class PoolStats:
+    """Thread-safe counters describing how a connection pool is used."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.waits = 0
+
+    def record_request(self, waited: bool):
+        with self._lock:
+            self.requests += 1
+            if waited:
+                self.waits += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0
+            self.waits = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'waits': self.waits,
+                'reuse_ratio': round(reused / self.requests, 4) if self.requests else 0.0,
+            }
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """``httpx.HTTPTransport`` that records connection reuse and pool waits."""
+
+    def __init__(self, limits: Optional[httpx.Limits] = None, http2: bool = False, **kwargs):
+        self.limits = limits or get_pool_limits()
+        self.stats = PoolStats()
+        super().__init__(limits=self.limits, http2=http2, **kwargs)
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):  # noqa: ARG002
+        if event_name == 'connection.connect_tcp.complete':
+            self.stats.record_connection()
+
+    def _pool_saturated(self) -> bool:
+        connections = self._pool.connections
+        max_connections = self.limits.max_connections
+        if max_connections is None or len(connections) < max_connections:
+            return False
+        return not any(conn.is_available() for conn in connections)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.record_request(waited=self._pool_saturated())
+        request.extensions = {**request.extensions, 'trace': self._trace}
+        return super().handle_request(request)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return usage counters plus the current state of the pool."""
+        connections = self._pool.connections
+        return {
+            **self.stats.as_dict(),
+            'connections_open': len(connections),
+            'connections_idle': sum(1 for conn in connections if conn.is_idle()),
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections': self.limits.max_keepalive_connections,
+        }
+
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """PostgREST client whose session sends requests through ``transport``.
+
+    Args:
+        rest_url (str): PostgREST base URL (``<SUPABASE_URL>/rest/v1``).
+        api_key (str): Supabase service role key.
+        transport (PooledTransport): Shared pooled transport.
+    """
+
+    def __init__(self, rest_url: str, api_key: str, transport: PooledTransport, **kwargs):
+        self._transport = transport
+        headers = {
+            **DEFAULT_POSTGREST_CLIENT_HEADERS,
+            "apiKey": api_key,
+            "Authorization": f"Bearer {api_key}",
+        }
+        super().__init__(rest_url, headers=headers, **kwargs)
+
+    def create_session(self, base_url, headers, timeout) -> SyncClient:
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=self._transport,
+        )
@@ -0,0 +1,68 @@
+"""Request-scoped identity map for rows fetched by primary key.
+
+A single request often reads the same row more than once: the controller
+loads a task to check ownership, then a tool or service loads it again. The
+by-id service getters consult this map first and their own writes keep it
+current, so each row costs at most one read per request::
+
+    row = identity_map.get('tasks_mind', task_id)
+    if row is identity_map.MISSING:
+        row = ...fetch...
+        identity_map.put('tasks_mind', task_id, row)
+
+Entries live on ``flask.g`` and disappear with the application context.
+Outside a context (scripts, the agent CLI) every lookup misses and nothing is
+stored, so callers behave exactly as without the map.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from flask import g, has_app_context
+
+MISSING = object()
+
+_Key = Tuple[str, Any]
+
+
+def _rows() -> Optional[Dict[_Key, dict]]:
+    if not has_app_context():
+        return None
+    rows = g.get('_identity_map')
+    if rows is None:
+        rows = g._identity_map = {}
+    return rows
+
+
+def get(table: str, key: Any):
+    """Return the cached row for ``(table, key)`` or :data:`MISSING`."""
+    rows = _rows()
+    if rows is None or (table, key) not in rows:
+        return MISSING
+    return dict(rows[(table, key)])
+
+
+def put(table: str, key: Any, row: Optional[dict]) -> Optional[dict]:
+    """Remember a row read by primary key and return it."""
+    rows = _rows()
+    if rows is not None and row is not None:
+        rows[(table, key)] = dict(row)
+    return row
+
+
+def merge(table: str, key: Any, changes: Optional[dict]) -> Optional[dict]:
+    """Apply a write's returned columns to a cached row and return them.
+
+    Only rows already in the map are touched: a write result lacks the
+    embedded resources a by-id read returns, so it cannot seed the map.
+    """
+    rows = _rows()
+    if rows is not None and changes is not None and (table, key) in rows:
+        rows[(table, key)].update(changes)
+    return changes
+
+
+def discard(table: str, key: Any) -> None:
+    """Forget a row (after deletes or writes that change its embeds)."""
+    rows = _rows()
+    if rows is not None:
+        rows.pop((table, key), None)
@@ -0,0 +1,97 @@
+"""JSON provider backed by orjson for ``jsonify`` and ``request.get_json``.
+
+Controllers return large lists of rows through ``jsonify``, and encoding
+them with the stdlib ``json`` module is one of the biggest CPU costs of a
+request. :class:`OrjsonProvider` encodes and decodes with ``orjson``, which
+is several times faster, and produces the same documents as Flask's
+default provider:
+
+- keys are sorted;
+- ``datetime``/``date`` values use the HTTP date format, and ``Decimal``
+  and ``UUID`` values become strings (Flask's ``default`` hook);
+- whatever orjson rejects (integers wider than 64 bits, non-string keys,
+  ``NaN`` in request bodies) is handed to the stdlib instead of failing.
+
+The provider is chosen with ``JSON_PROVIDER``: ``auto`` (default: orjson
+when installed), ``orjson`` or ``stdlib``.
+"""
+
+import json
+import logging
+import os
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json only
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson."""
+
+    def _options(self, **kwargs: Any) -> int:
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.pop('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.pop('indent', None):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumpb(self, obj: Any, **kwargs: Any) -> bytes:
+        kwargs.pop('separators', None)
+        kwargs.pop('ensure_ascii', None)
+        default = kwargs.pop('default', self.default)
+        if kwargs.keys() - {'sort_keys', 'indent'}:
+            raise TypeError  # options orjson has no equivalent for
+        return orjson.dumps(obj, default=default, option=self._options(**kwargs))
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        try:
+            return self._dumpb(obj, **kwargs).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # Let the stdlib accept what it accepts (NaN, huge integers) and
+            # raise its usual error for the rest.
+            return json.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._dumpb(obj, indent=indent)
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def get_provider_class():
+    """Provider class selected by ``JSON_PROVIDER``."""
+    name = os.getenv('JSON_PROVIDER', 'auto').strip().lower()
+    if name not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f"Unknown JSON_PROVIDER: {name}")
+    if name == 'stdlib':
+        return DefaultJSONProvider
+    if orjson is None and name == 'auto':
+        logger.info("orjson is not installed; encoding JSON with the json module")
+        return DefaultJSONProvider
+    if orjson is None:
+        logger.warning("JSON_PROVIDER is 'orjson' but the 'orjson' package is not installed; using json")
+        return DefaultJSONProvider
+    return OrjsonProvider
+
+
+def init_app(app) -> None:
+    """Install the configured JSON provider on ``app``."""
+    app.json = get_provider_class()(app)
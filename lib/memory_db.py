@@ -0,0 +1,377 @@
+"""In-process data-access backend.
+
+Implements the subset of the PostgREST query builder API used by the service
+layer (``select``/``insert``/``update``/``delete`` with ``eq``, ``neq``,
+``gt``, ``gte``, ``lt``, ``lte``, ``in_``, ``is_``, ``order``, ``limit`` and
+embedded resources such as ``task_templates(*)``) on top of plain Python
+lists, so the whole Flask app can be load-tested and profiled offline.
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from lib.db import DatabaseBackend, QueryResponse
+
+# Foreign key column used to resolve an embedded resource, keyed by the
+# embedded table name (e.g. ``tasks_mind.template_id -> task_templates.id``).
+DEFAULT_RELATIONS = {
+    'task_templates': 'template_id',
+    'chat_ia_sessions': 'session_id',
+    'users_iam': 'user_id',
+}
+
+
+def _clone(value):
+    """Copy JSON-like values so callers never mutate the stored rows."""
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    return value
+
+
+def _split_columns(columns: str) -> List[str]:
+    """Split a PostgREST column list on top-level commas."""
+    parts, depth, current = [], 0, []
+    for char in columns:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+
+def _parse_columns(columns: str):
+    """Parse ``'id, status, task_templates(name, reward_xp)'``.
+
+    Returns:
+        tuple: (list of plain columns or None for ``*``, dict of embeds).
+    """
+    plain, embeds = [], {}
+    for part in _split_columns(columns or '*'):
+        if '(' in part and part.endswith(')'):
+            name, inner = part[:-1].split('(', 1)
+            embeds[name.strip()] = _parse_columns(inner)
+        elif part == '*':
+            plain = None
+        elif plain is not None:
+            plain.append(part)
+    return plain, embeds
+
+
+def _project(row: Dict[str, Any], columns) -> Dict[str, Any]:
+    if columns is None:
+        return _clone(row)
+    return {col: _clone(row.get(col)) for col in columns}
+
+
+class _Comparable:
+    """Sort key that places NULLs like PostgreSQL (last on ASC)."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        if self.value is None:
+            return False
+        if other.value is None:
+            return True
+        return self.value < other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _coerce(current, value):
+    """Cast a filter value parsed from text to the stored column's type."""
+    if isinstance(value, str) and current is not None and not isinstance(current, str):
+        try:
+            return type(current)(value)
+        except (TypeError, ValueError):
+            return value
+    return value
+
+
+def _parse_logic(expression: str):
+    """Parse a PostgREST logic tree such as ``a.lt.1,and(a.eq.1,id.lt.x)``.
+
+    Returns:
+        list: Conditions, each ``('and'|'or', [conditions])`` or
+            ``(column, op, value)``.
+    """
+    conditions = []
+    for part in _split_columns(expression):
+        if part.startswith(('and(', 'or(')) and part.endswith(')'):
+            operator, inner = part[:-1].split('(', 1)
+            conditions.append((operator, _parse_logic(inner)))
+            continue
+        column, op, value = part.split('.', 2)
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        elif value == 'null':
+            value = None
+        conditions.append((column, op, value))
+    return conditions
+
+
+def _eval_logic(row, operator, conditions):
+    results = (
+        _eval_logic(row, *condition) if len(condition) == 2
+        else _matches(row, condition[0], condition[1], _coerce(row.get(condition[0]), condition[2]))
+        for condition in conditions
+    )
+    return all(results) if operator == 'and' else any(results)
+
+
+def _matches(row, column, op, value):
+    if op == 'logic':
+        return _eval_logic(row, column, value)
+    current = row.get(column)
+    if op == 'eq':
+        return current == value
+    if op == 'neq':
+        return current != value
+    if op == 'is':
+        return current is value
+    if op == 'in':
+        return current in value
+    if current is None or value is None:
+        return False
+    if op == 'gt':
+        return current > value
+    if op == 'gte':
+        return current >= value
+    if op == 'lt':
+        return current < value
+    if op == 'lte':
+        return current <= value
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+class InMemoryQueryBuilder:
+    """Fluent query builder mirroring ``postgrest.SyncRequestBuilder``."""
+
+    def __init__(self, backend: 'InMemoryBackend', table: str):
+        self._backend = backend
+        self._table = table
+        self._method = 'select'
+        self._columns = '*'
+        self._payload = None
+        self._upsert = False
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._offset = 0
+
+    # ---- statements -------------------------------------------------
+    def select(self, *columns: str, count: Optional[str] = None):  # noqa: ARG002
+        self._method = 'select'
+        self._columns = ','.join(columns) if columns else '*'
+        return self
+
+    def insert(self, json, *, upsert: bool = False, **kwargs):  # noqa: ARG002
+        self._method = 'insert'
+        self._payload = json
+        self._upsert = upsert
+        return self
+
+    def update(self, json: dict, **kwargs):  # noqa: ARG002
+        self._method = 'update'
+        self._payload = json
+        return self
+
+    def delete(self, **kwargs):  # noqa: ARG002
+        self._method = 'delete'
+        return self
+
+    # ---- filters ----------------------------------------------------
+    def _filter(self, column, op, value):
+        self._filters.append((column, op, value))
+        return self
+
+    def eq(self, column: str, value: Any):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value: Any):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value: Any):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value: Any):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value: Any):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value: Any):
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column: str, values):
+        return self._filter(column, 'in', list(values))
+
+    def is_(self, column: str, value: Any):
+        return self._filter(column, 'is', value)
+
+    def or_(self, filters: str, reference_table: Optional[str] = None):  # noqa: ARG002
+        return self._filter('or', 'logic', _parse_logic(filters))
+
+    # ---- modifiers --------------------------------------------------
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = False,
+              foreign_table: Optional[str] = None):  # noqa: ARG002
+        # Build the ``order`` param like postgrest-py does (the flags land on
+        # the last key), so the multi-key form ``'a.desc.nullslast,b'`` works.
+        param = f"{column}{'.desc' if desc else ''}{'.nullsfirst' if nullsfirst else ''}"
+        for term in param.split(','):
+            name, *modifiers = term.strip().split('.')
+            term_desc = 'desc' in modifiers
+            if 'nullsfirst' in modifiers or 'nullslast' in modifiers:
+                term_nullsfirst = 'nullsfirst' in modifiers
+            else:
+                term_nullsfirst = term_desc  # PostgreSQL's default
+            self._order.append((name, term_desc, term_nullsfirst))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None):  # noqa: ARG002
+        self._limit = size
+        return self
+
+    def offset(self, size: int):
+        self._offset = size
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # ---- execution --------------------------------------------------
+    def _where(self, row) -> bool:
+        return all(_matches(row, col, op, val) for col, op, val in self._filters)
+
+    def execute(self) -> QueryResponse:
+        if self._backend.latency:
+            time.sleep(self._backend.latency)
+        with self._backend.lock:
+            rows = self._backend.rows(self._table)
+            if self._method == 'insert':
+                data = self._backend.insert_rows(self._table, self._payload, upsert=self._upsert)
+            elif self._method == 'update':
+                data = []
+                for row in rows:
+                    if self._where(row):
+                        row.update(_clone(self._payload))
+                        data.append(_clone(row))
+            elif self._method == 'delete':
+                keep, data = [], []
+                for row in rows:
+                    (data if self._where(row) else keep).append(row)
+                rows[:] = keep
+            else:
+                data = self._run_select(rows)
+        return QueryResponse(data=data, count=len(data))
+
+    def _run_select(self, rows):
+        matched = [row for row in rows if self._where(row)]
+        for column, desc, nullsfirst in reversed(self._order):
+            matched.sort(key=lambda r, c=column: _Comparable(r.get(c)), reverse=desc)
+            matched.sort(key=lambda r, c=column: (r.get(c) is None) != nullsfirst)
+        if self._offset:
+            matched = matched[self._offset:]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+
+        columns, embeds = _parse_columns(self._columns)
+        result = []
+        for row in matched:
+            item = _project(row, columns)
+            for embed_table, (embed_columns, _) in embeds.items():
+                item[embed_table] = self._backend.resolve_embed(
+                    row, embed_table, embed_columns
+                )
+            result.append(item)
+        return result
+
+
+class InMemoryBackend(DatabaseBackend):
+    """Data-access backend that keeps every table in process memory.
+
+    Args:
+        tables (dict, optional): Initial rows keyed by table name.
+        relations (dict, optional): Embedded table -> foreign key column
+            overrides, merged over ``DEFAULT_RELATIONS``.
+        latency (float): Seconds each query sleeps before running, to
+            simulate the network roundtrip to PostgREST in benchmarks.
+    """
+
+    name = 'memory'
+
+    def __init__(self, tables: Optional[Dict[str, List[dict]]] = None,
+                 relations: Optional[Dict[str, str]] = None,
+                 latency: float = 0.0):
+        self.lock = threading.RLock()
+        self.latency = latency
+        self.relations = {**DEFAULT_RELATIONS, **(relations or {})}
+        self._tables: Dict[str, List[dict]] = {}
+        for table, rows in (tables or {}).items():
+            self.seed(table, rows)
+
+    def from_(self, table: str) -> InMemoryQueryBuilder:
+        return InMemoryQueryBuilder(self, table)
+
+    def rows(self, table: str) -> List[dict]:
+        """Return the live row list for a table (creating it if needed)."""
+        return self._tables.setdefault(table, [])
+
+    def seed(self, table: str, rows: List[dict]) -> List[dict]:
+        """Insert fixture rows, generating ids/timestamps when missing."""
+        with self.lock:
+            return self.insert_rows(table, rows)
+
+    def insert_rows(self, table: str, payload, upsert: bool = False) -> List[dict]:
+        items = payload if isinstance(payload, list) else [payload]
+        stored = self.rows(table)
+        by_id = {row.get('id'): row for row in stored} if upsert else {}
+        now = datetime.now(timezone.utc).isoformat()
+        inserted = []
+        for item in items:
+            existing = by_id.get(item.get('id'))
+            if existing is not None:
+                existing.update(_clone(item))
+                inserted.append(_clone(existing))
+                continue
+            row = _clone(item)
+            row.setdefault('id', str(uuid.uuid4()))
+            row.setdefault('created_at', now)
+            stored.append(row)
+            by_id[row['id']] = row
+            inserted.append(_clone(row))
+        return inserted
+
+    def resolve_embed(self, row: dict, embed_table: str, columns):
+        """Resolve a many-to-one embedded resource for ``row``."""
+        fk = self.relations.get(embed_table, f"{embed_table.rstrip('s')}_id")
+        target_id = row.get(fk)
+        if target_id is None:
+            return None
+        for candidate in self.rows(embed_table):
+            if candidate.get('id') == target_id:
+                return _project(candidate, columns)
+        return None
+
+    def reset(self):
+        """Drop every table."""
+        with self.lock:
+            self._tables.clear()
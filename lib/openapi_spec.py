@@ -0,0 +1,147 @@
+"""Precomputed OpenAPI spec, rendered at build time and served as a file.
+
+flasgger builds ``/apispec_1.json`` by parsing the YAML docstring of every
+route, which is slow with route modules as large as ``stats_routes``. The
+spec only changes when the code does, so it can be rendered once per
+release::
+
+    python -m lib.openapi_spec build [--output openapi.json]
+    python -m lib.openapi_spec check [--output openapi.json]   # 1 if stale
+
+With ``SWAGGER_SPEC_FILE`` pointing at the rendered file, ``/apispec_1.json``
+returns its bytes as they are: no docstring is parsed, and the ETag, the
+``Last-Modified`` date and the compressed variants are computed once when
+the file is loaded. The Swagger UI (``SWAGGER_ENABLED``) keeps working on
+top of the file; with ``SWAGGER_ENABLED=false`` only the JSON is served.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from lib import compression
+
+logger = logging.getLogger(__name__)
+
+SPEC_ROUTE = '/apispec_1.json'
+SPEC_ENDPOINT = 'apispec_1'
+DEFAULT_OUTPUT = 'openapi.json'
+
+# Shared caches may keep the spec for a while; it only changes on deploy.
+CACHE_CONTROL = 'public, max-age=300'
+
+
+class StaticSpec:
+    """A rendered spec file, held in memory with its validators."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as handle:
+            self.data = handle.read()
+        json.loads(self.data)  # refuse to serve a truncated or broken file
+        self.path = path
+        self.etag = hashlib.sha1(self.data).hexdigest()[:32]
+        self.last_modified = datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc).replace(microsecond=0)
+        self._encoded: Dict[str, bytes] = {}
+
+    def body(self, encoding: Optional[str] = None) -> bytes:
+        """The spec, compressed with ``encoding`` when given (cached)."""
+        if encoding is None:
+            return self.data
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compression.compress(self.data, encoding)
+        return self._encoded[encoding]
+
+    def response(self, request):
+        """Response for ``request``: the spec, or 304 when unchanged."""
+        from flask import current_app
+
+        encoding = compression.negotiate(request) if compression.enabled() else None
+        response = current_app.response_class(self.body(encoding), mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.set_etag(self.etag, weak=encoding is not None)
+        response.last_modified = self.last_modified
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        return response.make_conditional(request)
+
+
+def init_app(app) -> Optional[StaticSpec]:
+    """Serve ``SWAGGER_SPEC_FILE`` at ``/apispec_1.json``.
+
+    Call after the Swagger UI is set up, whose runtime spec view gets
+    replaced. A missing file is logged and leaves the runtime spec alone.
+
+    Returns:
+        StaticSpec or None: The loaded spec, if any.
+    """
+    from flask import request
+
+    path = app.config.get('SWAGGER_SPEC_FILE')
+    if not path:
+        return None
+    if not os.path.isfile(path):
+        logger.warning("SWAGGER_SPEC_FILE %s does not exist; run 'python -m lib.openapi_spec build'", path)
+        return None
+
+    spec = StaticSpec(path)
+
+    def serve_spec():
+        return spec.response(request)
+
+    flasgger_endpoint = f'flasgger.{SPEC_ENDPOINT}'
+    if flasgger_endpoint in app.view_functions:
+        app.view_functions[flasgger_endpoint] = serve_spec
+    else:
+        app.add_url_rule(SPEC_ROUTE, SPEC_ENDPOINT, serve_spec)
+    return spec
+
+
+def render() -> bytes:
+    """Render the spec by letting flasgger parse every route once."""
+    from app import create_app
+
+    app = create_app({'SWAGGER_ENABLED': True, 'SWAGGER_SPEC_FILE': None, 'TESTING': True})
+    response = app.test_client().get(SPEC_ROUTE, headers={'Accept-Encoding': 'identity'})
+    if response.status_code != 200:
+        raise RuntimeError(f"{SPEC_ROUTE} returned {response.status_code}")
+    # Sorted keys, so rebuilding an unchanged API gives the same bytes.
+    return json.dumps(response.get_json(), sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=('build', 'check'),
+                        help='write the spec, or exit with 1 when the file is stale')
+    parser.add_argument('--output', default=os.getenv('SWAGGER_SPEC_FILE') or DEFAULT_OUTPUT,
+                        help=f'spec file (default: $SWAGGER_SPEC_FILE or {DEFAULT_OUTPUT})')
+    args = parser.parse_args(argv)
+
+    data = render()
+    if args.command == 'check':
+        try:
+            with open(args.output, 'rb') as handle:
+                current = handle.read()
+        except FileNotFoundError:
+            current = None
+        if current != data:
+            print(f"{args.output} is out of date; run 'python -m lib.openapi_spec build'")
+            return 1
+        print(f"{args.output} is up to date")
+        return 0
+
+    partial = f'{args.output}.tmp'
+    with open(partial, 'wb') as handle:
+        handle.write(data)
+    os.replace(partial, args.output)
+    print(f"Wrote {args.output} ({len(data)} bytes, {len(json.loads(data).get('paths', {}))} paths)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
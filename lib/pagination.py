@@ -0,0 +1,161 @@
+"""Keyset (cursor) pagination for list queries.
+
+Pages are ordered by ``(<sort column>, id)`` and a cursor is an opaque token
+holding the sort value and id of the last row returned. The next page asks
+PostgREST for rows strictly after that pair::
+
+    created_at.lt.<v>  OR  (created_at.eq.<v> AND id.lt.<id>)
+
+which an index on ``(user_id, created_at, id)`` answers without scanning the
+rows already seen, so page cost stays the same however long the history is.
+
+NULL sort values are ordered last in both directions and kept as JSON
+``null`` in the cursor, so a page can end on a row without a sort value.
+Endpoints fetch one row more than the page size: the extra row only tells
+:func:`page_response` that there is a next page, so no cursor is sent for
+the last page even when it is exactly full.
+"""
+
+import base64
+import json
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from flask import jsonify
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(value: Any, row_id: Any) -> str:
+    """Build an opaque cursor from a sort value and row id."""
+    raw = json.dumps([value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    return value, row_id
+
+
+def _quote(value: Any) -> str:
+    if value is None:
+        raise ValueError("Cannot compare against NULL")
+    text = str(value)
+    if any(char in text for char in ',.:()" '):
+        return '"' + text.replace('"', '\\"') + '"'
+    return text
+
+
+def _or_filter(query, expression: str):
+    # postgrest-py < 0.15 has no or_(); add the logic tree param directly.
+    if hasattr(query, 'or_'):
+        return query.or_(expression)
+    query.params = query.params.add('or', f'({expression})')
+    return query
+
+
+def keyset_fields(fields: Union[str, Iterable[str], None], column: str):
+    """Make sure a sparse fieldset still returns the cursor columns."""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    fields = [field.strip() for field in fields if field and field.strip()]
+    if not fields or '*' in fields:
+        return fields or None
+    return fields + [col for col in ('id', column) if col not in fields]
+
+
+def apply_keyset(query, column: str, desc: bool = True,
+                 cursor: Optional[str] = None, limit: Optional[int] = None):
+    """Order ``query`` by ``(column, id)`` and restrict it to one page.
+
+    Args:
+        query: PostgREST query builder (after filters).
+        column (str): Sort column (e.g. ``created_at``).
+        desc (bool): Newest first when True.
+        cursor (str, optional): Cursor of the last row of the previous page.
+        limit (int, optional): Page size; None returns every remaining row.
+
+    Returns:
+        The query builder.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        op = 'lt' if desc else 'gt'
+        after_id = f"id.{op}.{_quote(row_id)}"
+        if value is None:
+            # NULLs sort last, so only rows that are also NULL can follow.
+            expression = f"and({column}.is.null,{after_id})"
+        else:
+            expression = (
+                f"{column}.{op}.{_quote(value)},"
+                f"and({column}.eq.{_quote(value)},{after_id}),"
+                f"{column}.is.null"
+            )
+        query = _or_filter(query, expression)
+    # One ``order`` param with both keys; PostgREST does not merge repeated ones.
+    direction = '.desc' if desc else ''
+    query = query.order(f"{column}{direction}.nullslast,id", desc=desc)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def next_cursor(rows: List[dict], column: str, limit: Optional[int]) -> Optional[str]:
+    """Return the cursor for the page after ``rows``, or None on the last page.
+
+    ``rows`` is the result of a query for ``limit + 1`` rows; there is a next
+    page only when that extra row came back.
+    """
+    if not limit or len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.get(column), last.get('id'))
+
+
+def parse_page_args(args) -> Tuple[int, Optional[str]]:
+    """Read ``limit`` and ``cursor`` from request query args.
+
+    Raises:
+        ValueError: If ``limit`` is not a positive integer.
+    """
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError) as e:
+        raise ValueError("limit must be an integer") from e
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    cursor = args.get('cursor') or None
+    if cursor:
+        decode_cursor(cursor)
+    return min(limit, MAX_PAGE_SIZE), cursor
+
+
+def page_response(rows: List[dict], column: str, limit: Optional[int]):
+    """JSON response for one page, with the next cursor in a header.
+
+    The body stays a plain list so existing clients keep working; clients
+    that page follow ``X-Next-Cursor`` until it is absent.
+
+    Args:
+        rows (list): Rows fetched with ``limit + 1``; the extra row is not
+            returned.
+        column (str): Sort column of the page.
+        limit (int, optional): Page size.
+    """
+    cursor = next_cursor(rows, column, limit)
+    response = jsonify(rows[:limit] if limit else rows)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return response, 200
@@ -0,0 +1,252 @@
+"""Per-request database query accounting.
+
+While a request is being handled, :func:`lib.db.get_supabase` hands out a
+:class:`TrackedBackend` whose query builders record, for every executed
+query, its table, its *shape* (the chain of builder calls with column names
+but without values, e.g. ``tasks_mind select(*) eq(id)``) and how long it
+took. At the end of the request the numbers are folded into per-route
+totals and checked against two limits:
+
+- ``QUERY_BUDGET`` (default 10): more queries than this in one request
+  logs a warning.
+- ``QUERY_REPEAT_LIMIT`` (default 3): the same query shape executed this
+  many times in one request logs a possible N+1 warning.
+
+With ``QUERY_STATS_HEADER=true`` (or when the app runs in debug mode) each
+response carries ``X-DB-Queries``, ``X-DB-Time-Ms`` and ``X-DB-Tables``
+headers, ``GET /api/debug/query-stats`` returns the per-route totals,
+``GET /api/debug/cache-stats`` the counters of the in-process caches and
+``GET /api/debug/pool-stats`` those of this worker's database connection
+pool.
+
+Fan-out workers run in a copy of the request's context, so their queries
+are counted against the request that issued them.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar = contextvars.ContextVar('query_stats', default=None)
+
+
+class RequestQueryStats:
+    """Queries executed while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.tables: Counter = Counter()
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, table: str, shape: str, elapsed: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.db_time += elapsed
+            self.tables[table] += 1
+            self.shapes[shape] += 1
+
+    def repeated(self, limit: int) -> Dict[str, int]:
+        """Query shapes executed at least ``limit`` times."""
+        return {shape: n for shape, n in self.shapes.items() if n >= limit}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'queries': self.count,
+            'db_time_ms': round(self.db_time * 1000, 2),
+            'tables': dict(self.tables),
+            'shapes': dict(self.shapes),
+        }
+
+
+class _TrackedQuery:
+    """Proxy around a query builder that records the query on execute."""
+
+    __slots__ = ('_query', '_table', '_stats', '_shape')
+
+    def __init__(self, query, table: str, stats: RequestQueryStats, shape: str):
+        object.__setattr__(self, '_query', query)
+        object.__setattr__(self, '_table', table)
+        object.__setattr__(self, '_stats', stats)
+        object.__setattr__(self, '_shape', shape)
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, 'execute'):
+                return result
+            # Column names (select lists, filter columns) are part of the
+            # shape; values and write payloads are not.
+            if args and isinstance(args[0], str) and name not in ('insert', 'update', 'upsert'):
+                step = f'{name}({args[0]})'
+            else:
+                step = name
+            return _TrackedQuery(result, self._table, self._stats, f'{self._shape} {step}')
+
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._query, name, value)
+
+    def execute(self):
+        start = time.perf_counter()
+        try:
+            return self._query.execute()
+        finally:
+            self._stats.record(self._table, self._shape, time.perf_counter() - start)
+
+
+class TrackedBackend:
+    """Backend wrapper that counts the queries of the current request."""
+
+    __slots__ = ('_backend', '_stats')
+
+    def __init__(self, backend, stats: RequestQueryStats):
+        self._backend = backend
+        self._stats = stats
+
+    def from_(self, table: str):
+        return _TrackedQuery(self._backend.from_(table), table, self._stats, table)
+
+    def table(self, table: str):
+        return self.from_(table)
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+
+def current() -> Optional[RequestQueryStats]:
+    """Stats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def start() -> RequestQueryStats:
+    """Begin counting queries for the current request."""
+    stats = RequestQueryStats()
+    _current.set(stats)
+    return stats
+
+
+# ---- per-route aggregation ------------------------------------------
+_routes: Dict[str, Dict[str, Any]] = {}
+_routes_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def finish(route: str) -> Optional[RequestQueryStats]:
+    """Stop counting, fold the request into the route totals and warn
+    about budget overruns or repeated query shapes.
+    """
+    stats = _current.get()
+    if stats is None:
+        return None
+    _current.set(None)
+
+    budget = _env_int('QUERY_BUDGET', 10)
+    repeated = stats.repeated(_env_int('QUERY_REPEAT_LIMIT', 3))
+    with _routes_lock:
+        totals = _routes.setdefault(route, {
+            'requests': 0, 'queries': 0, 'max_queries': 0, 'db_time_ms': 0.0,
+            'over_budget': 0, 'repeated_shapes': 0,
+        })
+        totals['requests'] += 1
+        totals['queries'] += stats.count
+        totals['max_queries'] = max(totals['max_queries'], stats.count)
+        totals['db_time_ms'] = round(totals['db_time_ms'] + stats.db_time * 1000, 2)
+        totals['over_budget'] += stats.count > budget
+        totals['repeated_shapes'] += bool(repeated)
+
+    if stats.count > budget:
+        logger.warning("%s ran %d queries (budget %d): %s", route, stats.count, budget, dict(stats.tables))
+    for shape, n in repeated.items():
+        logger.warning("%s repeated query %d times (possible N+1): %s", route, n, shape)
+    return stats
+
+
+def get_route_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-route totals, with the average number of queries per request."""
+    with _routes_lock:
+        return {
+            route: dict(totals, avg_queries=round(totals['queries'] / totals['requests'], 2))
+            for route, totals in _routes.items()
+        }
+
+
+def reset_route_stats() -> None:
+    with _routes_lock:
+        _routes.clear()
+
+
+def init_app(app) -> None:
+    """Count the queries of every request handled by ``app``."""
+    from flask import jsonify, request
+
+    from lib.cache import get_cache_stats
+    from lib.db import get_pool_stats
+
+    show_header = os.getenv('QUERY_STATS_HEADER', str(app.debug)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+    @app.before_request
+    def _start_query_stats():
+        start()
+
+    @app.after_request
+    def _finish_query_stats(response):
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        stats = finish(f'{request.method} {rule}')
+        if show_header and stats is not None:
+            response.headers['X-DB-Queries'] = str(stats.count)
+            response.headers['X-DB-Time-Ms'] = f'{stats.db_time * 1000:.2f}'
+            response.headers['X-DB-Tables'] = ','.join(f'{t}:{n}' for t, n in stats.tables.items())
+        return response
+
+    if show_header:
+        @app.route('/api/debug/query-stats', methods=['GET'])
+        def query_stats():
+            """Per-route database query totals (debug only).
+            ---
+            tags:
+              - Debug
+            responses:
+              200:
+                description: Requests, queries, max queries and DB time per route
+            """
+            return jsonify(get_route_stats()), 200
+
+        @app.route('/api/debug/cache-stats', methods=['GET'])
+        def cache_stats():
+            """Hit/miss counters of the in-process caches (debug only).
+            ---
+            tags:
+              - Debug
+            responses:
+              200:
+                description: Hits, misses, loads and size per cached table
+            """
+            return jsonify(get_cache_stats()), 200
+
+        @app.route('/api/debug/pool-stats', methods=['GET'])
+        def pool_stats():
+            """Connection pool counters of this worker (debug only).
+            ---
+            tags:
+              - Debug
+            responses:
+              200:
+                description: Requests, connections opened and reused, pool waits and open connections
+            """
+            return jsonify(get_pool_stats()), 200
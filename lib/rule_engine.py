@@ -0,0 +1,384 @@
+"""Compiled evaluation of bot rules.
+
+A rule's ``condition`` is a JSON object matched against an event (a flat or
+nested dict such as ``{"type": "task_completed", "category": "mind"}``):
+
+- ``"event"``: event type, or list of types, the rule reacts to. Rules
+  without it are considered for every event.
+- ``"<field>": value``: the event field equals ``value``. A list value
+  means "is one of". Dotted names (``"task.category"``) reach into nested
+  objects.
+- ``"<field>": {"<op>": value, ...}``: every operator must hold; operators
+  are ``eq``, ``ne``, ``gt``, ``gte``, ``lt``, ``lte``, ``in``, ``nin``,
+  ``contains`` and ``exists``.
+- ``"all"``, ``"any"``: lists of nested conditions; ``"not"``: one.
+
+A field missing from the event fails every test except ``exists: false``.
+Schedule conditions written as ``{"time": "08:00", "days": [...]}`` match
+events carrying ``time`` and ``day``.
+
+:func:`compile_condition` turns a condition into a predicate once, and
+:class:`RuleSet` indexes compiled rules by event type and by one field the
+rule requires, so an event is only tested against rules that can match it.
+:class:`RuleEngine` keeps the rule set of a table loaded, rebuilding it
+after writes, after ``ttl`` seconds or when another worker changes the
+table (it registers with lib.cache like the other caches).
+"""
+
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from lib import cache, cache_bus
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[dict], bool]
+
+_MISSING = object()
+
+# Legacy schedule conditions name the list of days ``days``; events carry one ``day``.
+FIELD_ALIASES = {'days': 'day'}
+
+_LOGICAL_KEYS = ('all', 'any', 'not')
+
+
+def _getter(path: str) -> Callable[[dict], Any]:
+    parts = path.split('.')
+    if len(parts) == 1:
+        return lambda event: event.get(path, _MISSING)
+
+    def get(event):
+        value = event
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                return _MISSING
+            value = value[part]
+        return value
+
+    return get
+
+
+def _compare(op: Callable[[Any, Any], bool], expected: Any) -> Callable[[Any], bool]:
+    def test(value):
+        try:
+            return op(value, expected)
+        except TypeError:
+            return False
+
+    return test
+
+
+def _contains(value, expected):
+    return isinstance(value, (str, list, tuple, dict)) and expected in value
+
+
+def _operator(name: str, expected: Any) -> Callable[[Any], bool]:
+    if name == 'eq':
+        return lambda value: value == expected
+    if name == 'ne':
+        return lambda value: value != expected
+    if name in ('in', 'nin'):
+        if not isinstance(expected, list):
+            raise ValueError(f"Operator '{name}' expects a list")
+        try:
+            members = frozenset(expected)
+        except TypeError:
+            members = list(expected)  # unhashable members: linear scan
+        if name == 'in':
+            return _compare(lambda value, _: value in members, None)
+        return _compare(lambda value, _: value not in members, None)
+    if name == 'gt':
+        return _compare(lambda value, limit: value > limit, expected)
+    if name == 'gte':
+        return _compare(lambda value, limit: value >= limit, expected)
+    if name == 'lt':
+        return _compare(lambda value, limit: value < limit, expected)
+    if name == 'lte':
+        return _compare(lambda value, limit: value <= limit, expected)
+    if name == 'contains':
+        return _compare(_contains, expected)
+    raise ValueError(f"Unknown operator: {name}")
+
+
+def _field_predicate(field: str, spec: Any) -> Predicate:
+    get = _getter(FIELD_ALIASES.get(field, field))
+
+    if isinstance(spec, dict):
+        if not spec:
+            raise ValueError(f"Empty operator object for field '{field}'")
+        exists = spec.get('exists')
+        if exists is not None and not isinstance(exists, bool):
+            raise ValueError("Operator 'exists' expects true or false")
+        tests = [_operator(name, expected) for name, expected in spec.items() if name != 'exists']
+        if exists is False:
+            return lambda event: get(event) is _MISSING
+    elif isinstance(spec, list):
+        tests = [_operator('in', spec)]
+    else:
+        tests = [_operator('eq', spec)]
+
+    if len(tests) == 1:
+        test = tests[0]
+
+        def check_one(event):
+            value = get(event)
+            return value is not _MISSING and test(value)
+
+        return check_one
+
+    def check(event):
+        value = get(event)
+        return value is not _MISSING and all(t(value) for t in tests)
+
+    return check
+
+
+def _all(predicates: List[Predicate]) -> Predicate:
+    if not predicates:
+        return lambda event: True
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda event: all(p(event) for p in predicates)
+
+
+def compile_condition(condition: Optional[dict]) -> Predicate:
+    """Compile a condition object into a predicate over events.
+
+    Args:
+        condition (dict, optional): Rule condition; empty or None matches
+            every event.
+
+    Returns:
+        callable: ``predicate(event) -> bool``.
+
+    Raises:
+        ValueError: If the condition is malformed.
+    """
+    if condition is None:
+        condition = {}
+    if not isinstance(condition, dict):
+        raise ValueError("Condition must be an object")
+
+    predicates: List[Predicate] = []
+    for key, spec in condition.items():
+        if key == 'event':
+            predicates.append(_field_predicate('type', spec))
+        elif key in ('all', 'any'):
+            if not isinstance(spec, list):
+                raise ValueError(f"'{key}' expects a list of conditions")
+            parts = [compile_condition(part) for part in spec]
+            if key == 'all':
+                predicates.append(_all(parts))
+            else:
+                predicates.append(lambda event, parts=parts: any(p(event) for p in parts))
+        elif key == 'not':
+            negated = compile_condition(spec)
+            predicates.append(lambda event, negated=negated: not negated(event))
+        else:
+            predicates.append(_field_predicate(key, spec))
+    return _all(predicates)
+
+
+def _event_types(condition: dict) -> Tuple[Optional[str], ...]:
+    spec = condition.get('event')
+    if spec is None:
+        return (None,)
+    if isinstance(spec, str):
+        return (spec,)
+    if isinstance(spec, list) and spec and all(isinstance(t, str) for t in spec):
+        return tuple(dict.fromkeys(spec))
+    return (None,)  # operator form: test against every event
+
+
+def _anchor_field(condition: dict) -> Optional[str]:
+    """A top-level event field the condition cannot match without."""
+    for key, spec in condition.items():
+        if key == 'event' or key in _LOGICAL_KEYS:
+            continue
+        if isinstance(spec, dict) and spec.get('exists') is False:
+            continue
+        return FIELD_ALIASES.get(key, key).split('.')[0]
+    return None
+
+
+class CompiledRule:
+    """A rule row with its compiled condition."""
+
+    __slots__ = ('rule', 'condition', 'priority', 'order', 'predicate')
+
+    def __init__(self, rule: dict, order: int):
+        condition = rule.get('condition') or {}
+        if not isinstance(condition, dict):
+            raise ValueError("Condition must be an object")
+        if rule.get('user_id') is not None:
+            # Rules owned by a user only react to that user's events.
+            condition = dict(condition, user_id=rule['user_id'])
+        self.rule = rule
+        self.condition = condition
+        self.priority = rule.get('priority') or 0
+        self.order = order
+        self.predicate = compile_condition(condition)
+
+    def sort_key(self) -> Tuple[Any, int]:
+        return (-self.priority, self.order)
+
+
+class RuleSet:
+    """Active rules compiled and indexed for evaluation.
+
+    Args:
+        rules (iterable): Rule rows, already filtered to active ones.
+            Rules whose condition does not compile are logged and skipped.
+    """
+
+    def __init__(self, rules: Iterable[dict]):
+        self._buckets: Dict[Tuple[Optional[str], Optional[str]], List[CompiledRule]] = {}
+        self._fields: Dict[Optional[str], set] = {}
+        self.size = 0
+        self.invalid: List[Any] = []
+        for order, rule in enumerate(rules):
+            try:
+                compiled = CompiledRule(rule, order)
+            except ValueError as e:
+                logger.warning("Skipping bot rule %s: %s", rule.get('id'), e)
+                self.invalid.append(rule.get('id'))
+                continue
+            self.size += 1
+            anchor = _anchor_field(compiled.condition)
+            for event_type in _event_types(compiled.condition):
+                self._buckets.setdefault((event_type, anchor), []).append(compiled)
+                if anchor is not None:
+                    self._fields.setdefault(event_type, set()).add(anchor)
+        for bucket in self._buckets.values():
+            bucket.sort(key=CompiledRule.sort_key)
+
+    def candidates(self, event: dict) -> List[List[CompiledRule]]:
+        """Buckets of rules that may match ``event``."""
+        buckets = []
+        for event_type in (event.get('type'), None):
+            bucket = self._buckets.get((event_type, None))
+            if bucket:
+                buckets.append(bucket)
+            for field in self._fields.get(event_type, ()):
+                if field in event:
+                    bucket = self._buckets.get((event_type, field))
+                    if bucket:
+                        buckets.append(bucket)
+            if event_type is None:
+                break
+        return buckets
+
+    def match(self, event: dict, limit: Optional[int] = None) -> List[dict]:
+        """Rules matching ``event``, highest priority first.
+
+        Args:
+            event (dict): Event to evaluate.
+            limit (int, optional): Stop after this many matches.
+
+        Returns:
+            list: Matching rule rows.
+        """
+        return self.select(self.candidates(event), event, limit)
+
+    @staticmethod
+    def select(buckets: List[List[CompiledRule]], event: dict, limit: Optional[int] = None) -> List[dict]:
+        """Test ``event`` against the rules of :meth:`candidates`."""
+        if not buckets:
+            return []
+        ordered = buckets[0] if len(buckets) == 1 else heapq.merge(*buckets, key=CompiledRule.sort_key)
+        matched = []
+        for compiled in ordered:
+            if compiled.predicate(event):
+                matched.append(compiled.rule)
+                if limit is not None and len(matched) >= limit:
+                    break
+        return matched
+
+
+class RuleEngine:
+    """Loaded, compiled rules of one table, kept current like a cache.
+
+    Args:
+        table (str): Rules table (used for registration, stats and the bus).
+        loader (callable): Returns every rule row.
+        ttl (float or callable): Seconds a loaded rule set is trusted;
+            ``0`` reloads and recompiles on every use.
+        active_column (str): Boolean column; rules where it is false are
+            kept in :meth:`rows` but never evaluated.
+    """
+
+    def __init__(self, table: str, loader: Callable[[], List[dict]], ttl=300.0,
+                 active_column: str = 'active'):
+        self.table = table
+        self._loader = loader
+        self._ttl = ttl
+        self._active_column = active_column
+        # (rows sorted by priority, rule set, loaded_at), swapped atomically
+        self._state: Optional[Tuple[List[dict], RuleSet, float]] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evaluations = 0
+        self.candidates_checked = 0
+        cache.register(self)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl() if callable(self._ttl) else self._ttl
+
+    def _build(self) -> Tuple[List[dict], RuleSet, float]:
+        rows = sorted(self._loader(), key=lambda rule: -(rule.get('priority') or 0))
+        active = [rule for rule in rows if rule.get(self._active_column, True) is not False]
+        return rows, RuleSet(active), time.monotonic()
+
+    def _current(self) -> Tuple[List[dict], RuleSet, float]:
+        cache_bus.poll()
+        ttl = self.ttl
+        if ttl <= 0:
+            self.loads += 1
+            return self._build()
+        state = self._state
+        if state is not None and time.monotonic() - state[2] < ttl:
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or time.monotonic() - state[2] >= ttl:
+                self.loads += 1
+                state = self._state = self._build()
+            return state
+
+    def rows(self) -> List[dict]:
+        """Every rule row (active or not), highest priority first."""
+        return [dict(row) for row in self._current()[0]]
+
+    def evaluate(self, event: dict, limit: Optional[int] = None) -> List[dict]:
+        """Active rules matching ``event``, highest priority first."""
+        rule_set = self._current()[1]
+        buckets = rule_set.candidates(event)
+        self.evaluations += 1
+        self.candidates_checked += sum(len(bucket) for bucket in buckets)
+        return [dict(rule) for rule in rule_set.select(buckets, event, limit)]
+
+    def reload(self) -> None:
+        """Rebuild on next use after a write and tell the other workers."""
+        self.invalidate()
+        cache_bus.publish(self.table)
+
+    def invalidate(self, key: Any = None) -> None:  # noqa: ARG002
+        """Forget the rule set; a changed rule can move between buckets."""
+        with self._lock:
+            self._state = None
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        return {
+            'loads': self.loads,
+            'evaluations': self.evaluations,
+            'candidates_checked': self.candidates_checked,
+            'rules': len(state[0]) if state is not None else 0,
+            'active_rules': state[1].size if state is not None else 0,
+            'invalid_rules': len(state[1].invalid) if state is not None else 0,
+            'ttl': self.ttl,
+        }
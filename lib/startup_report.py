@@ -0,0 +1,107 @@
+"""Import-time report for application startup.
+
+Boots the application in a fresh interpreter with ``python -X importtime``
+and summarizes where the time goes, so startup regressions show up before
+they reach the autoscaler::
+
+    python -m lib.startup_report [--top 15] [--budget-ms 1000]
+
+The report lists the slowest top-level imports (cumulative) and modules
+(self time), whether the modules known to be heavy were loaded at boot,
+and the total time to import and run ``create_app()``. With
+``--budget-ms`` the exit status is 1 when boot takes longer, for CI.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only be imported when a request needs them.
+HEAVY_MODULES = ('openai', 'flasgger', 'supabase', 'lib.agent', 'services.agent_service')
+
+_BOOT = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    "print('BOOT_MS', (time.perf_counter() - started) * 1000)\n"
+    "print('LOADED', ' '.join(m for m in {heavy!r} if m in sys.modules))\n"
+)
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure(env: Optional[Dict[str, str]] = None) -> Dict:
+    """Boot the app in a subprocess and collect import timings.
+
+    Args:
+        env (dict, optional): Extra environment variables for the boot.
+
+    Returns:
+        dict: ``boot_ms``, ``loaded`` (heavy modules imported at boot) and
+        ``imports`` (``{'module', 'self_us', 'cumulative_us', 'depth'}`` rows).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _BOOT.format(heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=dict(os.environ, **(env or {})),
+        capture_output=True, text=True, check=True
+    )
+    imports: List[Dict] = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append({
+                'module': module,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': (len(indent) - 1) // 2,
+            })
+    boot_ms, loaded = 0.0, []
+    for line in result.stdout.splitlines():
+        if line.startswith('BOOT_MS '):
+            boot_ms = float(line.split()[1])
+        elif line.startswith('LOADED'):
+            loaded = line.split()[1:]
+    return {'boot_ms': boot_ms, 'loaded': loaded, 'imports': imports}
+
+
+def format_report(report: Dict, top: int = 15) -> str:
+    imports = report['imports']
+    lines = [f"Boot (import app + create_app): {report['boot_ms']:.0f} ms", '']
+
+    lines.append(f"Slowest top-level imports (cumulative, top {top}):")
+    for row in sorted((r for r in imports if r['depth'] == 0), key=lambda r: -r['cumulative_us'])[:top]:
+        lines.append(f"   {row['cumulative_us'] / 1000:8.1f} ms  {row['module']}")
+
+    lines += ['', f"Slowest modules (self, top {top}):"]
+    for row in sorted(imports, key=lambda r: -r['self_us'])[:top]:
+        lines.append(f"   {row['self_us'] / 1000:8.1f} ms  {row['module']}")
+
+    lines += ['', "Heavy modules loaded at boot:"]
+    for module in HEAVY_MODULES:
+        lines.append(f"   {'yes' if module in report['loaded'] else 'no ':>3}  {module}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=15, help='rows per table')
+    parser.add_argument('--budget-ms', type=float, help='fail when boot takes longer')
+    args = parser.parse_args(argv)
+
+    report = measure()
+    print(format_report(report, args.top))
+    if args.budget_ms is not None and report['boot_ms'] > args.budget_ms:
+        print(f"\nBoot took {report['boot_ms']:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""Write-behind buffer for append-only tables.
+
+Rows are queued in process and inserted in batches by a background thread,
+either when ``flush_size`` rows are pending or every ``flush_interval``
+seconds, so the request that produced them does not wait on the database.
+
+Every queued row is first appended to a per-process spill file (JSON lines)
+and the file is rewritten with whatever is still pending after each
+successful flush. When a process dies with rows still queued, the next
+buffer started with the same spill directory claims the orphaned file and
+re-queues its rows. Rows get their ``id`` before they are queued and
+batches are sent as upserts on that id, so a replay of rows that were
+already inserted does not duplicate them. Orphaned spill files are looked
+for again before every flush, so rows of a worker that died after this
+buffer started are not left behind until the next restart.
+
+Each batch is split by column set, since PostgREST rejects a bulk insert
+whose rows do not share the same keys. When the database refuses a batch
+(a constraint violation, an unknown column) the batch is bisected down to
+the offending rows, which are appended to ``<table>.dead-letter.jsonl``
+with the error and dropped from the queue, so one bad row cannot hold up
+the rest. Other failures (the database is unreachable) keep the rows
+queued for the next flush.
+
+Pending rows are flushed at interpreter exit. The flusher thread does not
+survive ``fork()``; a forked child starts with an empty queue and its own
+spill file.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from lib.db import get_supabase, is_rejection
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on rows sent in one insert request.
+MAX_BATCH = 1000
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WriteBehindBuffer:
+    """Batching, crash-safe insert queue for one table.
+
+    Args:
+        table (str): Table the rows are inserted into.
+        spill_dir (str): Directory for the spill files.
+        flush_size (int): Pending rows that trigger an immediate flush.
+        flush_interval (float): Maximum seconds a row waits before a flush.
+        timestamp_column (str, optional): Column stamped with the enqueue
+            time when the row does not set it.
+    """
+
+    def __init__(self, table: str, spill_dir: str, flush_size: int = 100,
+                 flush_interval: float = 1.0, timestamp_column: Optional[str] = None):
+        self.table = table
+        self.spill_dir = spill_dir
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.timestamp_column = timestamp_column
+        self.stats = {'queued': 0, 'flushed': 0, 'batches': 0, 'errors': 0, 'recovered': 0,
+                      'dead_lettered': 0}
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._stopped = False
+        self._pid = os.getpid()
+        os.makedirs(spill_dir, exist_ok=True)
+        self._recover(include_own=True)
+        self._start_flusher()
+
+    def _start_flusher(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name=f'write-behind-{self.table}', daemon=True
+        )
+        self._thread.start()
+
+    # ---- spill file -------------------------------------------------
+    @property
+    def spill_path(self) -> str:
+        return os.path.join(self.spill_dir, f'{self.table}-{self._pid}.jsonl')
+
+    @property
+    def dead_letter_path(self) -> str:
+        return os.path.join(self.spill_dir, f'{self.table}.dead-letter.jsonl')
+
+    def _append_spill(self, row: dict) -> None:
+        with open(self.spill_path, 'a', encoding='utf-8') as spill:
+            spill.write(json.dumps(row, default=str) + '\n')
+
+    def _rewrite_spill(self) -> None:
+        if not self._pending:
+            try:
+                os.remove(self.spill_path)
+            except FileNotFoundError:
+                pass
+            return
+        tmp_path = f'{self.spill_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as spill:
+            for row in self._pending:
+                spill.write(json.dumps(row, default=str) + '\n')
+        os.replace(tmp_path, self.spill_path)
+
+    def _append_dead_letter(self, entry: dict) -> None:
+        entry['failed_at'] = datetime.now(timezone.utc).isoformat()
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as dead_letter:
+            dead_letter.write(json.dumps(entry, default=str) + '\n')
+        self.stats['dead_lettered'] += 1
+
+    def _dead_letter(self, row: dict, error: Exception) -> None:
+        self._append_dead_letter({'row': row, 'error': str(error)})
+        logger.error("Dead-lettered %s row %s: %s", self.table, row.get('id'), error)
+
+    def _claimable(self, name: str, include_own: bool) -> bool:
+        # <table>-<pid>.jsonl, or <table>-<pid>.jsonl.claimed-<pid> left by
+        # a process that died while recovering it; the last pid owns the file.
+        prefix = f'{self.table}-'
+        if not name.startswith(prefix):
+            return False
+        base, _, claimer = name.partition('.claimed-')
+        if not base.endswith('.jsonl'):
+            return False
+        owner = claimer or base[len(prefix):-len('.jsonl')]
+        if not owner.isdigit():
+            return False
+        if int(owner) == self._pid:
+            return include_own
+        return not _pid_alive(int(owner))
+
+    def _read_spill(self, path: str, name: str) -> List[dict]:
+        """Rows of a claimed spill file; lines that do not parse (the torn
+        last write of a crashed worker) are dead-lettered."""
+        rows = []
+        with open(path, encoding='utf-8', errors='replace') as spill:
+            for number, line in enumerate(spill, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise ValueError('not a JSON object')
+                except ValueError as e:
+                    self._append_dead_letter({'line': line.rstrip('\n'), 'source': f'{name}:{number}',
+                                              'error': str(e)})
+                    logger.error("Dead-lettered unreadable line %d of %s: %s", number, name, e)
+                    continue
+                rows.append(row)
+        return rows
+
+    def _recover(self, include_own: bool = False) -> None:
+        """Re-queue the rows of spill files whose process is gone.
+
+        Args:
+            include_own (bool): Also claim a file carrying this process's
+                pid, left by an earlier process that had the same pid.
+        """
+        for name in sorted(os.listdir(self.spill_dir)):
+            if not self._claimable(name, include_own):
+                continue
+            path = os.path.join(self.spill_dir, name)
+            claimed = f"{path.partition('.claimed-')[0]}.claimed-{self._pid}"
+            if path != claimed:
+                try:
+                    os.rename(path, claimed)  # only one process wins the claim
+                except FileNotFoundError:
+                    continue
+            rows = self._read_spill(claimed, name)
+            with self._lock:
+                self._pending.extend(rows)
+                self._rewrite_spill()
+            # Only now are the rows safe in this process's own spill file
+            os.remove(claimed)
+            self.stats['recovered'] += len(rows)
+            logger.info("Recovered %d buffered %s rows from %s", len(rows), self.table, name)
+
+    # ---- queue ------------------------------------------------------
+    def add(self, row: dict) -> dict:
+        """Queue a row for insertion and return it with its id assigned."""
+        row = dict(row)
+        row.setdefault('id', str(uuid.uuid4()))
+        if self.timestamp_column:
+            row.setdefault(self.timestamp_column, datetime.now(timezone.utc).isoformat())
+        with self._lock:
+            self._append_spill(row)
+            self._pending.append(row)
+            self.stats['queued'] += 1
+            if len(self._pending) >= self.flush_size:
+                self._wakeup.notify()
+            if not self._thread.is_alive() and not self._stopped:
+                logger.warning("Write-behind flusher of %s had stopped; restarting it", self.table)
+                self._start_flusher()
+        return row
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Insert every pending row now, in batches of at most MAX_BATCH.
+
+        Returns:
+            int: Rows written; rows the database refused are dead-lettered,
+                the rest stay queued when it cannot be reached.
+        """
+        written = 0
+        with self._flush_lock:
+            self._recover()
+            while True:
+                with self._lock:
+                    batch = self._pending[:MAX_BATCH]
+                if not batch:
+                    return written
+                inserted, rejected, error = self._write(batch)
+                done = {id(row) for row in inserted + rejected}
+                if done:
+                    with self._lock:
+                        self._pending = [row for row in self._pending if id(row) not in done]
+                        self._rewrite_spill()
+                self.stats['flushed'] += len(inserted)
+                written += len(inserted)
+                if error is not None:
+                    self.stats['errors'] += 1
+                    logger.error("Failed to flush %d %s rows; keeping them queued: %s",
+                                 len(batch) - len(done), self.table, error)
+                    return written
+
+    def _write(self, batch: List[dict]):
+        """Insert ``batch`` one column set at a time, bisecting refused inserts.
+
+        Returns:
+            tuple: (inserted rows, dead-lettered rows, the error that
+                stopped the flush or None).
+        """
+        groups: Dict[frozenset, List[dict]] = {}
+        for row in batch:
+            groups.setdefault(frozenset(row), []).append(row)
+        inserted: List[dict] = []
+        rejected: List[dict] = []
+        todo = list(reversed(groups.values()))
+        while todo:
+            rows = todo.pop()
+            try:
+                self._insert(rows)
+            except Exception as e:  # noqa: BLE001
+                if not is_rejection(e):
+                    return inserted, rejected, e
+                if len(rows) == 1:
+                    self._dead_letter(rows[0], e)
+                    rejected.append(rows[0])
+                else:
+                    middle = len(rows) // 2
+                    todo += [rows[middle:], rows[:middle]]
+                continue
+            self.stats['batches'] += 1
+            inserted += rows
+        return inserted, rejected, None
+
+    def _insert(self, rows: List[dict]) -> None:
+        get_supabase().from_(self.table).insert(rows, upsert=True).execute()
+
+    def _run(self) -> None:
+        backoff = False
+        while True:
+            with self._lock:
+                if (backoff or len(self._pending) < self.flush_size) and not self._stopped:
+                    self._wakeup.wait(self.flush_interval)
+                stopped = self._stopped
+            try:
+                backoff = self.flush() == 0 and self.pending() > 0
+            except Exception:  # noqa: BLE001
+                # e.g. an OSError on the spill directory; keep the thread alive
+                self.stats['errors'] += 1
+                logger.error("Flushing %s failed; retrying in %s s", self.table, self.flush_interval, exc_info=True)
+                backoff = True
+            if stopped:
+                return
+
+    def close(self) -> None:
+        """Stop the flusher thread after a final flush."""
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, pending=self.pending())
+
+
+_buffers: Dict[str, WriteBehindBuffer] = {}
+_buffers_lock = threading.Lock()
+
+
+def get_buffer(table: str, **options) -> WriteBehindBuffer:
+    """Return this process's buffer for ``table``, creating it on first use."""
+    buffer = _buffers.get(table)
+    if buffer is None:
+        with _buffers_lock:
+            buffer = _buffers.get(table)
+            if buffer is None:
+                buffer = _buffers[table] = WriteBehindBuffer(table, **options)
+    return buffer
+
+
+def close_all() -> None:
+    """Flush and stop every buffer (registered to run at exit)."""
+    for buffer in list(_buffers.values()):
+        buffer.close()
+
+
+def _after_fork_in_child():
+    # The flusher threads do not survive fork(); the parent still owns the
+    # queued rows and its spill files.
+    global _buffers_lock  # noqa: PLW0603
+    _buffers.clear()
+    _buffers_lock = threading.Lock()
+
+
+atexit.register(close_all)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -1,4 +1,5 @@
 """Middleware package for authentication and other middleware functions."""
 from .auth_middleware import token_required
+from .conditional_get import conditional_get
 
-__all__ = ['token_required']
+__all__ = ['token_required', 'conditional_get']
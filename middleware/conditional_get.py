@@ -0,0 +1,87 @@
+"""Conditional GET (ETag / If-None-Match / Last-Modified) for read endpoints."""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+# Clients may keep the response but must revalidate it before every use.
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _version_etag(version):
+    digest = hashlib.sha1(repr((request.full_path, version)).encode('utf-8')).hexdigest()
+    return digest[:32]
+
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        moment = value
+    else:
+        try:
+            moment = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if moment is not None and moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def conditional_get(version=None, last_modified=None):
+    """Decorator answering repeated GETs of an unchanged resource with 304.
+
+    Without arguments the ETag is a hash of the serialized body, which saves
+    bandwidth. ``version`` lets the route skip the handler and the
+    serialization too: it returns a value that changes whenever the response
+    would (a cache version, an ``updated_at``), or None to fall back to
+    hashing the body. Such ETags are weak, since the body is never compared.
+
+    Usage:
+        @token_required
+        @conditional_get(version=lambda: template_cache.version)
+        def get_templates():
+            ...
+
+    Args:
+        version (callable, optional): Returns the representation version.
+        last_modified (callable, optional): Returns the modification time
+            (datetime or ISO string) for ``Last-Modified``/``If-Modified-Since``.
+
+    Returns:
+        The decorator.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return f(*args, **kwargs)
+
+            etag = None
+            if version is not None:
+                current = version()
+                if current is not None:
+                    etag = _version_etag(current)
+            modified = _as_datetime(last_modified()) if last_modified is not None else None
+
+            if (etag or modified) and not is_resource_modified(request.environ, etag=etag, last_modified=modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if etag is None:
+                    if modified is not None:
+                        response.last_modified = modified
+                    response.add_etag()
+                    response.make_conditional(request)
+            if etag is not None:
+                response.set_etag(etag, weak=True)
+            if modified is not None:
+                response.last_modified = modified
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+
+        return decorated
+
+    return decorator
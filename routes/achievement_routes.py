@@ -23,9 +23,30 @@ def get_achievements():
         description: JWT token (Bearer <token>)
         required: true
         type: string
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: Opaque cursor from the X-Next-Cursor header of the previous page
     responses:
       200:
         description: List of user achievements
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Cursor for the next page (absent on the last page)
         schema:
           type: array
           items:
@@ -1,10 +1,12 @@
 """Body task routes."""
 from flask import Blueprint, request, jsonify
 from middleware.auth_middleware import token_required
+from middleware.conditional_get import conditional_get
 from controllers.body_task_controller import (
     get_my_body_tasks,
     get_body_task,
     create_new_body_task,
+    create_body_tasks_bulk,
     update_body_task_data,
     complete_task,
     delete_body_task_by_id
@@ -15,6 +17,7 @@ body_task_routes = Blueprint('body_tasks', __name__, url_prefix='/api/tasks/body
 
 @body_task_routes.route('/', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get()
 def get_tasks():
     """Get all body tasks for authenticated user.
     ---
@@ -33,9 +36,30 @@ def get_tasks():
         description: Filter by task status
         enum: ["pending", "completed", "failed", "in_progress"]
         example: "pending"
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,status,scheduled_at,task_templates.name"
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: Opaque cursor from the X-Next-Cursor header of the previous page
     responses:
       200:
         description: List of body tasks
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Cursor for the next page (absent on the last page)
         schema:
           type: array
           items:
@@ -75,6 +99,8 @@ def get_tasks():
               created_at:
                 type: string
                 format: date-time
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized - Invalid or missing token
         schema:
@@ -87,6 +113,7 @@ def get_tasks():
 
 @body_task_routes.route('/<task_id>', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get()
 def get_task(task_id):
     """Get specific body task by ID.
     ---
@@ -144,6 +171,8 @@ def get_task(task_id):
             created_at:
               type: string
               format: date-time
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized - Invalid or missing token
         schema:
@@ -261,6 +290,76 @@ def create_task():
     return create_new_body_task(data)
 
 
+@body_task_routes.route('/bulk', methods=['POST'])
+@token_required
+def create_tasks_bulk():
+    """Create several body tasks in one request.
+    ---
+    tags:
+      - Body Tasks
+    parameters:
+      - in: header
+        name: Authorization
+        description: JWT token (Bearer <token>)
+        required: true
+        type: string
+      - in: body
+        name: body
+        description: Array of body tasks (max 100). Each item takes the same fields as a single create, with template_key accepted instead of template_id.
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - created_by
+            properties:
+              template_id:
+                type: string
+                format: uuid
+                example: "550e8400-e29b-41d4-a716-446655440000"
+              template_key:
+                type: string
+                example: "meditation_10"
+                description: Template key, resolved to template_id
+              created_by:
+                type: string
+                enum: ["user", "bot"]
+                example: "user"
+              status:
+                type: string
+                enum: ["pending", "completed", "failed", "in_progress"]
+                example: "pending"
+              scheduled_at:
+                type: string
+                format: date-time
+                example: "2025-10-01T10:00:00Z"
+              params:
+                type: object
+    responses:
+      201:
+        description: All tasks created
+        schema:
+          $ref: '#/definitions/BulkTaskResult'
+      207:
+        description: Some tasks failed; see the per-item results
+        schema:
+          $ref: '#/definitions/BulkTaskResult'
+      400:
+        description: Body is not an array or has too many items
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+      401:
+        description: Unauthorized - Invalid or missing token
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+    """
+    data = request.get_json()
+    if data is None:
+        return jsonify({'error': 'Invalid request'}), 400
+    return create_body_tasks_bulk(data)
+
+
 @body_task_routes.route('/<task_id>', methods=['PUT'])
 @token_required
 def update_task(task_id):
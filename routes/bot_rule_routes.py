@@ -6,7 +6,8 @@ from controllers.bot_rule_controller import (
     get_rule,
     create_rule,
     update_rule,
-    delete_rule
+    delete_rule,
+    evaluate_rules
 )
 
 bot_rule_routes = Blueprint('bot_rules', __name__, url_prefix='/api/bot-rules')
@@ -31,6 +32,12 @@ def get_rules():
         required: false
         description: Filter to only active rules
         example: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
     responses:
       200:
         description: List of bot rules
@@ -353,3 +360,55 @@ def delete_bot_rule(rule_id):
           $ref: '#/definitions/ErrorResponse'
     """
     return delete_rule(rule_id)
+
+
+@bot_rule_routes.route('/evaluate', methods=['POST'])
+@token_required
+def evaluate_bot_rules():
+    """Evaluate an event against the active bot rules.
+    ---
+    tags:
+      - Bot Rules
+    parameters:
+      - in: header
+        name: Authorization
+        description: JWT token (Bearer <token>)
+        required: true
+        type: string
+      - in: body
+        name: body
+        description: Event to evaluate
+        required: true
+        schema:
+          type: object
+          required:
+            - event
+          properties:
+            event:
+              type: object
+              example: {"type": "task_completed", "category": "mind", "streak": 7}
+              description: Event type and fields; user_id defaults to the caller
+            limit:
+              type: integer
+              example: 5
+              description: Maximum number of rules to return
+    responses:
+      200:
+        description: Matching rules, highest priority first
+        schema:
+          type: array
+          items:
+            type: object
+      400:
+        description: Invalid event
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+      401:
+        description: Unauthorized - Invalid or missing token
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+    """
+    data = request.get_json()
+    if data is None:
+        return jsonify({'error': 'Invalid request'}), 400
+    return evaluate_rules(data)
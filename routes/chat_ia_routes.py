@@ -9,6 +9,7 @@ from controllers.chat_ia_controller import (
     delete_chat_session_by_id,
     get_messages,
     create_new_message,
+    stream_new_message,
     delete_message_by_id
 )
 
@@ -29,6 +30,12 @@ def get_sessions():
         description: JWT token (Bearer <token>)
         required: true
         type: string
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
     responses:
       200:
         description: List of chat sessions
@@ -313,9 +320,30 @@ def get_session_messages(session_id):
         type: string
         format: uuid
         description: Chat session ID
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: Opaque cursor from the X-Next-Cursor header of the previous page
     responses:
       200:
         description: List of messages in the session
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Cursor for the next page (absent on the last page)
         schema:
           type: array
           items:
@@ -438,6 +466,78 @@ def create_message(session_id):
     return create_new_message(session_id, data)
 
 
+@chat_ia_routes.route('/sessions/<session_id>/messages/stream', methods=['POST'])
+@token_required
+def stream_message(session_id):
+    """Send a user message and stream the AI response (Server-Sent Events).
+    ---
+    tags:
+      - Chat IA
+    produces:
+      - text/event-stream
+    parameters:
+      - in: header
+        name: Authorization
+        description: JWT token (Bearer <token>)
+        required: true
+        type: string
+      - name: session_id
+        in: path
+        required: true
+        type: string
+        format: uuid
+        description: Chat session ID
+      - in: body
+        name: body
+        description: Message data
+        required: true
+        schema:
+          type: object
+          required:
+            - content
+          properties:
+            role:
+              type: string
+              enum: ["user"]
+              example: "user"
+              description: Only user messages can be streamed
+            content:
+              type: string
+              example: "¿Cómo puedo mejorar mi meditación?"
+              description: Message content
+    responses:
+      200:
+        description: |
+          Event stream. Each event carries a JSON payload:
+          `user_message` (stored user message), `token` ({content}),
+          `tool_call_start` ({id, name, arguments}), `tool_call_finish`
+          ({id, name, success}), `error` ({error}) and finally
+          `assistant_message` (stored assistant message).
+        schema:
+          type: string
+      400:
+        description: Invalid request or missing content
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+      401:
+        description: Unauthorized - Invalid or missing token
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+      403:
+        description: Forbidden - Session belongs to another user
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+      404:
+        description: Chat session not found
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+    """
+    data = request.get_json()
+    if data is None:
+        return jsonify({'error': 'Invalid request'}), 400
+    return stream_new_message(session_id, data)
+
+
 @chat_ia_routes.route('/messages/<message_id>', methods=['DELETE'])
 @token_required
 def delete_message(message_id):
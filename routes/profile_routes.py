@@ -1,6 +1,8 @@
 """Profile routes for user profile management."""
 from flask import Blueprint, request, jsonify
 from middleware.auth_middleware import token_required
+from middleware.conditional_get import conditional_get
+from services.profile_service import get_profile_by_user_id, profile_cache
 from controllers.profile_controller import (
     get_user_profile,
     create_user_profile,
@@ -11,8 +13,25 @@ from controllers.profile_controller import (
 profile_routes = Blueprint('profile', __name__, url_prefix='/api/profile')
 
 
+def _profile_version():
+    # Served from the profile cache, so validating costs no query; without
+    # the cache the ETag is a hash of the body instead.
+    if profile_cache.ttl <= 0:
+        return None
+    profile = get_profile_by_user_id(request.user.get('user_id'))
+    return sorted(profile.items()) if profile is not None else None
+
+
+def _profile_updated_at():
+    if profile_cache.ttl <= 0:
+        return None
+    profile = get_profile_by_user_id(request.user.get('user_id'))
+    return profile.get('updated_at') if profile is not None else None
+
+
 @profile_routes.route('/', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get(version=_profile_version, last_modified=_profile_updated_at)
 def get_profile():
     """Get authenticated user's profile.
     ---
@@ -24,6 +43,12 @@ def get_profile():
         description: JWT token (Bearer <token>)
         required: true
         type: string
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "user_id,level,total_xp"
     responses:
       200:
         description: User profile
@@ -70,6 +95,8 @@ def get_profile():
             created_at:
               type: string
               format: date-time
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized - Invalid or missing token
         schema:
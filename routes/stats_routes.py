@@ -15,6 +15,8 @@ from controllers.stats_controller import (
     get_user_stats_summary
 )
 from middleware.auth_middleware import token_required
+from middleware.conditional_get import conditional_get
+from services.stats_service import metric_registry
 
 # Create Blueprint for statistics routes
 stats_routes = Blueprint('stats', __name__, url_prefix='/api/stats')
@@ -24,6 +26,7 @@ stats_routes = Blueprint('stats', __name__, url_prefix='/api/stats')
 
 @stats_routes.route('/metrics', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get(version=lambda: metric_registry.version)
 def get_metrics():
     """
     Get all metrics from catalog.
@@ -42,6 +45,12 @@ def get_metrics():
         required: false
         type: string
         enum: [body, mind, system]
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
     responses:
       200:
         description: List of metrics
@@ -74,6 +83,8 @@ def get_metrics():
               created_at:
                 type: string
                 format: date-time
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized
         schema:
@@ -88,6 +99,7 @@ def get_metrics():
 
 @stats_routes.route('/metrics/<metric_key>', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get(version=lambda: metric_registry.version)
 def get_metric_by_key(metric_key):
     """
     Get a specific metric by key.
@@ -132,6 +144,8 @@ def get_metric_by_key(metric_key):
         description: Metric not found
         schema:
           $ref: '#/definitions/ErrorResponse'
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized
         schema:
@@ -391,6 +405,12 @@ def get_snapshots():
         required: false
         type: integer
         default: 100
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
     responses:
       200:
         description: List of performance snapshots
@@ -632,7 +652,7 @@ def create_snapshot():
             inputs:
               type: object
       400:
-        description: Invalid request
+        description: Invalid request or metric value outside its catalog range
         schema:
           $ref: '#/definitions/ErrorResponse'
       401:
@@ -741,7 +761,7 @@ def update_snapshot(snapshot_id):
             inputs:
               type: object
       400:
-        description: Invalid request
+        description: Invalid request or metric value outside its catalog range
         schema:
           $ref: '#/definitions/ErrorResponse'
       403:
@@ -884,6 +904,7 @@ def get_latest_snapshot():
 
 @stats_routes.route('/summary', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get()
 def get_summary():
     """
     Get aggregated statistics summary for authenticated user.
@@ -943,6 +964,14 @@ def get_summary():
                     latest:
                       type: number
                       example: 80.0
+                    agg_method:
+                      type: string
+                      description: Aggregation of the metric in the catalog (avg when not listed)
+                      example: "avg"
+                    value:
+                      type: number
+                      description: The values aggregated with agg_method
+                      example: 75.5
                 stamina:
                   type: object
                   properties:
@@ -968,6 +997,8 @@ def get_summary():
                   type: number
                 stamina:
                   type: number
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized
         schema:
@@ -0,0 +1,90 @@
+"""Task bulk routes (operations spanning mind and body tasks)."""
+from flask import Blueprint, request, jsonify
+from middleware.auth_middleware import token_required
+from controllers.task_bulk_controller import complete_tasks
+
+task_bulk_routes = Blueprint('task_bulk', __name__, url_prefix='/api/tasks')
+
+
+@task_bulk_routes.route('/complete', methods=['POST'])
+@token_required
+def complete_many():
+    """Complete several mind and body tasks at once and award XP.
+    ---
+    tags:
+      - Mind Tasks
+      - Body Tasks
+    parameters:
+      - in: header
+        name: Authorization
+        description: JWT token (Bearer <token>)
+        required: true
+        type: string
+      - in: body
+        name: body
+        description: IDs of the tasks to complete (max 100 in total)
+        required: true
+        schema:
+          type: object
+          properties:
+            mind_task_ids:
+              type: array
+              items:
+                type: string
+                format: uuid
+            body_task_ids:
+              type: array
+              items:
+                type: string
+                format: uuid
+    responses:
+      200:
+        description: Tasks completed; XP taken from each task's template
+        schema:
+          type: object
+          properties:
+            completed:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                    format: uuid
+                  task_type:
+                    type: string
+                    enum: ["mind", "body"]
+                  status:
+                    type: string
+                    example: "completed"
+                  xp_awarded:
+                    type: integer
+                    example: 20
+            total_xp:
+              type: integer
+              example: 60
+            skipped:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                  task_type:
+                    type: string
+                  reason:
+                    type: string
+                    enum: ["not_found", "already_completed"]
+      400:
+        description: Invalid request or too many tasks
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+      401:
+        description: Unauthorized - Invalid or missing token
+        schema:
+          $ref: '#/definitions/ErrorResponse'
+    """
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Invalid request'}), 400
+    return complete_tasks(data)
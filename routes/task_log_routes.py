@@ -29,9 +29,30 @@ def get_logs():
         description: Filter by task table
         enum: ["tasks_mind", "tasks_body"]
         example: "tasks_mind"
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: Opaque cursor from the X-Next-Cursor header of the previous page
     responses:
       200:
         description: List of task logs
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Cursor for the next page (absent on the last page)
         schema:
           type: array
           items:
@@ -139,6 +160,8 @@ def create_task_log():
             logged_at:
               type: string
               format: date-time
+      202:
+        description: Task log accepted and queued (TASK_LOG_BUFFERED=true); written to the database on the next flush
       400:
         description: Invalid request or missing required fields
         schema:
@@ -1,6 +1,8 @@
 """Task template routes."""
 from flask import Blueprint, request, jsonify
 from middleware.auth_middleware import token_required
+from middleware.conditional_get import conditional_get
+from services.task_template_service import template_cache
 from controllers.task_template_controller import (
     get_all_templates,
     get_template_by_id,
@@ -16,6 +18,7 @@ task_template_routes = Blueprint('task_templates', __name__, url_prefix='/api/ta
 
 @task_template_routes.route('/', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get(version=lambda: template_cache.version)
 def get_templates():
     """Get all task templates.
     ---
@@ -27,6 +30,12 @@ def get_templates():
         description: JWT token (Bearer <token>)
         required: true
         type: string
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
     responses:
       200:
         description: List of all task templates
@@ -71,6 +80,8 @@ def get_templates():
               created_at:
                 type: string
                 format: date-time
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized - Invalid or missing token
         schema:
@@ -83,6 +94,7 @@ def get_templates():
 
 @task_template_routes.route('/<template_id>', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get(version=lambda: template_cache.version)
 def get_template(template_id):
     """Get task template by ID.
     ---
@@ -141,6 +153,8 @@ def get_template(template_id):
             created_at:
               type: string
               format: date-time
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized - Invalid or missing token
         schema:
@@ -157,6 +171,7 @@ def get_template(template_id):
 
 @task_template_routes.route('/key/<key>', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get(version=lambda: template_cache.version)
 def get_by_key(key):
     """Get task template by unique key.
     ---
@@ -212,6 +227,8 @@ def get_by_key(key):
             created_at:
               type: string
               format: date-time
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized - Invalid or missing token
         schema:
@@ -228,6 +245,7 @@ def get_by_key(key):
 
 @task_template_routes.route('/category/<category>', methods=['GET', 'OPTIONS'])
 @token_required
+@conditional_get(version=lambda: template_cache.version)
 def get_by_category(category):
     """Get task templates filtered by category.
     ---
@@ -246,6 +264,12 @@ def get_by_category(category):
         enum: ["mind", "body"]
         description: Template category
         example: "mind"
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated columns to return (sparse fieldset)
+        example: "id,created_at"
     responses:
       200:
         description: List of templates in category
@@ -279,6 +303,8 @@ def get_by_category(category):
               created_at:
                 type: string
                 format: date-time
+      304:
+        description: Not modified since the ETag sent in If-None-Match
       401:
         description: Unauthorized - Invalid or missing token
         schema:
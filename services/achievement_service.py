@@ -1,18 +1,24 @@
 """Achievement service for achievement operations."""
 from lib.db import get_supabase
+from lib.fields import build_select
+from lib.pagination import apply_keyset, keyset_fields
 
 
-def get_user_achievements(user_id):
+def get_user_achievements(user_id, fields=None, limit=None, cursor=None):
     """Get all achievements for a user.
     
     Args:
         user_id (str): User ID.
+        fields (str | list, optional): Columns to return (see lib.fields).
+        limit (int, optional): Page size; None returns every row.
+        cursor (str, optional): Cursor from the previous page.
     
     Returns:
         list: List of achievements.
     """
     supabase = get_supabase()
-    res = supabase.from_('achievements').select('*').eq('user_id', user_id).order('awarded_at', desc=True).execute()
+    query = supabase.from_('achievements').select(build_select(keyset_fields(fields, 'awarded_at'))).eq('user_id', user_id)
+    res = apply_keyset(query, 'awarded_at', desc=True, cursor=cursor, limit=limit).execute()
     return res.data
 
 
@@ -2,6 +2,7 @@
 import logging
 from typing import Optional
 from lib.agent import AIAgent
+from services.chat_ia_service import get_conversation_history
 from tools import ToolRegistry, CreateMindTaskTool, CreateBodyTaskTool
 
 logger = logging.getLogger(__name__)
@@ -77,7 +78,9 @@ Guidelines:
             name="WellnessProductivityAssistant",
             model="gpt-4-turbo-preview",
             temperature=0.7,
-            system_prompt=system_prompt
+            system_prompt=system_prompt,
+            # Sessions evicted from memory are resumed from their stored messages
+            history_loader=get_conversation_history
         )
         
         # Initialize tool registry and register all tools
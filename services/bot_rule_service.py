@@ -1,18 +1,79 @@
-"""Bot rule service for bot rule operations."""
+"""Bot rule service for bot rule operations.
+
+Rules are loaded once per worker and their conditions compiled and indexed
+by lib.rule_engine; the write functions below trigger a rebuild.
+``BOT_RULE_CACHE_TTL`` sets how many seconds a loaded rule set is trusted
+(default 300; ``0`` reloads on every use).
+"""
+import os
+
 from lib.db import get_supabase
+from lib.fields import build_select, project_rows
+from lib.rule_engine import RuleEngine, compile_condition
+
+
+def _load_bot_rules():
+    supabase = get_supabase()
+    return supabase.from_('bot_rules').select('*').execute().data
+
+
+rule_engine = RuleEngine(
+    'bot_rules',
+    _load_bot_rules,
+    ttl=lambda: float(os.getenv('BOT_RULE_CACHE_TTL', '300'))
+)
+
+
+def get_rule_engine_stats():
+    """Get load/evaluation counters of the rule engine.
+    
+    Returns:
+        dict: Engine statistics.
+    """
+    return rule_engine.stats()
 
 
-def get_all_bot_rules(active_only=False):
+def evaluate_bot_rules(event, limit=None):
+    """Find the active rules whose condition matches an event.
+    
+    Args:
+        event (dict): Event with a ``type`` (e.g. ``task_completed``,
+            ``failure_recorded``, ``chat_message``) and its fields.
+        limit (int, optional): Maximum number of rules to return.
+    
+    Returns:
+        list: Matching rules, highest priority first.
+    
+    Raises:
+        ValueError: If the event is not an object with a type.
+    """
+    if not isinstance(event, dict) or not isinstance(event.get('type'), str):
+        raise ValueError("event must be an object with a 'type'")
+    return rule_engine.evaluate(event, limit)
+
+
+def _validate_condition(data):
+    if 'condition' in data:
+        compile_condition(data['condition'])
+
+
+def get_all_bot_rules(active_only=False, fields=None):
     """Get all bot rules, optionally filtered by active status.
     
     Args:
         active_only (bool): Filter to only active rules.
+        fields (str | list, optional): Columns to return (see lib.fields).
     
     Returns:
         list: List of bot rules.
     """
+    if rule_engine.ttl > 0:
+        rules = rule_engine.rows()
+        if active_only:
+            rules = [rule for rule in rules if rule.get('active') is True]
+        return project_rows(rules, fields)
     supabase = get_supabase()
-    query = supabase.from_('bot_rules').select('*')
+    query = supabase.from_('bot_rules').select(build_select(fields))
     
     if active_only:
         query = query.eq('active', True)
@@ -43,9 +104,14 @@ def create_bot_rule(data):
     
     Returns:
         dict: Created rule.
+    
+    Raises:
+        ValueError: If the condition is malformed.
     """
+    _validate_condition(data)
     supabase = get_supabase()
     res = supabase.from_('bot_rules').insert(data).execute()
+    rule_engine.reload()
     return res.data[0] if res.data else None
 
 
@@ -58,9 +124,14 @@ def update_bot_rule(rule_id, data):
     
     Returns:
         dict: Updated rule.
+    
+    Raises:
+        ValueError: If the condition is malformed.
     """
+    _validate_condition(data)
     supabase = get_supabase()
     res = supabase.from_('bot_rules').update(data).eq('id', rule_id).execute()
+    rule_engine.reload()
     return res.data[0] if res.data else None
 
 
@@ -75,4 +146,5 @@ def delete_bot_rule(rule_id):
     """
     supabase = get_supabase()
     res = supabase.from_('bot_rules').delete().eq('id', rule_id).execute()
+    rule_engine.reload()
     return res.data[0] if res.data else None
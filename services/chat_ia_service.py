@@ -1,18 +1,24 @@
 """Chat IA service for chat session and message operations."""
+import uuid
+
+from lib import identity_map
 from lib.db import get_supabase
+from lib.fields import build_select
+from lib.pagination import apply_keyset, keyset_fields
 
 
-def get_user_chat_sessions(user_id):
+def get_user_chat_sessions(user_id, fields=None):
     """Get all chat sessions for a user.
     
     Args:
         user_id (str): User ID.
+        fields (str | list, optional): Columns to return (see lib.fields).
     
     Returns:
         list: List of chat sessions.
     """
     supabase = get_supabase()
-    res = supabase.from_('chat_ia_sessions').select('*').eq('user_id', user_id).order('last_message_at', desc=True).execute()
+    res = supabase.from_('chat_ia_sessions').select(build_select(fields)).eq('user_id', user_id).order('last_message_at', desc=True).execute()
     return res.data
 
 
@@ -25,9 +31,13 @@ def get_chat_session_by_id(session_id):
     Returns:
         dict: Session data or None.
     """
+    cached = identity_map.get('chat_ia_sessions', session_id)
+    if cached is not identity_map.MISSING:
+        return cached
+    
     supabase = get_supabase()
     res = supabase.from_('chat_ia_sessions').select('*').eq('id', session_id).execute()
-    return res.data[0] if res.data else None
+    return identity_map.put('chat_ia_sessions', session_id, res.data[0] if res.data else None)
 
 
 def create_chat_session(data):
@@ -41,7 +51,8 @@ def create_chat_session(data):
     """
     supabase = get_supabase()
     res = supabase.from_('chat_ia_sessions').insert(data).execute()
-    return res.data[0] if res.data else None
+    session = res.data[0] if res.data else None
+    return identity_map.put('chat_ia_sessions', session['id'], session) if session else None
 
 
 def update_chat_session(session_id, data):
@@ -56,7 +67,7 @@ def update_chat_session(session_id, data):
     """
     supabase = get_supabase()
     res = supabase.from_('chat_ia_sessions').update(data).eq('id', session_id).execute()
-    return res.data[0] if res.data else None
+    return identity_map.merge('chat_ia_sessions', session_id, res.data[0] if res.data else None)
 
 
 def delete_chat_session(session_id):
@@ -70,23 +81,73 @@ def delete_chat_session(session_id):
     """
     supabase = get_supabase()
     res = supabase.from_('chat_ia_sessions').delete().eq('id', session_id).execute()
+    identity_map.discard('chat_ia_sessions', session_id)
     return res.data[0] if res.data else None
 
 
-def get_session_messages(session_id):
+def get_session_messages(session_id, fields=None, limit=None, cursor=None):
     """Get all messages in a chat session.
     
     Args:
         session_id (str): Session ID.
+        fields (str | list, optional): Columns to return (see lib.fields).
+        limit (int, optional): Page size; None returns every row.
+        cursor (str, optional): Cursor from the previous page.
     
     Returns:
         list: List of messages.
     """
     supabase = get_supabase()
-    res = supabase.from_('chat_ia_messages').select('*').eq('session_id', session_id).order('created_at', desc=False).execute()
+    query = supabase.from_('chat_ia_messages').select(build_select(keyset_fields(fields, 'created_at'))).eq('session_id', session_id)
+    res = apply_keyset(query, 'created_at', desc=False, cursor=cursor, limit=limit).execute()
     return res.data
 
 
+def get_recent_session_messages(session_id, count):
+    """Get the last messages of a chat session, oldest first.
+    
+    Args:
+        session_id (str): Session ID.
+        count (int): Number of messages to return.
+    
+    Returns:
+        list: Up to ``count`` most recent messages.
+    """
+    supabase = get_supabase()
+    query = supabase.from_('chat_ia_messages').select('*').eq('session_id', session_id)
+    res = apply_keyset(query, 'created_at', desc=True, limit=count).execute()
+    return list(reversed(res.data))
+
+
+def get_conversation_history(session_id, count=10):
+    """Get the history the chat agent resumes a session's conversation with.
+    
+    The newest message is left out when it is the user's: it is the message
+    being answered, which is stored before the agent runs. Ids that are not
+    session UUIDs (the agent's own conversations, e.g.
+    ``recommendation_<user_id>``) have no history.
+    
+    Args:
+        session_id (str): Session ID (the agent's conversation ID).
+        count (int): Maximum number of messages.
+    
+    Returns:
+        list: ``{'role', 'content'}`` dicts, oldest first.
+    """
+    try:
+        uuid.UUID(str(session_id))
+    except ValueError:
+        return []
+    
+    messages = get_recent_session_messages(session_id, count + 1)
+    if messages and messages[-1].get('role') == 'user':
+        messages = messages[:-1]
+    return [
+        {'role': msg.get('role', 'user'), 'content': msg.get('content', '')}
+        for msg in messages[-count:]
+    ]
+
+
 def create_message(data):
     """Create a new chat message.
     
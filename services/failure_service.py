@@ -1,24 +1,29 @@
 """Failure service for failure tracking operations."""
 from lib.db import get_supabase
+from lib.fields import build_select
+from lib.pagination import apply_keyset, keyset_fields
 
 
-def get_user_failures(user_id, severity=None):
+def get_user_failures(user_id, severity=None, fields=None, limit=None, cursor=None):
     """Get failures for a user, optionally filtered by severity.
     
     Args:
         user_id (str): User ID.
         severity (str, optional): Filter by severity.
+        fields (str | list, optional): Columns to return (see lib.fields).
+        limit (int, optional): Page size; None returns every row.
+        cursor (str, optional): Cursor from the previous page.
     
     Returns:
         list: List of failures.
     """
     supabase = get_supabase()
-    query = supabase.from_('failures').select('*').eq('user_id', user_id)
+    query = supabase.from_('failures').select(build_select(keyset_fields(fields, 'created_at'))).eq('user_id', user_id)
     
     if severity:
         query = query.eq('severity', severity)
     
-    res = query.order('created_at', desc=True).execute()
+    res = apply_keyset(query, 'created_at', desc=True, cursor=cursor, limit=limit).execute()
     return res.data
 
 
@@ -1,24 +1,29 @@
 """Goal service for goal operations."""
 from lib.db import get_supabase
+from lib.fields import build_select
+from lib.pagination import apply_keyset, keyset_fields
 
 
-def get_user_goals(user_id, is_active=None):
+def get_user_goals(user_id, is_active=None, fields=None, limit=None, cursor=None):
     """Get goals for a user, optionally filtered by active status.
     
     Args:
         user_id (str): User ID.
         is_active (bool, optional): Filter by active status.
+        fields (str | list, optional): Columns to return (see lib.fields).
+        limit (int, optional): Page size; None returns every row.
+        cursor (str, optional): Cursor from the previous page.
     
     Returns:
         list: List of goals.
     """
     supabase = get_supabase()
-    query = supabase.from_('goals').select('*').eq('user_id', user_id)
+    query = supabase.from_('goals').select(build_select(keyset_fields(fields, 'created_at'))).eq('user_id', user_id)
     
     if is_active is not None:
         query = query.eq('is_active', is_active)
     
-    res = query.order('created_at', desc=True).execute()
+    res = apply_keyset(query, 'created_at', desc=True, cursor=cursor, limit=limit).execute()
     return res.data
 
 
@@ -1,25 +1,38 @@
 """Mind task service for mind task operations."""
+from lib import identity_map
 from lib.db import get_supabase
+from lib.fields import build_select
+from lib.pagination import apply_keyset, keyset_fields
 from datetime import datetime
 
+# Default projection for task lists: the full task row plus the template
+# columns list views need (skips large ones such as desc/default_params).
+LIST_SELECT = '*, task_templates(id, key, name, category, difficulty, reward_xp, estimated_minutes)'
+TASK_EMBEDS = ('task_templates',)
 
-def get_user_mind_tasks(user_id, status=None):
+
+def get_user_mind_tasks(user_id, status=None, fields=None, limit=None, cursor=None):
     """Get mind tasks for a user, optionally filtered by status.
     
     Args:
         user_id (str): User ID.
         status (str, optional): Filter by status.
+        fields (str | list, optional): Columns to return (see lib.fields).
+        limit (int, optional): Page size; None returns every row.
+        cursor (str, optional): Cursor from the previous page.
     
     Returns:
         list: List of mind tasks.
     """
     supabase = get_supabase()
-    query = supabase.from_('tasks_mind').select('*, task_templates(*)').eq('user_id', user_id)
+    query = supabase.from_('tasks_mind').select(
+        build_select(keyset_fields(fields, 'created_at'), LIST_SELECT, TASK_EMBEDS)
+    ).eq('user_id', user_id)
     
     if status:
         query = query.eq('status', status)
     
-    res = query.order('created_at', desc=True).execute()
+    res = apply_keyset(query, 'created_at', desc=True, cursor=cursor, limit=limit).execute()
     return res.data
 
 
@@ -32,9 +45,13 @@ def get_mind_task_by_id(task_id):
     Returns:
         dict: Task data or None.
     """
+    cached = identity_map.get('tasks_mind', task_id)
+    if cached is not identity_map.MISSING:
+        return cached
+    
     supabase = get_supabase()
     res = supabase.from_('tasks_mind').select('*, task_templates(*)').eq('id', task_id).execute()
-    return res.data[0] if res.data else None
+    return identity_map.put('tasks_mind', task_id, res.data[0] if res.data else None)
 
 
 def create_mind_task(data):
@@ -51,6 +68,22 @@ def create_mind_task(data):
     return res.data[0] if res.data else None
 
 
+def create_mind_tasks(rows):
+    """Create several mind tasks in one request.
+    
+    Args:
+        rows (list): Task rows; all must have the same columns.
+    
+    Returns:
+        list: Created tasks, in the order given.
+    """
+    if not rows:
+        return []
+    supabase = get_supabase()
+    res = supabase.from_('tasks_mind').insert(rows).execute()
+    return res.data
+
+
 def update_mind_task(task_id, data):
     """Update a mind task.
     
@@ -63,7 +96,9 @@ def update_mind_task(task_id, data):
     """
     supabase = get_supabase()
     res = supabase.from_('tasks_mind').update(data).eq('id', task_id).execute()
-    return res.data[0] if res.data else None
+    if 'template_id' in data:
+        identity_map.discard('tasks_mind', task_id)
+    return identity_map.merge('tasks_mind', task_id, res.data[0] if res.data else None)
 
 
 def complete_mind_task(task_id, xp_awarded):
@@ -82,7 +117,53 @@ def complete_mind_task(task_id, xp_awarded):
         'completed_at': datetime.utcnow().isoformat(),
         'xp_awarded': xp_awarded
     }).eq('id', task_id).execute()
-    return res.data[0] if res.data else None
+    return identity_map.merge('tasks_mind', task_id, res.data[0] if res.data else None)
+
+
+def get_user_mind_tasks_by_ids(user_id, task_ids):
+    """Get a user's mind tasks by ID with their template XP reward.
+    
+    Args:
+        user_id (str): User ID (tasks owned by others are not returned).
+        task_ids (list): Task IDs.
+    
+    Returns:
+        list: Matching tasks (``id``, ``status``, ``task_templates.reward_xp``).
+    """
+    if not task_ids:
+        return []
+    supabase = get_supabase()
+    res = supabase.from_('tasks_mind').select(
+        'id, status, task_templates(reward_xp)'
+    ).eq('user_id', user_id).in_('id', list(task_ids)).execute()
+    return res.data
+
+
+def complete_mind_tasks(user_id, task_ids, xp_awarded):
+    """Mark several of a user's mind tasks as completed in one update.
+    
+    Ownership is enforced by the ``user_id`` filter of the update itself,
+    and tasks that are already completed are left untouched.
+    
+    Args:
+        user_id (str): User ID.
+        task_ids (list): Task IDs.
+        xp_awarded (int): XP to award to each task.
+    
+    Returns:
+        list: Updated tasks.
+    """
+    if not task_ids:
+        return []
+    supabase = get_supabase()
+    res = supabase.from_('tasks_mind').update({
+        'status': 'completed',
+        'completed_at': datetime.utcnow().isoformat(),
+        'xp_awarded': xp_awarded
+    }).eq('user_id', user_id).in_('id', list(task_ids)).neq('status', 'completed').execute()
+    for task in res.data:
+        identity_map.merge('tasks_mind', task['id'], task)
+    return res.data
 
 
 def delete_mind_task(task_id):
@@ -96,4 +177,5 @@ def delete_mind_task(task_id):
     """
     supabase = get_supabase()
     res = supabase.from_('tasks_mind').delete().eq('id', task_id).execute()
+    identity_map.discard('tasks_mind', task_id)
     return res.data[0] if res.data else None
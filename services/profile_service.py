@@ -1,19 +1,54 @@
-"""Profile service for user profile operations."""
+"""Profile service for user profile operations.
+
+Profiles are the most frequently read rows, so reads go through an LRU cache
+keyed by user_id (see lib.cache) that the write functions below keep
+current. ``PROFILE_CACHE_SIZE`` bounds the number of cached profiles per
+worker (default 10000) and ``PROFILE_CACHE_TTL`` how many seconds one is
+served before it is read again (default 60; ``0`` disables the cache).
+"""
+import os
+
+from lib.cache import MISSING, LRUCache
 from lib.db import get_supabase
+from lib.fields import build_select, project_rows
+
+profile_cache = LRUCache(
+    'profiles',
+    maxsize=lambda: int(os.getenv('PROFILE_CACHE_SIZE', '10000')),
+    ttl=lambda: float(os.getenv('PROFILE_CACHE_TTL', '60'))
+)
+
+
+def get_profile_cache_stats():
+    """Get hit/miss counters of the profile cache.
+    
+    Returns:
+        dict: Cache statistics.
+    """
+    return profile_cache.stats()
 
 
-def get_profile_by_user_id(user_id):
+def get_profile_by_user_id(user_id, fields=None):
     """Get user profile by user_id.
     
     Args:
         user_id (str): The user's ID.
+        fields (str | list, optional): Columns to return (see lib.fields).
     
     Returns:
         dict: Profile data or None.
     """
-    supabase = get_supabase()
-    res = supabase.from_('profiles').select('*').eq('user_id', user_id).execute()
-    return res.data[0] if res.data else None
+    build_select(fields)  # validate before answering from the cache
+    profile = profile_cache.get(user_id)
+    if profile is MISSING:
+        # An update that lands while we read wins over the row we read
+        generation = profile_cache.generation()
+        supabase = get_supabase()
+        res = supabase.from_('profiles').select('*').eq('user_id', user_id).execute()
+        profile = profile_cache.store(user_id, res.data[0] if res.data else None, generation)
+    if profile is None:
+        return None
+    return project_rows([profile], fields)[0]
 
 
 def create_profile(data):
@@ -27,7 +62,10 @@ def create_profile(data):
     """
     supabase = get_supabase()
     res = supabase.from_('profiles').insert(data).execute()
-    return res.data[0] if res.data else None
+    profile = res.data[0] if res.data else None
+    if profile is not None:
+        profile_cache.put(profile['user_id'], profile)
+    return profile
 
 
 def update_profile(user_id, data):
@@ -42,7 +80,12 @@ def update_profile(user_id, data):
     """
     supabase = get_supabase()
     res = supabase.from_('profiles').update(data).eq('user_id', user_id).execute()
-    return res.data[0] if res.data else None
+    profile = res.data[0] if res.data else None
+    if profile is not None:
+        profile_cache.put(user_id, profile)
+    else:
+        profile_cache.remove(user_id)
+    return profile
 
 
 def delete_profile(user_id):
@@ -56,4 +99,5 @@ def delete_profile(user_id):
     """
     supabase = get_supabase()
     res = supabase.from_('profiles').delete().eq('user_id', user_id).execute()
+    profile_cache.remove(user_id)
     return res.data[0] if res.data else None
@@ -1,19 +1,83 @@
-"""Statistics service for performance snapshots and metrics."""
+"""Statistics service for performance snapshots and metrics.
+
+The metric catalog is small and nearly static but is consulted for every
+field of a stats summary and of a snapshot being validated, so it is kept
+as an in-process registry indexed by ``metric_key`` and ``domain`` (see
+lib.cache) that the metric write functions below keep current.
+``METRIC_CACHE_TTL`` sets how many seconds the registry is trusted before it
+is reloaded (default 300; ``0`` disables it).
+"""
+import os
+from numbers import Number
+
+from lib.cache import SnapshotCache
 from lib.db import get_supabase
+from lib.fields import build_select, project_rows
 from datetime import datetime, timedelta
 
+# Snapshot columns summarized even when the catalog does not list them.
+NUMERIC_FIELDS = ['energy', 'stamina', 'strength', 'flexibility',
+                  'attention', 'score_body', 'score_mind']
+
+
+def _load_metric_catalog():
+    supabase = get_supabase()
+    return supabase.from_('metric_catalog').select('*').execute().data
+
+
+metric_registry = SnapshotCache(
+    'metric_catalog',
+    _load_metric_catalog,
+    indexes=('metric_key', 'domain'),
+    ttl=lambda: float(os.getenv('METRIC_CACHE_TTL', '300')),
+    key='metric_key'
+)
+
+
+def get_metric_registry_stats():
+    """Get hit/miss counters of the metric registry.
+    
+    Returns:
+        dict: Cache statistics.
+    """
+    return metric_registry.stats()
 
-def get_metric_catalog(domain=None):
+
+def get_metrics_by_keys(metric_keys):
+    """Get catalog metrics for several keys at once.
+    
+    Args:
+        metric_keys (iterable): Metric keys.
+    
+    Returns:
+        dict: Metrics by key; unknown keys are left out.
+    """
+    metric_keys = list(dict.fromkeys(metric_keys))
+    if not metric_keys:
+        return {}
+    metrics = metric_registry.find_many('metric_key', metric_keys)
+    if metrics is None:
+        supabase = get_supabase()
+        metrics = supabase.from_('metric_catalog').select('*').in_('metric_key', metric_keys).execute().data
+    return {metric['metric_key']: metric for metric in metrics}
+
+
+def get_metric_catalog(domain=None, fields=None):
     """Get all metrics from catalog, optionally filtered by domain.
     
     Args:
         domain (str, optional): Filter by domain ('body', 'mind', 'system').
+        fields (str | list, optional): Columns to return (see lib.fields).
     
     Returns:
         list: List of metrics.
     """
+    metrics = metric_registry.find('domain', domain) if domain else metric_registry.all()
+    if metrics is not None:
+        metrics.sort(key=lambda metric: metric['metric_key'])
+        return project_rows(metrics, fields)
     supabase = get_supabase()
-    query = supabase.from_('metric_catalog').select('*')
+    query = supabase.from_('metric_catalog').select(build_select(fields))
     
     if domain:
         query = query.eq('domain', domain)
@@ -31,6 +95,9 @@ def get_metric_by_key(metric_key):
     Returns:
         dict: Metric data or None.
     """
+    metrics = metric_registry.find('metric_key', metric_key)
+    if metrics is not None:
+        return metrics[0] if metrics else None
     supabase = get_supabase()
     res = supabase.from_('metric_catalog').select('*').eq('metric_key', metric_key).execute()
     return res.data[0] if res.data else None
@@ -47,7 +114,7 @@ def create_metric(data):
     """
     supabase = get_supabase()
     res = supabase.from_('metric_catalog').insert(data).execute()
-    return res.data[0] if res.data else None
+    return metric_registry.put(res.data[0] if res.data else None)
 
 
 def update_metric(metric_key, data):
@@ -62,7 +129,10 @@ def update_metric(metric_key, data):
     """
     supabase = get_supabase()
     res = supabase.from_('metric_catalog').update(data).eq('metric_key', metric_key).execute()
-    return res.data[0] if res.data else None
+    metric = res.data[0] if res.data else None
+    if metric is None or metric['metric_key'] != metric_key:
+        metric_registry.remove(metric_key)
+    return metric_registry.put(metric)
 
 
 def delete_metric(metric_key):
@@ -76,10 +146,11 @@ def delete_metric(metric_key):
     """
     supabase = get_supabase()
     res = supabase.from_('metric_catalog').delete().eq('metric_key', metric_key).execute()
+    metric_registry.remove(metric_key)
     return res.data[0] if res.data else None
 
 
-def get_user_snapshots(user_id, start_date=None, end_date=None, limit=100):
+def get_user_snapshots(user_id, start_date=None, end_date=None, limit=100, fields=None):
     """Get performance snapshots for a user.
     
     Args:
@@ -87,12 +158,13 @@ def get_user_snapshots(user_id, start_date=None, end_date=None, limit=100):
         start_date (str, optional): Start date filter (ISO format).
         end_date (str, optional): End date filter (ISO format).
         limit (int): Maximum number of results.
+        fields (str | list, optional): Columns to return (see lib.fields).
     
     Returns:
         list: List of performance snapshots.
     """
     supabase = get_supabase()
-    query = supabase.from_('performance_snapshots').select('*').eq('user_id', user_id)
+    query = supabase.from_('performance_snapshots').select(build_select(fields)).eq('user_id', user_id)
     
     if start_date:
         query = query.gte('snapshot_at', start_date)
@@ -117,6 +189,44 @@ def get_snapshot_by_id(snapshot_id):
     return res.data[0] if res.data else None
 
 
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, Number):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def validate_snapshot_metrics(data):
+    """Check snapshot values against the bounds of their catalog metrics.
+    
+    Fields that are not in the catalog (``inputs``, ``model_version``, ...)
+    are not checked.
+    
+    Args:
+        data (dict): Snapshot data.
+    
+    Raises:
+        ValueError: If a metric value is not a number or is out of range.
+    """
+    metrics = get_metrics_by_keys(data.keys())
+    for key, metric in metrics.items():
+        value = data[key]
+        if value is None:
+            continue
+        number = _as_number(value)
+        if number is None:
+            raise ValueError(f"{key} must be a number")
+        min_value, max_value = metric.get('min_value'), metric.get('max_value')
+        if (min_value is not None and number < min_value) or (max_value is not None and number > max_value):
+            raise ValueError(f"{key} must be between {min_value} and {max_value}")
+
+
 def create_snapshot(data):
     """Create a new performance snapshot.
     
@@ -125,7 +235,11 @@ def create_snapshot(data):
     
     Returns:
         dict: Created snapshot.
+    
+    Raises:
+        ValueError: If a metric value is invalid (see validate_snapshot_metrics).
     """
+    validate_snapshot_metrics(data)
     supabase = get_supabase()
     
     # Ensure snapshot_at is set
@@ -145,7 +259,11 @@ def update_snapshot(snapshot_id, data):
     
     Returns:
         dict: Updated snapshot.
+    
+    Raises:
+        ValueError: If a metric value is invalid (see validate_snapshot_metrics).
     """
+    validate_snapshot_metrics(data)
     supabase = get_supabase()
     res = supabase.from_('performance_snapshots').update(data).eq('id', snapshot_id).execute()
     return res.data[0] if res.data else None
@@ -184,6 +302,16 @@ def get_latest_snapshot(user_id):
     return res.data[0] if res.data else None
 
 
+# Snapshots are newest first, so ``last`` is the first value.
+_AGGREGATIONS = {
+    'sum': sum,
+    'avg': lambda values: sum(values) / len(values),
+    'min': min,
+    'max': max,
+    'last': lambda values: values[0],
+}
+
+
 def get_stats_summary(user_id, days=30):
     """Get aggregated statistics summary for a user over a period.
     
@@ -194,7 +322,8 @@ def get_stats_summary(user_id, days=30):
     Returns:
         dict: Summary statistics.
     """
-    start_date = (datetime.now() - timedelta(days=days)).isoformat()
+    # Whole minutes keep the summary identical between polls (see ETag support)
+    start_date = (datetime.now() - timedelta(days=days)).replace(second=0, microsecond=0).isoformat()
     snapshots = get_user_snapshots(user_id, start_date=start_date, limit=1000)
     
     if not snapshots:
@@ -205,19 +334,24 @@ def get_stats_summary(user_id, days=30):
             'latest': None
         }
     
-    # Calculate averages for numeric fields
-    numeric_fields = ['energy', 'stamina', 'strength', 'flexibility', 
-                     'attention', 'score_body', 'score_mind']
+    # Summarize the known numeric fields and every catalog metric present,
+    # reporting each metric's own aggregation as ``value``
+    metrics = {metric['metric_key']: metric for metric in get_metric_catalog()}
+    fields = NUMERIC_FIELDS + [key for key in metrics if key not in NUMERIC_FIELDS]
     
     averages = {}
-    for field in numeric_fields:
-        values = [s.get(field) for s in snapshots if s.get(field) is not None]
+    for field in fields:
+        values = [_as_number(s.get(field)) for s in snapshots]
+        values = [value for value in values if value is not None]
         if values:
+            agg_method = metrics.get(field, {}).get('agg_method') or 'avg'
             averages[field] = {
                 'avg': sum(values) / len(values),
                 'min': min(values),
                 'max': max(values),
-                'latest': snapshots[0].get(field)
+                'latest': snapshots[0].get(field),
+                'agg_method': agg_method,
+                'value': _AGGREGATIONS.get(agg_method, _AGGREGATIONS['avg'])(values)
             }
     
     return {
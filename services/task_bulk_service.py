@@ -0,0 +1,198 @@
+"""Bulk task creation and completion shared by the mind and body task endpoints."""
+from lib.db import is_rejection
+from lib.fanout import fan_out
+from services.body_task_service import complete_body_tasks, get_user_body_tasks_by_ids
+from services.mind_task_service import complete_mind_tasks, get_user_mind_tasks_by_ids
+from services.task_template_service import get_task_templates_by_ids, get_task_templates_by_keys
+
+MAX_BULK_TASKS = 100
+TASK_CREATORS = ('user', 'bot')
+TASK_STATUSES = ('pending', 'completed', 'failed', 'in_progress')
+
+
+def _validate_item(item):
+    if not isinstance(item, dict):
+        return 'Each item must be an object'
+    if not item.get('template_id') and not item.get('template_key'):
+        return 'template_id or template_key is required'
+    for field in ('template_id', 'template_key'):
+        if item.get(field) is not None and not isinstance(item[field], str):
+            return f'{field} must be a string'
+    if item.get('created_by') not in TASK_CREATORS:
+        return "created_by is required and must be 'user' or 'bot'"
+    if 'status' in item and item['status'] not in TASK_STATUSES:
+        return f"Invalid status: {item['status']}"
+    return None
+
+
+def create_tasks_bulk(items, user_id, insert):
+    """Validate, resolve and insert a batch of tasks.
+
+    Template keys and IDs are checked with one query each, and valid items
+    are inserted with one request per distinct set of columns (normally a
+    single request for the whole batch).
+
+    Args:
+        items (list): Task objects; each takes ``template_id`` or
+            ``template_key`` plus the fields of a single create.
+        user_id (str): Owner of the new tasks.
+        insert (callable): Service function inserting a list of rows, e.g.
+            ``create_mind_tasks``.
+
+    Returns:
+        list: One result per item, in order: ``{'index', 'status', 'task'}``
+            on success or ``{'index', 'status', 'error'}`` on failure.
+
+    Raises:
+        ValueError: If ``items`` is not a list of 1..MAX_BULK_TASKS entries.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError('Expected a non-empty array of tasks')
+    if len(items) > MAX_BULK_TASKS:
+        raise ValueError(f'At most {MAX_BULK_TASKS} tasks per request')
+
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        error = _validate_item(item)
+        if error:
+            results[index] = {'index': index, 'status': 400, 'error': error}
+        else:
+            valid.append(index)
+
+    keys = {items[i]['template_key'] for i in valid if not items[i].get('template_id')}
+    ids = {items[i]['template_id'] for i in valid if items[i].get('template_id')}
+    by_key, by_id = fan_out(
+        (get_task_templates_by_keys, keys, 'id,key'),
+        (get_task_templates_by_ids, ids, 'id')
+    )
+    key_to_id = {template['key']: template['id'] for template in by_key}
+    known_ids = {template['id'] for template in by_id}
+
+    groups = {}
+    for index in valid:
+        row = dict(items[index])
+        template_key = row.pop('template_key', None)
+        if not row.get('template_id'):
+            row['template_id'] = key_to_id.get(template_key)
+            if row['template_id'] is None:
+                results[index] = {'index': index, 'status': 404, 'error': f'Template not found: {template_key}'}
+                continue
+        elif row['template_id'] not in known_ids:
+            results[index] = {'index': index, 'status': 404, 'error': f"Template not found: {row['template_id']}"}
+            continue
+        row.pop('id', None)
+        row.pop('created_at', None)
+        row['user_id'] = user_id
+        groups.setdefault(frozenset(row), []).append((index, row))
+
+    for group in groups.values():
+        _insert_group(group, insert, results)
+
+    return results
+
+
+def _insert_group(group, insert, results):
+    try:
+        created = insert([row for _, row in group])
+    except Exception as e:  # noqa: BLE001
+        if is_rejection(e) and len(group) > 1:
+            # The insert is all or nothing: retry the rows one by one to
+            # tell the refused ones from the rest
+            for entry in group:
+                _insert_group([entry], insert, results)
+            return
+        status = 400 if is_rejection(e) else 500
+        error = f"Failed to create task: {getattr(e, 'message', None) or e}"
+        for index, _ in group:
+            results[index] = {'index': index, 'status': status, 'error': error}
+        return
+    for position, (index, _) in enumerate(group):
+        if position < len(created):
+            results[index] = {'index': index, 'status': 201, 'task': created[position]}
+        else:
+            results[index] = {'index': index, 'status': 500, 'error': 'Failed to create task'}
+
+
+def _reward_xp(task):
+    template = task.get('task_templates') or {}
+    return template.get('reward_xp') or 0
+
+
+def _completion_plan(task_type, requested, tasks, skipped):
+    found = {task['id']: task for task in tasks}
+    by_xp = {}
+    for task_id in requested:
+        task = found.get(task_id)
+        if task is None:
+            skipped.append({'id': task_id, 'task_type': task_type, 'reason': 'not_found'})
+        elif task.get('status') == 'completed':
+            skipped.append({'id': task_id, 'task_type': task_type, 'reason': 'already_completed'})
+        else:
+            by_xp.setdefault(_reward_xp(task), []).append(task_id)
+    return by_xp
+
+
+def complete_tasks_bulk(user_id, mind_task_ids, body_task_ids):
+    """Complete a mix of mind and body tasks and total the XP awarded.
+
+    One read per task type fetches the tasks with their template reward,
+    then one update per (task type, reward) pair marks them completed; all
+    reads and all updates run concurrently, so the cost does not grow with
+    the number of tasks. Each update filters on ``user_id``, so tasks of
+    other users are never modified.
+
+    Args:
+        user_id (str): Owner of the tasks.
+        mind_task_ids (list): Mind task IDs.
+        body_task_ids (list): Body task IDs.
+
+    Returns:
+        dict: ``completed`` (updated rows with ``task_type``), ``total_xp``
+            and ``skipped`` (``{'id', 'task_type', 'reason'}`` entries).
+
+    Raises:
+        ValueError: If the IDs are not lists of strings or exceed
+            MAX_BULK_TASKS in total.
+    """
+    for ids in (mind_task_ids, body_task_ids):
+        if not isinstance(ids, list) or not all(isinstance(task_id, str) for task_id in ids):
+            raise ValueError('mind_task_ids and body_task_ids must be arrays of task IDs')
+    mind_task_ids = list(dict.fromkeys(mind_task_ids))
+    body_task_ids = list(dict.fromkeys(body_task_ids))
+    if not mind_task_ids and not body_task_ids:
+        raise ValueError('No task IDs given')
+    if len(mind_task_ids) + len(body_task_ids) > MAX_BULK_TASKS:
+        raise ValueError(f'At most {MAX_BULK_TASKS} tasks per request')
+
+    mind_tasks, body_tasks = fan_out(
+        (get_user_mind_tasks_by_ids, user_id, mind_task_ids),
+        (get_user_body_tasks_by_ids, user_id, body_task_ids)
+    )
+    skipped = []
+    plans = [
+        ('mind', complete_mind_tasks, _completion_plan('mind', mind_task_ids, mind_tasks, skipped)),
+        ('body', complete_body_tasks, _completion_plan('body', body_task_ids, body_tasks, skipped)),
+    ]
+    updates = [
+        (task_type, complete, task_ids, xp)
+        for task_type, complete, by_xp in plans
+        for xp, task_ids in by_xp.items()
+    ]
+    results = fan_out(*[(complete, user_id, task_ids, xp) for _, complete, task_ids, xp in updates])
+
+    completed = []
+    for (task_type, _, task_ids, _), rows in zip(updates, results):
+        updated = {row['id'] for row in rows}
+        completed.extend(dict(row, task_type=task_type) for row in rows)
+        # Rows completed concurrently by another request are not re-awarded.
+        skipped.extend(
+            {'id': task_id, 'task_type': task_type, 'reason': 'already_completed'}
+            for task_id in task_ids if task_id not in updated
+        )
+
+    return {
+        'completed': completed,
+        'total_xp': sum(row.get('xp_awarded') or 0 for row in completed),
+        'skipped': skipped
+    }
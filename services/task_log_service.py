@@ -1,24 +1,45 @@
-"""Task log service for task log operations."""
+"""Task log service for task log operations.
+
+Set ``TASK_LOG_BUFFERED=true`` to queue new logs in a write-behind buffer
+(see lib.write_buffer) instead of inserting them synchronously. Tuning:
+``TASK_LOG_FLUSH_SIZE`` (default 100 rows), ``TASK_LOG_FLUSH_INTERVAL``
+(default 1.0 seconds) and ``TASK_LOG_SPILL_DIR`` (default
+``<tmp>/iam-write-buffer``; must be on local disk that survives restarts
+of the worker).
+"""
+import os
+import tempfile
+
 from lib.db import get_supabase
+from lib.fields import build_select
+from lib.pagination import apply_keyset, keyset_fields
+from lib.write_buffer import get_buffer
+
+# Columns a queued log may set; the buffer assigns ``id`` itself, so a
+# client cannot overwrite an existing log through the batch upsert.
+TASK_LOG_COLUMNS = ('user_id', 'task_table', 'task_id', 'action', 'notes', 'metadata', 'timestamp')
 
 
-def get_user_task_logs(user_id, task_table=None):
+def get_user_task_logs(user_id, task_table=None, fields=None, limit=None, cursor=None):
     """Get task logs for a user, optionally filtered by task_table.
     
     Args:
         user_id (str): User ID.
         task_table (str, optional): Filter by task table ('tasks_mind' or 'tasks_body').
+        fields (str | list, optional): Columns to return (see lib.fields).
+        limit (int, optional): Page size; None returns every row.
+        cursor (str, optional): Cursor from the previous page.
     
     Returns:
         list: List of task logs.
     """
     supabase = get_supabase()
-    query = supabase.from_('task_logs').select('*').eq('user_id', user_id)
+    query = supabase.from_('task_logs').select(build_select(keyset_fields(fields, 'timestamp'))).eq('user_id', user_id)
     
     if task_table:
         query = query.eq('task_table', task_table)
     
-    res = query.order('timestamp', desc=True).execute()
+    res = apply_keyset(query, 'timestamp', desc=True, cursor=cursor, limit=limit).execute()
     return res.data
 
 
@@ -50,6 +71,49 @@ def create_task_log(data):
     return res.data[0] if res.data else None
 
 
+def is_task_log_buffered():
+    """Whether new task logs go through the write-behind buffer."""
+    return os.getenv('TASK_LOG_BUFFERED', 'false').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _task_log_buffer():
+    return get_buffer(
+        'task_logs',
+        spill_dir=os.getenv('TASK_LOG_SPILL_DIR', os.path.join(tempfile.gettempdir(), 'iam-write-buffer')),
+        flush_size=int(os.getenv('TASK_LOG_FLUSH_SIZE', '100')),
+        flush_interval=float(os.getenv('TASK_LOG_FLUSH_INTERVAL', '1.0')),
+        timestamp_column='timestamp'
+    )
+
+
+def enqueue_task_log(data):
+    """Queue a task log for a batched insert.
+    
+    The entry is on local disk when this returns and reaches the database
+    on the next flush; reads do not see it until then. Keys outside
+    TASK_LOG_COLUMNS are dropped.
+    
+    Args:
+        data (dict): Log data.
+    
+    Returns:
+        dict: The queued log, with its ``id`` and ``timestamp`` assigned.
+    """
+    row = {column: data[column] for column in TASK_LOG_COLUMNS if column in data}
+    return _task_log_buffer().add(row)
+
+
+def flush_task_logs():
+    """Insert every queued task log now.
+    
+    Returns:
+        int: Number of logs written.
+    """
+    if not is_task_log_buffered():
+        return 0
+    return _task_log_buffer().flush()
+
+
 def delete_task_log(log_id):
     """Delete a task log.
     
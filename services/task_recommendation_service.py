@@ -5,10 +5,15 @@ from datetime import datetime, timedelta
 from services.mind_task_service import get_user_mind_tasks
 from services.body_task_service import get_user_body_tasks
 from services.task_template_service import get_templates_by_category
+from lib.fanout import fan_out
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Columns the pattern analysis and AI prompt read from recent tasks
+RECENT_TASK_FIELDS = ['id', 'status', 'template_id', 'created_at',
+                      'task_templates.name', 'task_templates.category']
+
 
 def get_recent_tasks(user_id, limit=10):
     """Get recent tasks from both mind and body categories.
@@ -20,8 +25,10 @@ def get_recent_tasks(user_id, limit=10):
     Returns:
         dict: Recent tasks grouped by category.
     """
-    mind_tasks = get_user_mind_tasks(user_id)[:limit]
-    body_tasks = get_user_body_tasks(user_id)[:limit]
+    mind_tasks, body_tasks = fan_out(
+        lambda: get_user_mind_tasks(user_id, fields=RECENT_TASK_FIELDS, limit=limit),
+        lambda: get_user_body_tasks(user_id, fields=RECENT_TASK_FIELDS, limit=limit)
+    )
     
     return {
         'mind': mind_tasks,
@@ -30,6 +37,18 @@ def get_recent_tasks(user_id, limit=10):
     }
 
 
+def _get_mind_and_body_templates():
+    """Fetch mind and body templates concurrently.
+    
+    Returns:
+        tuple: (mind templates, body templates).
+    """
+    return tuple(fan_out(
+        (get_templates_by_category, 'mind'),
+        (get_templates_by_category, 'body')
+    ))
+
+
 def analyze_task_patterns(recent_tasks):
     """Analyze patterns in recent tasks.
     
@@ -108,8 +127,7 @@ def generate_recommendations_simple(user_id):
     # Decide distribution based on balance needs
     if analysis['needs_balance'] == 'body':
         # Recommend 2 body, 1 mind
-        mind_templates = get_templates_by_category('mind')
-        body_templates = get_templates_by_category('body')
+        mind_templates, body_templates = _get_mind_and_body_templates()
         
         mind_selected = select_templates_by_pattern(mind_templates, analysis, 1)
         body_selected = select_templates_by_pattern(body_templates, analysis, 2)
@@ -118,8 +136,7 @@ def generate_recommendations_simple(user_id):
         recommendations.extend(body_selected)
     elif analysis['needs_balance'] == 'mind':
         # Recommend 2 mind, 1 body
-        mind_templates = get_templates_by_category('mind')
-        body_templates = get_templates_by_category('body')
+        mind_templates, body_templates = _get_mind_and_body_templates()
         
         mind_selected = select_templates_by_pattern(mind_templates, analysis, 2)
         body_selected = select_templates_by_pattern(body_templates, analysis, 1)
@@ -128,8 +145,7 @@ def generate_recommendations_simple(user_id):
         recommendations.extend(body_selected)
     else:
         # Balanced approach - mix of both
-        mind_templates = get_templates_by_category('mind')
-        body_templates = get_templates_by_category('body')
+        mind_templates, body_templates = _get_mind_and_body_templates()
         
         # Alternate or mix
         all_templates = mind_templates + body_templates
@@ -175,13 +191,12 @@ def generate_recommendations_with_ai(user_id):
         list: List of 3 recommended task templates with AI-generated insights.
     """
     try:
-        import asyncio
+        from lib import event_loop
         from services.agent_service import get_agent_service
         
         # Get recent tasks and templates
         recent_tasks = get_recent_tasks(user_id, limit=15)
-        mind_templates = get_templates_by_category('mind')
-        body_templates = get_templates_by_category('body')
+        mind_templates, body_templates = _get_mind_and_body_templates()
         all_templates = mind_templates + body_templates
         
         # Prepare context for AI
@@ -208,7 +223,7 @@ Ejemplo: ["uuid1", "uuid2", "uuid3"]
         
         # Get agent service and generate response
         agent_service = get_agent_service()
-        result = asyncio.run(
+        result = event_loop.run(
             agent_service.agent.ask(
                 context,
                 conversation_id=f"recommendation_{user_id}",
@@ -243,7 +258,7 @@ Ejemplo: ["uuid1", "uuid2", "uuid3"]
         
         return recommendations
         
-    except (ValueError, KeyError, TypeError, ImportError) as e:
+    except (ValueError, KeyError, TypeError, ImportError, TimeoutError) as e:
         logger.error("Error generating AI recommendations: %s", str(e))
         # Fall back to simple recommendations
         return generate_recommendations_simple(user_id)
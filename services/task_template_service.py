@@ -1,15 +1,54 @@
-"""Task template service for task template operations."""
+"""Task template service for task template operations.
+
+Templates change rarely and are read on nearly every recommendation and
+agent tool call, so reads are served from an in-process snapshot of the
+whole table (see lib.cache) that the write functions below keep current.
+``TEMPLATE_CACHE_TTL`` sets how many seconds a snapshot is trusted before it
+is reloaded (default 300; ``0`` disables the cache).
+"""
+import os
+
+from lib.cache import SnapshotCache
 from lib.db import get_supabase
+from lib.fields import build_select, project_rows
+
+
+def _load_task_templates():
+    supabase = get_supabase()
+    return supabase.from_('task_templates').select('*').execute().data
 
 
-def get_all_task_templates():
+template_cache = SnapshotCache(
+    'task_templates',
+    _load_task_templates,
+    indexes=('id', 'key', 'category'),
+    ttl=lambda: float(os.getenv('TEMPLATE_CACHE_TTL', '300'))
+)
+
+
+def get_template_cache_stats():
+    """Get hit/miss counters of the template cache.
+    
+    Returns:
+        dict: Cache statistics.
+    """
+    return template_cache.stats()
+
+
+def get_all_task_templates(fields=None):
     """Get all task templates.
     
+    Args:
+        fields (str | list, optional): Columns to return (see lib.fields).
+    
     Returns:
         list: List of task templates.
     """
+    templates = template_cache.all()
+    if templates is not None:
+        return project_rows(templates, fields)
     supabase = get_supabase()
-    res = supabase.from_('task_templates').select('*').execute()
+    res = supabase.from_('task_templates').select(build_select(fields)).execute()
     return res.data
 
 
@@ -22,6 +61,9 @@ def get_task_template_by_id(template_id):
     Returns:
         dict: Template data or None.
     """
+    templates = template_cache.find('id', template_id)
+    if templates is not None:
+        return templates[0] if templates else None
     supabase = get_supabase()
     res = supabase.from_('task_templates').select('*').eq('id', template_id).execute()
     return res.data[0] if res.data else None
@@ -36,22 +78,69 @@ def get_task_template_by_key(key):
     Returns:
         dict: Template data or None.
     """
+    templates = template_cache.find('key', key)
+    if templates is not None:
+        return templates[0] if templates else None
     supabase = get_supabase()
     res = supabase.from_('task_templates').select('*').eq('key', key).execute()
     return res.data[0] if res.data else None
 
 
-def get_templates_by_category(category):
+def get_task_templates_by_keys(keys, fields=None):
+    """Get the task templates matching any of the given keys.
+    
+    Args:
+        keys (list): Template keys.
+        fields (str | list, optional): Columns to return (see lib.fields).
+    
+    Returns:
+        list: Matching templates (unknown keys are simply absent).
+    """
+    if not keys:
+        return []
+    templates = template_cache.find_many('key', keys)
+    if templates is not None:
+        return project_rows(templates, fields)
+    supabase = get_supabase()
+    res = supabase.from_('task_templates').select(build_select(fields)).in_('key', list(keys)).execute()
+    return res.data
+
+
+def get_task_templates_by_ids(template_ids, fields=None):
+    """Get the task templates matching any of the given IDs.
+    
+    Args:
+        template_ids (list): Template IDs.
+        fields (str | list, optional): Columns to return (see lib.fields).
+    
+    Returns:
+        list: Matching templates (unknown IDs are simply absent).
+    """
+    if not template_ids:
+        return []
+    templates = template_cache.find_many('id', template_ids)
+    if templates is not None:
+        return project_rows(templates, fields)
+    supabase = get_supabase()
+    res = supabase.from_('task_templates').select(build_select(fields)).in_('id', list(template_ids)).execute()
+    return res.data
+
+
+def get_templates_by_category(category, fields=None):
     """Get templates by category.
     
     Args:
         category (str): Category ('mind' or 'body').
+        fields (str | list, optional): Columns to return (see lib.fields).
     
     Returns:
         list: List of templates.
     """
+    templates = template_cache.find('category', category)
+    if templates is not None:
+        return project_rows(templates, fields)
     supabase = get_supabase()
-    res = supabase.from_('task_templates').select('*').eq('category', category).execute()
+    res = supabase.from_('task_templates').select(build_select(fields)).eq('category', category).execute()
     return res.data
 
 
@@ -66,7 +155,7 @@ def create_task_template(data):
     """
     supabase = get_supabase()
     res = supabase.from_('task_templates').insert(data).execute()
-    return res.data[0] if res.data else None
+    return template_cache.put(res.data[0] if res.data else None)
 
 
 def update_task_template(template_id, data):
@@ -81,7 +170,7 @@ def update_task_template(template_id, data):
     """
     supabase = get_supabase()
     res = supabase.from_('task_templates').update(data).eq('id', template_id).execute()
-    return res.data[0] if res.data else None
+    return template_cache.put(res.data[0] if res.data else None)
 
 
 def delete_task_template(template_id):
@@ -95,4 +184,5 @@ def delete_task_template(template_id):
     """
     supabase = get_supabase()
     res = supabase.from_('task_templates').delete().eq('id', template_id).execute()
+    template_cache.remove(template_id)
     return res.data[0] if res.data else None
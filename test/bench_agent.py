@@ -0,0 +1,172 @@
+"""
+Benchmark: concurrent chat turns per worker, blocking vs. async OpenAI client
+Starts a local fake OpenAI server that answers each completion after a fixed
+latency (the first one of a turn with a tool call), then runs many
+``AIAgent.ask`` turns concurrently on one event loop, as a worker would.
+With the blocking client the turns run one after another; with the async
+client they overlap. Last, one turn is timed with ``ask`` and with
+``ask_stream``: time to the first token against time to the whole answer.
+
+Run with: python test/bench_agent.py [turns] [latency_ms]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.agent import AIAgent
+
+ANSWER = 'Keep going! You completed three tasks today, one more than yesterday.'
+
+
+def completion(message):
+    return {
+        'id': 'chatcmpl-bench', 'object': 'chat.completion', 'created': 0, 'model': 'fake',
+        'choices': [{'index': 0, 'message': message, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15},
+    }
+
+
+def chunk(delta):
+    return {
+        'id': 'chatcmpl-bench', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'fake',
+        'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}],
+    }
+
+
+def stream_chunks(message):
+    """The chunks of a streamed ``message``: tool calls in fragments, text word by word."""
+    if message.get('tool_calls'):
+        call = message['tool_calls'][0]
+        arguments = call['function']['arguments']
+        return [
+            chunk({'role': 'assistant', 'tool_calls': [{'index': 0, 'id': call['id'], 'type': 'function',
+                                                        'function': {'name': call['function']['name'], 'arguments': ''}}]}),
+            chunk({'tool_calls': [{'index': 0, 'function': {'arguments': arguments[:5]}}]}),
+            chunk({'tool_calls': [{'index': 0, 'function': {'arguments': arguments[5:]}}]}),
+        ]
+    words = message['content'].split(' ')
+    return [chunk({'role': 'assistant', 'content': word if i == 0 else ' ' + word}) for i, word in enumerate(words)]
+
+
+def fake_server(latency, token_delay=0.0):
+    """Fake ``/v1/chat/completions`` endpoint; returns (server, base_url).
+
+    Each completion starts after ``latency`` seconds and takes
+    ``token_delay`` more per chunk: streamed ones send a chunk every
+    ``token_delay`` seconds, the others are sent whole at the end.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            time.sleep(latency)
+            if request.get('tools') and request['messages'][-1]['role'] == 'user':
+                message = {'role': 'assistant', 'content': None, 'tool_calls': [{
+                    'id': 'call_1', 'type': 'function',
+                    'function': {'name': 'get_user_stats', 'arguments': '{"user_id": "bench"}'}}]}
+            else:
+                message = {'role': 'assistant', 'content': ANSWER}
+            if request.get('stream'):
+                self.stream(stream_chunks(message))
+                return
+            time.sleep(token_delay * len(stream_chunks(message)))  # generated before it is sent
+            body = json.dumps(completion(message)).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self, chunks):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i, data in enumerate(chunks + ['[DONE]']):
+                if i:
+                    time.sleep(token_delay)
+                event = f"data: {data if isinstance(data, str) else json.dumps(data)}\n\n".encode('utf-8')
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(event), event))
+                self.wfile.flush()
+            self.wfile.write(b'0\r\n\r\n')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/v1'
+
+
+def make_agent(use_async_client, tool_latency):
+    agent = AIAgent(name='BenchAgent', model='fake', use_async_client=use_async_client)
+
+    @agent.register_function('get_user_stats', 'Stats for a user',
+                             {'type': 'object', 'properties': {'user_id': {'type': 'string'}}})
+    def get_user_stats(user_id):
+        time.sleep(tool_latency)  # a database roundtrip
+        return {'user_id': user_id, 'completed': 3}
+
+    return agent
+
+
+async def turns(agent, count):
+    results = await asyncio.gather(*(agent.ask('How am I doing?', conversation_id=f'bench_{i}')
+                                     for i in range(count)))
+    assert all(result['success'] for result in results), results[0]
+
+
+async def first_token(agent):
+    start = time.perf_counter()
+    first = None
+    async for event in agent.ask_stream('How am I doing?', conversation_id='bench_stream'):
+        if event['type'] == 'token' and first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def run(count=50, latency_ms=100):
+    latency = latency_ms / 1000
+    server, base_url = fake_server(latency, token_delay=latency / 5)
+    os.environ['OPENAI_BASE_URL'] = base_url
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-bench')
+
+    print("=" * 64)
+    print(f"Agent concurrency benchmark ({count} turns, 2 completions of {latency_ms} ms "
+          f"+ 1 tool call of {latency_ms // 4} ms each)")
+    print("=" * 64)
+
+    results = {}
+    for name, use_async in (('blocking', False), ('async', True)):
+        agent = make_agent(use_async, latency / 4)
+        start = time.perf_counter()
+        asyncio.run(turns(agent, count))
+        elapsed = time.perf_counter() - start
+        results[name] = count / elapsed
+        print(f"   {name:<8} {elapsed * 1000:9.0f} ms   {results[name]:7.1f} turns/s per worker")
+    print(f"   throughput: {results['async'] / results['blocking']:.1f}x")
+
+    agent = make_agent(True, latency / 4)
+    start = time.perf_counter()
+    asyncio.run(agent.ask('How am I doing?', conversation_id='bench_ask'))
+    whole = time.perf_counter() - start
+    first, streamed = asyncio.run(first_token(agent))
+    print(f"\nOne turn, {len(ANSWER.split())} tokens of {latency_ms // 5} ms each:")
+    print(f"   ask          answer after {whole * 1000:6.0f} ms")
+    print(f"   ask_stream   first token after {first * 1000:6.0f} ms, answer after {streamed * 1000:6.0f} ms")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    run(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,90 @@
+"""
+Benchmark: CPU cost vs. bytes saved when compressing API responses
+Serializes representative payloads (task list with embedded templates, chat
+history, snapshot list) and times each encoding/level of lib.compression.
+
+Run with: python test/bench_compression.py [iterations]
+"""
+
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib import compression
+
+
+def task_list(count=200):
+    return [
+        {'id': f'00000000-0000-0000-0000-{i:012d}', 'user_id': 'bench-user', 'template_id': f'tpl-{i % 20}',
+         'status': ('pending', 'completed')[i % 2], 'created_by': 'bot', 'params': {'minutes': 10 + i % 30},
+         'scheduled_at': f'2025-01-{i % 28 + 1:02d}T08:00:00+00:00', 'created_at': '2025-01-01T00:00:00+00:00',
+         'task_templates': {'id': f'tpl-{i % 20}', 'key': f'meditation_{i % 20}', 'name': f'Meditation {i % 20}',
+                            'category': 'mind', 'difficulty': 'easy', 'estimated_minutes': 10, 'reward_xp': 20}}
+        for i in range(count)
+    ]
+
+
+def chat_history(count=100):
+    return [
+        {'id': f'msg-{i}', 'session_id': 'session-1', 'role': ('user', 'assistant')[i % 2],
+         'content': ("Hoy me siento con poca energía, ¿qué tarea me recomiendas? " * 2 if i % 2 else
+                     f"Te recomiendo una meditación guiada de {10 + i % 5} minutos y una caminata ligera. "
+                     "Ambas suman experiencia y ayudan a recuperar energía."),
+         'created_at': f'2025-01-01T10:{i % 60:02d}:00+00:00'}
+        for i in range(count)
+    ]
+
+
+def snapshot_list(count=365):
+    return [
+        {'id': f'snap-{i}', 'user_id': 'bench-user', 'snapshot_at': f'2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:00',
+         'energy': 50 + i % 40, 'stamina': 40 + i % 50, 'strength': 30 + i % 60, 'flexibility': 20 + i % 70,
+         'attention': 60 + i % 30, 'score_body': round(55.5 + i % 20, 1), 'score_mind': round(65.25 + i % 15, 2),
+         'model_version': 'v1.0', 'inputs': {'task_count': i % 10, 'workout_time': i % 90}}
+        for i in range(count)
+    ]
+
+
+def settings():
+    cases = [('gzip', level) for level in (1, 6, 9)]
+    if compression.brotli is not None:
+        cases += [('br', quality) for quality in (1, 4, 11)]
+    return cases
+
+
+def run(iterations=50):
+    payloads = {
+        'task list (200, embedded)': json.dumps(task_list()).encode('utf-8'),
+        'chat history (100)': json.dumps(chat_history(), ensure_ascii=False).encode('utf-8'),
+        'snapshots (365)': json.dumps(snapshot_list()).encode('utf-8'),
+    }
+
+    print("=" * 72)
+    print(f"Compression benchmark ({iterations} iterations)")
+    if compression.brotli is None:
+        print("brotli not installed: gzip only")
+    print("=" * 72)
+
+    for label, data in payloads.items():
+        print(f"\n{label}: {len(data) / 1024:.1f} KiB")
+        for encoding, level in settings():
+            os.environ['COMPRESSION_LEVEL'] = str(level)
+            os.environ['COMPRESSION_BROTLI_QUALITY'] = str(level)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                compressed = compression.compress(data, encoding)
+            elapsed = (time.perf_counter() - start) / iterations * 1000
+            saved = len(data) - len(compressed)
+            print(f"   {encoding:>4} level {level:<2} {elapsed:7.2f} ms  {len(compressed) / 1024:7.1f} KiB  "
+                  f"saved {saved / len(data):5.1%}  ({saved / 1024 / max(elapsed, 1e-6):7.1f} KiB saved per ms)")
+
+    os.environ.pop('COMPRESSION_LEVEL', None)
+    os.environ.pop('COMPRESSION_BROTLI_QUALITY', None)
+
+
+if __name__ == '__main__':
+    run(*(int(arg) for arg in sys.argv[1:2]))
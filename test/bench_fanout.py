@@ -0,0 +1,81 @@
+"""
+Benchmark: sequential vs. fan-out reads against the in-process backend
+Simulates a PostgREST roundtrip with a fixed per-query latency and times the
+handlers that issue several independent reads.
+
+Run with: python test/bench_fanout.py [latency_ms] [iterations]
+"""
+
+import logging
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib import fanout
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from services.task_recommendation_service import get_recent_tasks
+from tools.query_tools import GetUserStatsTool
+
+
+def build_backend(latency):
+    backend = InMemoryBackend(latency=latency)
+    backend.seed('task_templates', [
+        {'id': f'tpl-{i}', 'key': f'tpl_{i}', 'name': f'Template {i}',
+         'category': 'mind' if i % 2 else 'body', 'reward_xp': 10 * i}
+        for i in range(20)
+    ])
+    backend.seed('profiles', [{'user_id': 'bench-user', 'level': 3, 'total_xp': 1200}])
+    for table in ('tasks_mind', 'tasks_body'):
+        backend.seed(table, [
+            {'user_id': 'bench-user', 'template_id': f'tpl-{i % 20}', 'status': 'pending',
+             'created_at': f'2025-01-{(i % 28) + 1:02d}T00:00:00'}
+            for i in range(200)
+        ])
+    backend.seed('performance_snapshots', [
+        {'user_id': 'bench-user', 'snapshot_at': f'2025-01-{(i % 28) + 1:02d}T00:00:00', 'energy': i % 10}
+        for i in range(60)
+    ])
+    return backend
+
+
+def timed(label, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - start) / iterations * 1000
+    print(f"   {label:<40} {elapsed:8.2f} ms/call")
+    return elapsed
+
+
+def run(latency_ms=20.0, iterations=20):
+    logging.disable(logging.INFO)
+    set_backend(build_backend(latency_ms / 1000))
+    stats_tool = GetUserStatsTool()
+
+    cases = [
+        ("GetUserStatsTool.execute (3 reads)", lambda: stats_tool.execute(user_id='bench-user')),
+        ("get_recent_tasks (2 reads)", lambda: get_recent_tasks('bench-user')),
+    ]
+
+    print("=" * 60)
+    print(f"Fan-out benchmark ({latency_ms:.0f} ms simulated roundtrip, {iterations} iterations)")
+    print("=" * 60)
+
+    for label, func in cases:
+        print(f"\n{label}")
+        os.environ['DB_FANOUT_WORKERS'] = '0'
+        sequential = timed("sequential", func, iterations)
+        os.environ['DB_FANOUT_WORKERS'] = '8'
+        fanout.shutdown()
+        concurrent = timed("fan-out", func, iterations)
+        print(f"   speedup: {sequential / concurrent:.2f}x")
+
+    set_backend(None)
+
+
+if __name__ == '__main__':
+    run(*(float(arg) for arg in sys.argv[1:2]), *(int(arg) for arg in sys.argv[2:3]))
@@ -0,0 +1,68 @@
+"""
+Benchmark: stdlib vs. orjson Flask JSON providers on task-list payloads
+Times ``app.json.response(rows)`` (what ``jsonify`` does) and request body
+parsing for task lists with embedded templates of several sizes.
+
+Run with: python test/bench_json.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from lib.json_provider import OrjsonProvider, orjson
+
+
+def task_list(count):
+    return [
+        {'id': f'00000000-0000-0000-0000-{i:012d}', 'user_id': 'bench-user', 'template_id': f'tpl-{i % 20}',
+         'status': ('pending', 'completed')[i % 2], 'created_by': 'bot', 'params': {'minutes': 10 + i % 30},
+         'scheduled_at': f'2025-01-{i % 28 + 1:02d}T08:00:00+00:00', 'created_at': '2025-01-01T00:00:00+00:00',
+         'completed_at': None, 'notes': 'Respiración y atención plena',
+         'task_templates': {'id': f'tpl-{i % 20}', 'key': f'meditation_{i % 20}', 'name': f'Meditation {i % 20}',
+                            'category': 'mind', 'difficulty': 'easy', 'estimated_minutes': 10, 'reward_xp': 20}}
+        for i in range(count)
+    ]
+
+
+def timed(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def run(iterations=200):
+    if orjson is None:
+        print("orjson is not installed; nothing to compare")
+        return
+
+    app = Flask(__name__)
+    providers = {'stdlib': DefaultJSONProvider(app), 'orjson': OrjsonProvider(app)}
+
+    print("=" * 64)
+    print(f"JSON provider benchmark ({iterations} iterations)")
+    print("=" * 64)
+
+    with app.app_context():
+        for count in (50, 200, 1000):
+            rows = task_list(count)
+            body = providers['stdlib'].dumps(rows).encode('utf-8')
+            print(f"\ntask list ({count} rows, {len(body) / 1024:.0f} KiB)")
+            results = {}
+            for name, provider in providers.items():
+                encode = timed(lambda p=provider: p.response(rows), iterations)
+                decode = timed(lambda p=provider: p.loads(body), iterations)
+                results[name] = encode
+                print(f"   {name:<8} encode {encode:7.3f} ms   decode {decode:7.3f} ms")
+            print(f"   encode speedup: {results['stdlib'] / results['orjson']:.1f}x")
+
+
+if __name__ == '__main__':
+    run(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,97 @@
+"""
+Benchmark: compiled, indexed bot rule evaluation vs. interpreting every rule
+Evaluates a stream of events against thousands of rules, the way an event
+handler would without the engine (re-sort and re-interpret every rule per
+event) and with lib.rule_engine (compile once, test only indexed candidates).
+
+Run with: python test/bench_rules.py [rules] [events]
+"""
+
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.rule_engine import RuleSet, compile_condition
+
+EVENT_TYPES = ['task_completed', 'failure_recorded', 'chat_message', 'schedule']
+CATEGORIES = ['mind', 'body']
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def build_rules(count, rng):
+    rules = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            condition = {'event': 'task_completed', 'category': rng.choice(CATEGORIES),
+                         'streak': {'gte': rng.randint(1, 30)}}
+        elif kind == 1:
+            condition = {'event': 'failure_recorded', 'reason': f'reason_{rng.randint(0, 50)}'}
+        elif kind == 2:
+            condition = {'event': 'chat_message', 'any': [{'mood': 'sad'}, {'energy': {'lt': rng.randint(1, 5)}}]}
+        else:
+            condition = {'time': f'{rng.randint(6, 22):02d}:00', 'days': rng.sample(DAYS, 3)}
+        rules.append({'id': f'rule-{i}', 'priority': rng.randint(0, 100), 'active': True,
+                      'condition': condition, 'action': {'type': 'noop'}})
+    return rules
+
+
+def build_events(count, rng):
+    events = []
+    for _ in range(count):
+        event_type = rng.choice(EVENT_TYPES)
+        event = {'type': event_type, 'user_id': 'bench-user'}
+        if event_type == 'task_completed':
+            event.update(category=rng.choice(CATEGORIES), streak=rng.randint(0, 30))
+        elif event_type == 'failure_recorded':
+            event.update(reason=f'reason_{rng.randint(0, 50)}')
+        elif event_type == 'chat_message':
+            event.update(mood=rng.choice(['sad', 'ok']), energy=rng.randint(0, 10))
+        else:
+            event.update(time=f'{rng.randint(6, 22):02d}:00', day=rng.choice(DAYS))
+        events.append(event)
+    return events
+
+
+def naive(rules, events):
+    matched = 0
+    for event in events:
+        for rule in sorted(rules, key=lambda r: -r['priority']):
+            if compile_condition(rule['condition'])(event):
+                matched += 1
+    return matched
+
+
+def compiled(rules, events):
+    rule_set = RuleSet(rules)
+    return sum(len(rule_set.match(event)) for event in events)
+
+
+def run(rule_count=2000, event_count=500):
+    rng = random.Random(42)
+    rules = build_rules(rule_count, rng)
+    events = build_events(event_count, rng)
+
+    print("=" * 60)
+    print(f"Bot rule benchmark ({rule_count} rules x {event_count} events)")
+    print("=" * 60)
+
+    results = {}
+    for label, func in (("interpret every rule", naive), ("compiled + indexed", compiled)):
+        start = time.perf_counter()
+        results[label] = func(rules, events)
+        elapsed = time.perf_counter() - start
+        print(f"   {label:<30} {elapsed * 1000:9.1f} ms  ({elapsed / event_count * 1e6:8.1f} us/event)")
+        results[label + ' time'] = elapsed
+
+    assert results["interpret every rule"] == results["compiled + indexed"], "engines disagree"
+    print(f"   matches: {results['compiled + indexed']}")
+    print(f"   speedup: {results['interpret every rule time'] / results['compiled + indexed time']:.1f}x")
+
+
+if __name__ == '__main__':
+    run(*(int(arg) for arg in sys.argv[1:3]))
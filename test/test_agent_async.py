@@ -0,0 +1,96 @@
+"""
+Tests for the async OpenAI code path of AIAgent.ask (against a local fake server)
+Run with: python -m pytest test/test_agent_async.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from bench_agent import ANSWER, fake_server, make_agent, turns
+from lib import event_loop
+
+LATENCY = 0.1
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server, url = fake_server(LATENCY)
+    yield url
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def openai_env(base_url, monkeypatch):
+    monkeypatch.setenv('OPENAI_BASE_URL', base_url)
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+
+
+def test_ask_runs_tool_calls_and_returns_final_answer():
+    agent = make_agent(True, 0)
+    result = asyncio.run(agent.ask('How am I doing?', conversation_id='s1'))
+    assert result['success'] and result['response'] == ANSWER
+    assert result['iterations'] == 2
+    assert result['function_calls'][0]['result'] == {'success': True, 'result': {'user_id': 'bench', 'completed': 3}}
+    roles = [message['role'] for message in agent.conversations['s1'].get_messages()]
+    assert roles == ['system', 'user', 'assistant', 'tool', 'assistant']
+
+
+def test_concurrent_turns_overlap_on_one_loop():
+    agent = make_agent(True, LATENCY / 4)
+    start = time.perf_counter()
+    asyncio.run(turns(agent, 8))
+    # 8 sequential turns would take 8 * 2.25 * LATENCY
+    assert time.perf_counter() - start < 8 * LATENCY
+    assert agent.get_stats()['successful_requests'] == 8
+
+
+def test_blocking_client_still_supported():
+    agent = make_agent(False, 0)
+    result = asyncio.run(agent.ask('How am I doing?', conversation_id='s1'))
+    assert result['success'] and result['function_calls']
+    assert agent._async_client is None
+
+
+def test_blocking_client_does_not_stall_other_turns_on_the_loop():
+    agent = make_agent(False, 0)
+    start = time.perf_counter()
+    asyncio.run(turns(agent, 4))
+    # 4 turns one after another would take 4 * 2 * LATENCY
+    assert time.perf_counter() - start < 4 * LATENCY
+
+
+def test_blocking_client_streams_from_a_worker_thread():
+    agent = make_agent(False, 0)
+
+    async def collect():
+        return [event async for event in agent.ask_stream('How am I doing?', conversation_id='s1')]
+
+    events = asyncio.run(collect())
+    assert events[-1]['result']['response'] == ANSWER
+    assert ''.join(event['content'] for event in events if event['type'] == 'token') == ANSWER
+
+
+def test_async_client_follows_the_event_loop():
+    agent = make_agent(True, 0)
+
+    async def client():
+        return agent.async_client
+
+    first = asyncio.run(client())
+    assert asyncio.run(client()) is not first
+
+
+def test_async_client_survives_across_requests_on_the_background_loop():
+    agent = make_agent(True, 0)
+    assert event_loop.run(agent.ask('Hi', conversation_id='s1'))['success']
+    client = agent._async_client
+    assert event_loop.run(agent.ask('Hi', conversation_id='s2'))['success']
+    assert agent._async_client is client
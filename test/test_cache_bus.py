@@ -0,0 +1,96 @@
+"""
+Tests for the cross-process cache invalidation bus
+Run with: python -m pytest test/test_cache_bus.py
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import types
+
+# Add parent directory to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from lib import cache_bus
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from services.task_template_service import get_task_template_by_id, template_cache
+
+
+def publish_from_other_process(path, table, key):
+    code = (
+        "from lib.cache_bus import SQLiteBus; "
+        f"SQLiteBus({path!r}).publish({table!r}, {key!r})"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+
+def setup_function():
+    global backend  # noqa: PLW0603
+    backend = InMemoryBackend()
+    backend.seed('task_templates', [{'id': 'tpl-1', 'key': 'run', 'name': 'Run'}])
+    set_backend(backend)
+
+
+def teardown_function():
+    cache_bus.set_bus(None)
+    set_backend(None)
+
+
+def test_events_from_other_processes_only(tmp_path):
+    path = str(tmp_path / 'bus.sqlite3')
+    bus = cache_bus.SQLiteBus(path)
+    bus.poll()
+    bus.publish('task_templates', 'own-write')
+    publish_from_other_process(path, 'task_templates', 'tpl-1')
+    assert bus.poll() == [('task_templates', 'tpl-1')]
+    assert bus.poll() == []
+
+
+def test_remote_write_invalidates_local_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('CACHE_BUS_POLL_INTERVAL', '60')
+    path = str(tmp_path / 'bus.sqlite3')
+    cache_bus.set_bus(cache_bus.SQLiteBus(path))
+    cache_bus.poll(force=True)
+    assert get_task_template_by_id('tpl-1')['name'] == 'Run'
+    loads = template_cache.stats()['loads']
+
+    # Another worker renames the template in the database and announces it.
+    backend.rows('task_templates')[0]['name'] = 'Long run'
+    publish_from_other_process(path, 'task_templates', 'tpl-1')
+    assert get_task_template_by_id('tpl-1')['name'] == 'Run'  # within the poll interval
+
+    assert cache_bus.poll(force=True) == 1
+    assert get_task_template_by_id('tpl-1')['name'] == 'Long run'
+    assert template_cache.stats()['loads'] == loads + 1
+
+
+def test_null_bus_is_the_default_for_a_single_worker(monkeypatch):
+    monkeypatch.delenv('CACHE_BUS', raising=False)
+    monkeypatch.setenv('WEB_CONCURRENCY', '1')
+    assert cache_bus.get_bus().name == 'none'
+    cache_bus.publish('task_templates', 'x')
+    assert cache_bus.poll(force=True) == 0
+
+
+def test_several_workers_get_the_sqlite_bus_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv('CACHE_BUS', raising=False)
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    monkeypatch.setenv('CACHE_BUS_PATH', str(tmp_path / 'bus.sqlite3'))
+    for args, workers in (('--workers 4 --timeout 30', 4), ('-w3', 3), ('--workers=2', 2), ('--timeout 30', None)):
+        monkeypatch.setenv('GUNICORN_CMD_ARGS', args)
+        assert cache_bus.configured_workers() == workers
+    monkeypatch.setenv('GUNICORN_CMD_ARGS', '-w 4')
+    assert cache_bus.get_bus().name == 'sqlite'
+
+
+def test_unknown_worker_count_under_gunicorn_is_logged(monkeypatch, caplog):
+    monkeypatch.delenv('CACHE_BUS', raising=False)
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    monkeypatch.delenv('GUNICORN_CMD_ARGS', raising=False)
+    monkeypatch.setitem(sys.modules, 'gunicorn', types.ModuleType('gunicorn'))
+    with caplog.at_level(logging.WARNING, logger='lib.cache_bus'):
+        assert cache_bus.get_bus().name == 'none'
+    assert 'CACHE_BUS=sqlite' in caplog.text
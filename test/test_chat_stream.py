@@ -0,0 +1,107 @@
+"""
+Tests for streamed chat responses (Server-Sent Events) against a local fake OpenAI server
+Run with: python -m pytest test/test_chat_stream.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app import create_app
+from bench_agent import ANSWER, fake_server, make_agent
+from lib.db import get_supabase, set_backend
+from lib.memory_db import InMemoryBackend
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server, url = fake_server(0.01)
+    yield url
+    server.shutdown()
+
+
+@pytest.fixture
+def client(base_url, monkeypatch):
+    import services.agent_service as agent_service
+
+    monkeypatch.setenv('OPENAI_BASE_URL', base_url)
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setattr(agent_service, '_agent_service', None)
+    set_backend(InMemoryBackend())
+    get_supabase().seed('chat_ia_sessions', [
+        {'id': 's1', 'user_id': 'u1', 'title': 'Coach'},
+        {'id': 's2', 'user_id': 'u2', 'title': 'Other'},
+    ])
+    app = create_app({'SWAGGER_ENABLED': False, 'TESTING': True})
+    with app.app_context():
+        from services.auth_service import generate_jwt_token
+        token = generate_jwt_token('u1', 'u1@example.com', 'User')
+    yield app.test_client(), {'Authorization': f'Bearer {token}'}
+    set_backend(None)
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def stored_messages(session_id):
+    return get_supabase().from_('chat_ia_messages').select('*').eq('session_id', session_id).execute().data
+
+
+def test_stream_relays_tokens_tool_calls_and_stores_the_reply_once(client):
+    client, headers = client
+    response = client.post('/api/chat/sessions/s1/messages/stream', headers=headers,
+                           json={'content': 'How am I doing?'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    events = parse_events(response.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[0] == 'user_message' and names[-1] == 'assistant_message'
+    assert names[1:3] == ['tool_call_start', 'tool_call_finish']
+    assert events[1][1] == {'id': 'call_1', 'name': 'get_user_stats', 'arguments': '{"user_id": "bench"}'}
+    assert ''.join(data['content'] for name, data in events if name == 'token') == ANSWER
+    assert events[-1][1]['content'] == ANSWER
+
+    assert [(m['role'], m['content']) for m in stored_messages('s1')] == [
+        ('user', 'How am I doing?'), ('assistant', ANSWER)]
+
+
+def test_stream_checks_the_session_and_message(client):
+    client, headers = client
+    url = '/api/chat/sessions/{}/messages/stream'
+    assert client.post(url.format('missing'), headers=headers, json={'content': 'Hi'}).status_code == 404
+    assert client.post(url.format('s2'), headers=headers, json={'content': 'Hi'}).status_code == 403
+    assert client.post(url.format('s1'), headers=headers, json={'role': 'user'}).status_code == 400
+    assert client.post(url.format('s1'), headers=headers, json={'role': 'assistant', 'content': 'Hi'}).status_code == 400
+    assert stored_messages('s1') == []
+
+
+def test_ask_stream_reports_failures_in_the_done_event(monkeypatch):
+    from openai import OpenAIError
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    agent = make_agent(True, 0)
+
+    async def unavailable(*args, **kwargs):
+        raise OpenAIError('service unavailable')
+
+    monkeypatch.setattr(agent, 'create_completion', unavailable)
+
+    async def collect():
+        return [event async for event in agent.ask_stream('Hi', conversation_id='down')]
+
+    events = asyncio.run(collect())
+    assert [event['type'] for event in events] == ['done']
+    assert events[0]['result'] == {'success': False, 'error': 'OpenAI API error: service unavailable'}
@@ -0,0 +1,67 @@
+"""
+Tests for response compression
+Run with: python -m pytest test/test_compression.py
+"""
+
+import gzip
+import os
+import sys
+import zlib
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, jsonify
+
+from lib import compression
+
+app = Flask(__name__)
+compression.init_app(app)
+
+ROWS = [{'id': i, 'status': 'pending', 'task_templates': {'name': 'Meditation', 'reward_xp': 20}} for i in range(100)]
+
+
+@app.route('/large')
+def large():
+    response = jsonify(ROWS)
+    response.add_etag()
+    return response
+
+
+@app.route('/small')
+def small():
+    return jsonify({'ok': True})
+
+
+@app.route('/stream')
+def stream():
+    return Response((f'data: {i}\n\n' for i in range(3)), mimetype='text/event-stream')
+
+
+def test_large_json_is_gzipped_when_accepted():
+    client = app.test_client()
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.headers['ETag'].startswith('W/')
+    body = gzip.decompress(response.data)
+    assert body == app.test_client().get('/large').data
+    assert int(response.headers['Content-Length']) == len(response.data) < len(body)
+
+
+def test_small_or_unaccepted_responses_are_left_alone():
+    client = app.test_client()
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/large').headers
+    assert 'Content-Encoding' not in client.get('/large', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+
+def test_streams_are_flushed_per_chunk():
+    chunks = list(compression.compress_stream([b'data: 0\n\n', 'data: 1\n\n'], 'gzip'))
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(chunks[0]) == b'data: 0\n\n'
+    assert decompressor.decompress(b''.join(chunks[1:])) == b'data: 1\n\n'
+
+    response = app.test_client().get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == b'data: 0\n\ndata: 1\n\ndata: 2\n\n'
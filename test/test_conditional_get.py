@@ -0,0 +1,89 @@
+"""
+Tests for conditional GET support (ETag / If-None-Match / Last-Modified)
+Run with: python -m pytest test/test_conditional_get.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+from lib.db import get_supabase, set_backend
+from lib.memory_db import InMemoryBackend
+from middleware.conditional_get import conditional_get
+from services.task_template_service import template_cache, update_task_template
+
+calls = []
+state = {'version': 1, 'updated_at': '2025-01-01T10:00:00Z'}
+
+app = Flask(__name__)
+
+
+@app.route('/hashed')
+@conditional_get()
+def hashed():
+    calls.append('hashed')
+    return jsonify({'value': state['version']}), 200
+
+
+@app.route('/versioned')
+@conditional_get(version=lambda: state['version'], last_modified=lambda: state['updated_at'])
+def versioned():
+    calls.append('versioned')
+    return jsonify({'value': state['version']}), 200
+
+
+@app.route('/missing')
+@conditional_get(version=lambda: state['version'])
+def missing():
+    return jsonify({'error': 'not found'}), 404
+
+
+def setup_function():
+    calls.clear()
+    state['version'] = 1
+    set_backend(InMemoryBackend())
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_body_hash_etag_answers_304():
+    client = app.test_client()
+    first = client.get('/hashed')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and not etag.startswith('W/')
+
+    again = client.get('/hashed', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b''
+
+    state['version'] = 2
+    assert client.get('/hashed', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_version_etag_skips_the_handler():
+    client = app.test_client()
+    first = client.get('/versioned')
+    etag = first.headers['ETag']
+    assert etag.startswith('W/') and first.headers['Last-Modified'] == 'Wed, 01 Jan 2025 10:00:00 GMT'
+
+    assert client.get('/versioned', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/versioned', headers={'If-Modified-Since': first.headers['Last-Modified']}).status_code == 304
+    assert calls == ['versioned']
+
+    state['version'] = 2
+    assert client.get('/versioned', headers={'If-None-Match': etag}).status_code == 200
+    assert client.get('/missing').headers.get('ETag') is None
+
+
+def test_template_cache_version_tracks_writes():
+    get_supabase().seed('task_templates', [{'id': 't1', 'key': 'k', 'name': 'A'}])
+    version = template_cache.version
+    assert template_cache.version == version
+
+    update_task_template('t1', {'name': 'B'})
+    assert template_cache.version != version
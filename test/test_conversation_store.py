@@ -0,0 +1,155 @@
+"""
+Tests for the bounded conversation store of the AI agent
+Run with: python -m pytest test/test_conversation_store.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_agent import fake_server, make_agent
+from lib.agent import AgentConversation, AIAgent, ConversationStore
+from lib.cache import get_cache_stats
+from lib.db import get_supabase, set_backend
+from lib.memory_db import InMemoryBackend
+from services.chat_ia_service import get_conversation_history
+
+SESSION = '6f1c1a52-4a53-4f7e-9d53-0c1b2a3d4e5f'
+
+
+def setup_function():
+    set_backend(InMemoryBackend())
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_least_recently_used_conversation_is_evicted():
+    store = ConversationStore('lru', max_conversations=2)
+    first = store.get_or_create('a', 'prompt')
+    store.get_or_create('b', 'prompt')
+    assert store.get_or_create('a', 'prompt') is first  # 'a' is now the most recent
+    store.get_or_create('c', 'prompt')
+
+    assert 'a' in store and 'c' in store and 'b' not in store
+    stats = store.stats()
+    assert stats['evictions']['lru'] == 1
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 3, 2)
+
+
+def test_idle_conversations_expire():
+    store = ConversationStore('ttl', ttl=0.05)
+    first = store.get_or_create('a', 'prompt')
+    time.sleep(0.06)
+    assert 'a' not in store
+    assert store.get_or_create('a', 'prompt') is not first
+    assert store.stats()['evictions']['ttl'] == 1
+
+
+def test_memory_budget_evicts_the_oldest_conversations():
+    store = ConversationStore('bytes', max_bytes=5000)
+    for conversation_id in ('a', 'b', 'c'):
+        store.get_or_create(conversation_id, 'prompt').add_message('user', 'x' * 2000)
+    store.get_or_create('d', 'prompt')
+
+    assert 'a' not in store and 'd' in store
+    assert store.approx_bytes <= 5000
+    assert store.stats()['evictions']['bytes'] >= 1
+
+
+def test_conversation_size_follows_its_messages():
+    conversation = AgentConversation('system prompt', max_history=3)
+    empty = conversation.approx_bytes
+    conversation.add_message('user', 'x' * 1000)
+    conversation.add_tool_message('call_1', 'y' * 500)
+    assert conversation.approx_bytes >= empty + 1500
+    conversation.add_message('assistant', 'z')  # trims the 1000-character message
+    assert conversation.approx_bytes < empty + 1000
+    conversation.clear()
+    assert conversation.approx_bytes == empty
+
+
+def test_evicted_session_is_rehydrated_from_stored_messages():
+    get_supabase().seed('chat_ia_messages', [
+        {'session_id': SESSION, 'role': 'user', 'content': 'I feel stressed', 'created_at': '2025-01-01T10:00:00Z'},
+        {'session_id': SESSION, 'role': 'assistant', 'content': 'Try breathing', 'created_at': '2025-01-01T10:00:01Z'},
+        {'session_id': SESSION, 'role': 'user', 'content': 'Being answered', 'created_at': '2025-01-01T10:00:02Z'},
+    ])
+    store = ConversationStore('chat', history_loader=get_conversation_history)
+
+    conversation = store.get_or_create(SESSION, 'prompt')
+    assert [(m['role'], m['content']) for m in conversation.get_messages()] == [
+        ('system', 'prompt'), ('user', 'I feel stressed'), ('assistant', 'Try breathing')]
+    assert store.get_or_create('recommendation_u1', 'prompt').get_messages() == [{'role': 'system', 'content': 'prompt'}]
+    assert store.stats()['rehydrations'] == 1
+
+
+def test_agent_exposes_store_metrics(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('AGENT_MAX_CONVERSATIONS', '1')
+    agent = AIAgent(name='StoreAgent')
+    agent.get_or_create_conversation('a')
+    agent.get_or_create_conversation('b')
+
+    stats = agent.get_stats()
+    assert stats['active_conversations'] == 1
+    assert stats['conversation_store']['evictions']['lru'] == 1
+    assert get_cache_stats()['conversations:StoreAgent']['max_conversations'] == 1
+
+
+def test_slow_history_load_does_not_block_other_turns(monkeypatch):
+    server, base_url = fake_server(0)
+    monkeypatch.setenv('OPENAI_BASE_URL', base_url)
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    agent = make_agent(True, 0)
+
+    def slow_loader(conversation_id):
+        if conversation_id == 'slow':
+            time.sleep(0.5)  # a blocking database read
+        return []
+
+    agent.conversations.history_loader = slow_loader
+
+    async def turn(conversation_id, start):
+        result = await agent.ask('How am I doing?', conversation_id=conversation_id)
+        return result['success'], time.perf_counter() - start
+
+    async def both():
+        start = time.perf_counter()
+        slow = asyncio.ensure_future(turn('slow', start))
+        await asyncio.sleep(0.05)  # the slow turn is loading its history
+        fast = await turn('fast', start)
+        return await slow, fast
+
+    try:
+        (slow_ok, slow_elapsed), (fast_ok, fast_elapsed) = asyncio.run(both())
+    finally:
+        server.shutdown()
+    assert slow_ok and fast_ok
+    assert slow_elapsed >= 0.5 and fast_elapsed < 0.4
+
+
+def test_memory_budget_holds_as_conversations_grow(monkeypatch):
+    server, base_url = fake_server(0)
+    monkeypatch.setenv('OPENAI_BASE_URL', base_url)
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('AGENT_CONVERSATION_MAX_BYTES', '3000')
+    agent = make_agent(True, 0)
+    try:
+        assert asyncio.run(agent.ask('x' * 1000, conversation_id='a'))['success']
+        assert asyncio.run(agent.ask('y' * 1000, conversation_id='b'))['success']
+        # A single conversation over the budget is not kept either
+        assert asyncio.run(agent.ask('z' * 4000, conversation_id='b'))['success']
+    finally:
+        server.shutdown()
+
+    store = agent.conversations
+    assert store.approx_bytes <= 3000
+    assert 'a' not in store and 'b' not in store
+    assert store.stats()['evictions']['bytes'] == 2
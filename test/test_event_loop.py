@@ -0,0 +1,84 @@
+"""
+Tests for the background event loop bridge
+Run with: python -m pytest test/test_event_loop.py
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from lib import event_loop
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+async def current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_coroutines_share_one_long_lived_loop():
+    first = event_loop.run(current_loop())
+    assert event_loop.run(current_loop()) is first
+    assert first.is_running() and first is event_loop.get_loop()
+
+
+def test_result_exception_and_context_reach_the_caller():
+    async def read_context():
+        await asyncio.sleep(0)
+        return request_id.get()
+
+    async def fail():
+        raise ValueError('boom')
+
+    request_id.set('req-1')
+    assert event_loop.run(read_context()) == 'req-1'
+    with pytest.raises(ValueError, match='boom'):
+        event_loop.run(fail())
+
+
+def test_timeout_cancels_the_coroutine():
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        event_loop.run(slow(), timeout=0.05)
+    assert cancelled.wait(1)
+
+
+def test_runs_from_concurrent_threads_overlap():
+    threads = [threading.Thread(target=event_loop.run, args=(asyncio.sleep(0.2),)) for _ in range(5)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start < 0.6
+
+
+def test_run_from_the_loop_thread_is_refused():
+    async def nested():
+        event_loop.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError, match='await the coroutine'):
+        event_loop.run(nested())
+
+
+def test_shutdown_starts_a_fresh_loop_on_next_use():
+    first = event_loop.run(current_loop())
+    event_loop.shutdown()
+    assert first.is_closed()
+    assert event_loop.run(current_loop()) is not first
@@ -0,0 +1,48 @@
+"""
+Tests for concurrent fan-out of independent reads
+Run with: python -m pytest test/test_fanout.py
+"""
+
+import contextvars
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.fanout import fan_out
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+def test_results_keep_call_order():
+    def slow(value, delay):
+        time.sleep(delay)
+        return value
+
+    assert fan_out((slow, 'a', 0.05), (slow, 'b', 0.0), lambda: 'c') == ['a', 'b', 'c']
+
+
+def test_calls_run_concurrently():
+    start = time.perf_counter()
+    fan_out(*[(time.sleep, 0.1)] * 4)
+    assert time.perf_counter() - start < 0.3
+
+
+def test_first_error_is_raised():
+    def boom():
+        raise ValueError("boom")
+
+    try:
+        fan_out(lambda: 1, boom)
+    except ValueError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_context_is_propagated_and_nesting_runs_inline():
+    request_id.set('req-1')
+    inner = lambda: fan_out(request_id.get, request_id.get)  # noqa: E731
+    assert fan_out(request_id.get, inner) == ['req-1', ['req-1', 'req-1']]
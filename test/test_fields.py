@@ -0,0 +1,31 @@
+"""
+Tests for column projection (sparse fieldsets)
+Run with: python -m pytest test/test_fields.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.fields import build_select
+
+
+def test_default_when_no_fields():
+    assert build_select(None, '*, task_templates(*)') == '*, task_templates(*)'
+    assert build_select('', 'id') == 'id'
+
+
+def test_plain_and_embedded_fields():
+    select = build_select('id, status,task_templates.name,task_templates.reward_xp', embeds=('task_templates',))
+    assert select == 'id,status,task_templates(name,reward_xp)'
+
+
+def test_rejects_unknown_embeds_and_bad_names():
+    for fields in ('id,users_iam.hashed_password', 'id;drop', 'task_templates(*)'):
+        try:
+            build_select(fields, embeds=('task_templates',))
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {fields!r}")
@@ -0,0 +1,111 @@
+"""
+Tests for the pooled keep-alive transport to PostgREST, against a local HTTP server
+Run with: python -m pytest test/test_http_pool.py
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import pytest
+from flask import Flask
+
+from lib import db, query_stats
+from lib.db import SupabaseBackend, get_pool_stats, set_backend
+from lib.http_pool import PooledTransport
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))  # postgrest sends a body with GET
+        body = b'[]'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_requests_reuse_one_keepalive_connection(base_url):
+    transport = PooledTransport()
+    with httpx.Client(transport=transport) as client:
+        for _ in range(5):
+            assert client.get(f'{base_url}/rest/v1/tasks_mind').json() == []
+
+    stats = transport.pool_stats()
+    assert (stats['requests'], stats['connections_opened'], stats['waits']) == (5, 1, 0)
+    assert stats['reuse_ratio'] == 0.8
+
+
+def test_pool_stats_report_busy_and_idle_connections(base_url):
+    transport = PooledTransport(limits=httpx.Limits(max_connections=1, max_keepalive_connections=1))
+    with httpx.Client(transport=transport) as client:
+        with client.stream('GET', f'{base_url}/rest/v1/tasks_mind') as response:
+            busy = transport.pool_stats()
+            response.read()
+        idle = transport.pool_stats()
+
+    assert (busy['connections_open'], busy['connections_idle']) == (1, 0)
+    assert (idle['connections_open'], idle['connections_idle']) == (1, 1)
+    assert idle['max_connections'] == 1
+
+
+def test_backend_builds_a_new_pool_after_fork(base_url):
+    backend = SupabaseBackend(base_url, 'service-key')
+    set_backend(backend)
+    for _ in range(3):
+        assert backend.from_('tasks_mind').select('*').execute().data == []
+    parent_transport = backend._transport
+    assert get_pool_stats()['connections_opened'] == 1
+
+    db._after_fork_in_child()
+    assert get_pool_stats() == {'backend': 'supabase', 'pid': os.getpid(), 'initialized': False}
+    backend.from_('tasks_mind').select('*').execute()
+    stats = get_pool_stats()
+    assert backend._transport is not parent_transport
+    assert (stats['requests'], stats['connections_opened']) == (1, 1)
+    # The parent's pool is left alone, not closed from the child
+    assert parent_transport.pool_stats()['connections_open'] == 1
+
+
+def test_pool_stats_endpoint(base_url, monkeypatch):
+    monkeypatch.setenv('QUERY_STATS_HEADER', 'true')
+    backend = SupabaseBackend(base_url, 'service-key')
+    set_backend(backend)
+    app = Flask(__name__)
+    query_stats.init_app(app)
+
+    @app.route('/tasks')
+    def tasks():
+        db.get_supabase().from_('tasks_mind').select('*').execute()
+        return '[]', 200
+
+    client = app.test_client()
+    client.get('/tasks')
+    client.get('/tasks')
+    stats = client.get('/api/debug/pool-stats').get_json()
+    assert stats['initialized'] and stats['backend'] == 'supabase'
+    assert (stats['requests'], stats['connections_opened']) == (2, 1)
@@ -0,0 +1,93 @@
+"""
+Tests for the request-scoped identity map
+Run with: python -m pytest test/test_identity_map.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from services.chat_ia_service import (
+    create_chat_session,
+    get_chat_session_by_id,
+    update_chat_session
+)
+from services.mind_task_service import (
+    complete_mind_task,
+    delete_mind_task,
+    get_mind_task_by_id
+)
+
+app = Flask(__name__)
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def from_(self, table):
+        self.calls += 1
+        return super().from_(table)
+
+
+def setup_function():
+    global backend  # noqa: PLW0603
+    backend = CountingBackend()
+    backend.seed('task_templates', [{'id': 'tpl-1', 'name': 'Meditation', 'reward_xp': 20}])
+    backend.seed('tasks_mind', [{'id': 'task-1', 'user_id': 'u1', 'template_id': 'tpl-1', 'status': 'pending'}])
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_repeated_reads_hit_the_database_once():
+    with app.app_context():
+        first = get_mind_task_by_id('task-1')
+        second = get_mind_task_by_id('task-1')
+        assert backend.calls == 1
+        assert first == second and second['task_templates']['reward_xp'] == 20
+        second['status'] = 'mutated'
+        assert get_mind_task_by_id('task-1')['status'] == 'pending'
+
+
+def test_writes_keep_the_map_current():
+    with app.app_context():
+        get_mind_task_by_id('task-1')
+        complete_mind_task('task-1', 20)
+        task = get_mind_task_by_id('task-1')
+        assert task['status'] == 'completed'
+        assert task['task_templates']['name'] == 'Meditation'
+        assert backend.calls == 2
+
+        delete_mind_task('task-1')
+        assert get_mind_task_by_id('task-1') is None
+
+
+def test_sessions_and_no_context():
+    with app.app_context():
+        session = create_chat_session({'user_id': 'u1', 'title': 'Hi'})
+        update_chat_session(session['id'], {'title': 'Renamed'})
+        assert get_chat_session_by_id(session['id'])['title'] == 'Renamed'
+        assert backend.calls == 2
+
+    # Outside an app context nothing is cached.
+    get_mind_task_by_id('task-1')
+    get_mind_task_by_id('task-1')
+    assert backend.calls == 4
+
+
+def test_map_is_per_context():
+    with app.app_context():
+        get_mind_task_by_id('task-1')
+    with app.app_context():
+        get_mind_task_by_id('task-1')
+    assert backend.calls == 2
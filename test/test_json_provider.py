@@ -0,0 +1,70 @@
+"""
+Tests for the orjson-backed Flask JSON provider
+Run with: python -m pytest test/test_json_provider.py
+"""
+
+import json
+import os
+import sys
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+pytest.importorskip('orjson')
+
+from lib.json_provider import OrjsonProvider, get_provider_class  # noqa: E402
+
+PAYLOAD = {
+    'z': 1,
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'at': datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    'day': date(2025, 1, 2),
+    'xp': Decimal('12.50'),
+    'name': 'Meditación',
+    'rows': [{'b': None, 'a': [1.5, True]}],
+}
+
+
+def providers():
+    app = Flask(__name__)
+    return DefaultJSONProvider(app), OrjsonProvider(app), app
+
+
+def test_same_documents_as_the_default_provider():
+    stdlib, fast, app = providers()
+    assert json.loads(fast.dumps(PAYLOAD)) == json.loads(stdlib.dumps(PAYLOAD))
+    assert list(json.loads(fast.dumps(PAYLOAD))) == sorted(PAYLOAD)
+
+    with app.app_context():
+        response = fast.response(PAYLOAD)
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.data) == json.loads(stdlib.dumps(PAYLOAD))
+
+
+def test_falls_back_to_stdlib_for_what_orjson_rejects():
+    stdlib, fast, _ = providers()
+    huge = {'n': 2 ** 70}
+    assert fast.dumps(huge) == stdlib.dumps(huge)
+    assert fast.loads('{"n": NaN}')['n'] != fast.loads('{"n": NaN}')['n']
+    assert fast.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+    try:
+        fast.loads('{"a": ')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_provider_selected_by_config(monkeypatch):
+    monkeypatch.setenv('JSON_PROVIDER', 'stdlib')
+    assert get_provider_class() is DefaultJSONProvider
+    monkeypatch.setenv('JSON_PROVIDER', 'orjson')
+    assert get_provider_class() is OrjsonProvider
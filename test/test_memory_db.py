@@ -0,0 +1,77 @@
+"""
+Tests for the in-process data-access backend (DB_BACKEND=memory)
+Run with: python -m pytest test/test_memory_db.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.db import set_backend, get_supabase
+from lib.memory_db import InMemoryBackend
+from services.mind_task_service import (
+    get_user_mind_tasks,
+    get_mind_task_by_id,
+    create_mind_task,
+    complete_mind_task,
+    delete_mind_task
+)
+from services.stats_service import get_user_snapshots
+
+
+def setup_function():
+    backend = InMemoryBackend()
+    backend.seed('task_templates', [
+        {'id': 'tpl-1', 'key': 'meditation_10', 'name': 'Meditation', 'category': 'mind', 'reward_xp': 20},
+    ])
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_backend_is_installed():
+    assert get_supabase().name == 'memory'
+
+
+def test_filters_order_and_embed():
+    create_mind_task({'user_id': 'u1', 'template_id': 'tpl-1', 'status': 'pending', 'created_at': '2025-01-01T00:00:00'})
+    create_mind_task({'user_id': 'u1', 'template_id': 'tpl-1', 'status': 'completed', 'created_at': '2025-01-02T00:00:00'})
+    create_mind_task({'user_id': 'u2', 'template_id': 'tpl-1', 'status': 'pending', 'created_at': '2025-01-03T00:00:00'})
+
+    tasks = get_user_mind_tasks('u1')
+    assert [t['status'] for t in tasks] == ['completed', 'pending']
+    assert tasks[0]['task_templates']['reward_xp'] == 20
+
+    pending = get_user_mind_tasks('u1', 'pending')
+    assert len(pending) == 1
+
+
+def test_update_and_delete_return_rows():
+    task = create_mind_task({'user_id': 'u1', 'template_id': 'tpl-1', 'status': 'pending'})
+    assert task['id']
+
+    completed = complete_mind_task(task['id'], 20)
+    assert completed['status'] == 'completed'
+    assert get_mind_task_by_id(task['id'])['xp_awarded'] == 20
+
+    assert delete_mind_task(task['id'])['id'] == task['id']
+    assert get_mind_task_by_id(task['id']) is None
+
+
+def test_returned_rows_are_copies():
+    task = create_mind_task({'user_id': 'u1', 'template_id': 'tpl-1', 'params': {'duration': 10}})
+    task['params']['duration'] = 99
+    assert get_mind_task_by_id(task['id'])['params']['duration'] == 10
+
+
+def test_range_filters_and_limit():
+    backend = get_supabase()
+    backend.seed('performance_snapshots', [
+        {'user_id': 'u1', 'snapshot_at': f'2025-01-0{day}T00:00:00'} for day in range(1, 8)
+    ])
+    snapshots = get_user_snapshots('u1', start_date='2025-01-02', end_date='2025-01-06', limit=2)
+    assert [s['snapshot_at'][:10] for s in snapshots] == ['2025-01-05', '2025-01-04']
@@ -0,0 +1,90 @@
+"""
+Tests for the in-process metric catalog registry
+Run with: python -m pytest test/test_metric_registry.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from services.stats_service import (
+    create_metric,
+    create_snapshot,
+    delete_metric,
+    get_metric_by_key,
+    get_metric_catalog,
+    get_stats_summary,
+    update_metric
+)
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.tables = []
+
+    def from_(self, table):
+        self.tables.append(table)
+        return super().from_(table)
+
+
+def setup_function():
+    global backend  # noqa: PLW0603
+    backend = CountingBackend()
+    backend.seed('metric_catalog', [
+        {'metric_key': 'energy', 'domain': 'body', 'agg_method': 'avg', 'min_value': 0, 'max_value': 100},
+        {'metric_key': 'attention', 'domain': 'mind', 'agg_method': 'max', 'min_value': 0, 'max_value': 100},
+        {'metric_key': 'steps_daily', 'domain': 'body', 'agg_method': 'sum', 'min_value': 0},
+    ])
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_lookups_by_key_and_domain_share_one_load():
+    assert [m['metric_key'] for m in get_metric_catalog()] == ['attention', 'energy', 'steps_daily']
+    assert [m['metric_key'] for m in get_metric_catalog('body', fields='metric_key')] == ['energy', 'steps_daily']
+    assert get_metric_by_key('attention')['agg_method'] == 'max'
+    assert get_metric_by_key('missing') is None
+    assert backend.tables.count('metric_catalog') == 1
+
+
+def test_metric_writes_keep_the_registry_current():
+    get_metric_catalog()
+    create_metric({'metric_key': 'focus', 'domain': 'mind'})
+    update_metric('energy', {'domain': 'system'})
+    update_metric('steps_daily', {'metric_key': 'steps'})
+    delete_metric('attention')
+    reads = backend.tables.count('metric_catalog')
+
+    assert [m['metric_key'] for m in get_metric_catalog()] == ['energy', 'focus', 'steps']
+    assert get_metric_by_key('energy')['domain'] == 'system'
+    assert get_metric_by_key('steps_daily') is None
+    assert backend.tables.count('metric_catalog') == reads
+
+
+def test_summary_and_validation_use_catalog_metadata():
+    for energy, attention, steps in ((80, 60, '4000'), (60, 90, '6000')):
+        create_snapshot({'user_id': 'u1', 'energy': energy, 'attention': attention, 'steps_daily': steps})
+    backend.tables.clear()
+
+    summary = get_stats_summary('u1')
+    averages = summary['averages']
+    assert averages['energy']['value'] == 70
+    assert averages['attention']['agg_method'] == 'max' and averages['attention']['value'] == 90
+    assert averages['steps_daily']['value'] == 10000
+    assert backend.tables.count('metric_catalog') == 0
+
+    for bad in ({'energy': 101}, {'attention': 'high'}, {'steps_daily': -1}):
+        try:
+            create_snapshot(dict(bad, user_id='u1'))
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {bad}")
+    assert len(backend.rows('performance_snapshots')) == 2
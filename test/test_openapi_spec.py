@@ -0,0 +1,72 @@
+"""
+Tests for the precomputed OpenAPI spec
+Run with: python -m pytest test/test_openapi_spec.py
+"""
+
+import gzip
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app import create_app
+from lib import openapi_spec
+
+
+@pytest.fixture(scope='module')
+def spec_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp('spec') / 'openapi.json'
+    assert openapi_spec.main(['build', '--output', str(path)]) == 0
+    return path
+
+
+def test_build_renders_every_route_and_check_detects_changes(spec_file):
+    spec = json.loads(spec_file.read_bytes())
+    assert spec['info']['title'] == 'IAM Backend API'
+    assert '/api/bot-rules/evaluate' in spec['paths']
+    assert openapi_spec.main(['check', '--output', str(spec_file)]) == 0
+
+    stale = spec_file.with_name('stale.json')
+    stale.write_bytes(spec_file.read_bytes().replace(b'IAM Backend API', b'Old API'))
+    assert openapi_spec.main(['check', '--output', str(stale)]) == 1
+
+
+def test_spec_is_served_from_the_file_with_validators(spec_file, monkeypatch):
+    from flasgger import Swagger
+
+    def fail(*args, **kwargs):
+        raise AssertionError('docstrings parsed at runtime')
+
+    monkeypatch.setattr(Swagger, 'get_apispecs', fail)
+    client = create_app({'SWAGGER_ENABLED': True, 'SWAGGER_SPEC_FILE': str(spec_file), 'TESTING': True}).test_client()
+
+    response = client.get('/apispec_1.json', headers={'Accept-Encoding': 'identity'})
+    assert response.status_code == 200
+    assert response.data == spec_file.read_bytes()
+    assert response.headers['Cache-Control'] == openapi_spec.CACHE_CONTROL
+    etag = response.headers['ETag']
+
+    assert client.get('/apispec_1.json', headers={'If-None-Match': etag}).status_code == 304
+
+    compressed = client.get('/apispec_1.json', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] == 'W/' + etag
+    assert gzip.decompress(compressed.data) == spec_file.read_bytes()
+    assert client.get('/apidocs/').status_code == 200
+
+
+def test_spec_file_without_swagger_ui(spec_file):
+    app = create_app({'SWAGGER_ENABLED': False, 'SWAGGER_SPEC_FILE': str(spec_file), 'TESTING': True})
+    assert 'flasgger' not in app.blueprints
+    client = app.test_client()
+    assert client.get('/apispec_1.json').status_code == 200
+    assert client.get('/apidocs/').status_code == 404
+
+
+def test_missing_spec_file_is_ignored(tmp_path):
+    app = create_app({'SWAGGER_ENABLED': False, 'SWAGGER_SPEC_FILE': str(tmp_path / 'missing.json'), 'TESTING': True})
+    assert app.test_client().get('/apispec_1.json').status_code == 404
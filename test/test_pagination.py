@@ -0,0 +1,128 @@
+"""
+Tests for keyset (cursor) pagination
+Run with: python -m pytest test/test_pagination.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from lib.pagination import (
+    NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, next_cursor, page_response, parse_page_args,
+)
+from services.chat_ia_service import get_recent_session_messages, get_session_messages
+from services.mind_task_service import get_user_mind_tasks
+
+
+def setup_function():
+    backend = InMemoryBackend()
+    # Several rows share a created_at so the id tie-breaker is exercised.
+    backend.seed('tasks_mind', [
+        {'id': f'task-{i:02d}', 'user_id': 'u1', 'status': 'pending',
+         'created_at': f'2025-01-0{1 + i // 4}T00:00:00'}
+        for i in range(10)
+    ])
+    backend.seed('chat_ia_messages', [
+        {'id': f'msg-{i:02d}', 'session_id': 's1', 'content': str(i),
+         'created_at': f'2025-01-01T00:00:0{i // 2}'}
+        for i in range(7)
+    ])
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def _walk(fetch, column, limit):
+    # Fetch one extra row, as the controllers do
+    pages, cursor = [], None
+    while True:
+        rows = fetch(limit=limit + 1, cursor=cursor)
+        pages.append(rows[:limit])
+        cursor = next_cursor(rows, column, limit)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor('2025-01-01T00:00:00', 'abc')
+    assert decode_cursor(cursor) == ('2025-01-01T00:00:00', 'abc')
+    try:
+        decode_cursor('not-a-cursor')
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+
+def test_pages_cover_every_row_once_with_ties():
+    pages = _walk(lambda **kw: get_user_mind_tasks('u1', **kw), 'created_at', 3)
+    ids = [row['id'] for page in pages for row in page]
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert ids == [row['id'] for row in get_user_mind_tasks('u1')]
+    assert len(set(ids)) == 10
+
+
+def test_no_cursor_after_an_exactly_full_last_page():
+    pages = _walk(lambda **kw: get_user_mind_tasks('u1', **kw), 'created_at', 5)
+    assert [len(page) for page in pages] == [5, 5]
+
+
+def test_rows_without_a_sort_value_are_paged_last():
+    backend = InMemoryBackend()
+    backend.seed('tasks_mind', [
+        {'id': f'task-{i}', 'user_id': 'u1', 'status': 'pending',
+         'created_at': None if i % 2 else f'2025-01-0{1 + i}T00:00:00'}
+        for i in range(7)
+    ])
+    backend.seed('chat_ia_messages', [
+        {'id': f'msg-{i}', 'session_id': 's1', 'content': str(i),
+         'created_at': None if i % 2 else f'2025-01-01T00:00:0{i}'}
+        for i in range(7)
+    ])
+    set_backend(backend)
+
+    newest_first = _walk(lambda **kw: get_user_mind_tasks('u1', **kw), 'created_at', 2)
+    oldest_first = _walk(lambda **kw: get_session_messages('s1', **kw), 'created_at', 2)
+    assert [row['id'] for page in newest_first for row in page] == [
+        'task-6', 'task-4', 'task-2', 'task-0', 'task-5', 'task-3', 'task-1']
+    assert [row['id'] for page in oldest_first for row in page] == [
+        'msg-0', 'msg-2', 'msg-4', 'msg-6', 'msg-1', 'msg-3', 'msg-5']
+
+
+def test_page_response_trims_the_probe_row():
+    rows = [{'id': f'r{i}', 'created_at': None} for i in range(3)]
+    with Flask(__name__).app_context():
+        response, _ = page_response(rows, 'created_at', 2)
+        last, _ = page_response(rows[:2], 'created_at', 2)
+    assert [row['id'] for row in response.get_json()] == ['r0', 'r1']
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == (None, 'r1')
+    assert NEXT_CURSOR_HEADER not in last.headers
+
+
+def test_ascending_pages_and_sparse_fields():
+    pages = _walk(lambda **kw: get_session_messages('s1', fields='content', **kw), 'created_at', 2)
+    contents = [row['content'] for page in pages for row in page]
+    assert contents == [str(i) for i in range(7)]
+    assert set(pages[0][0]) == {'content', 'id', 'created_at'}
+
+
+def test_recent_session_messages():
+    assert [m['content'] for m in get_recent_session_messages('s1', 3)] == ['4', '5', '6']
+
+
+def test_parse_page_args():
+    assert parse_page_args({}) == (50, None)
+    assert parse_page_args({'limit': '1000'}) == (200, None)
+    for args in ({'limit': 'x'}, {'limit': '0'}, {'cursor': '%%%'}):
+        try:
+            parse_page_args(args)
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {args}")
@@ -0,0 +1,135 @@
+"""
+Tests for the profile LRU cache
+Run with: python -m pytest test/test_profile_cache.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.cache import MISSING, LRUCache
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from services.profile_service import (
+    create_profile,
+    delete_profile,
+    get_profile_by_user_id,
+    get_profile_cache_stats,
+    update_profile
+)
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def from_(self, table):
+        self.calls += 1
+        return super().from_(table)
+
+
+def setup_function():
+    global backend  # noqa: PLW0603
+    backend = CountingBackend()
+    backend.seed('profiles', [{'id': 'p1', 'user_id': 'u1', 'username': 'ana', 'level': 3}])
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_repeated_reads_hit_the_cache():
+    before = get_profile_cache_stats()
+    assert get_profile_by_user_id('u1')['username'] == 'ana'
+    assert get_profile_by_user_id('u1', fields='level') == {'level': 3}
+    assert get_profile_by_user_id('nobody') is None
+    assert get_profile_by_user_id('nobody') is None
+    after = get_profile_cache_stats()
+
+    assert backend.calls == 2
+    assert after['hits'] - before['hits'] == 2
+    assert after['misses'] - before['misses'] == 2
+
+
+def test_writes_keep_the_cache_current():
+    get_profile_by_user_id('u1')
+    get_profile_by_user_id('u2')
+    update_profile('u1', {'level': 4})
+    create_profile({'id': 'p2', 'user_id': 'u2', 'username': 'bo'})
+    calls = backend.calls
+
+    assert get_profile_by_user_id('u1')['level'] == 4
+    assert get_profile_by_user_id('u2')['username'] == 'bo'
+    assert backend.calls == calls
+
+    delete_profile('u1')
+    assert get_profile_by_user_id('u1') is None
+    assert backend.calls == calls + 2
+
+
+def test_cached_rows_are_copies():
+    get_profile_by_user_id('u1')['username'] = 'changed'
+    assert get_profile_by_user_id('u1')['username'] == 'ana'
+
+
+def test_lru_eviction_and_ttl():
+    cache = LRUCache('test_lru', maxsize=2, ttl=60)
+    cache.store('a', 1)
+    cache.store('b', 2)
+    cache.get('a')
+    cache.store('c', 3)
+    assert cache.get('b') is MISSING
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+    disabled = LRUCache('test_lru_disabled', ttl=0)
+    disabled.store('a', 1)
+    assert disabled.get('a') is MISSING
+
+
+def test_read_that_lost_a_race_with_an_update_is_not_cached():
+    class UpdatedMidReadBackend(InMemoryBackend):
+        """Updates u1 right after the first read of it returns from the database."""
+
+        raced = False
+
+        def from_(self, table):
+            query = super().from_(table)
+            if not self.raced:
+                self.raced = True
+                execute = query.execute
+
+                def execute_then_update():
+                    res = execute()
+                    update_profile('u1', {'level': 5})
+                    return res
+
+                query.execute = execute_then_update
+            return query
+
+    racing = UpdatedMidReadBackend()
+    racing.seed('profiles', [{'id': 'p1', 'user_id': 'u1', 'username': 'ana', 'level': 3}])
+    set_backend(racing)
+
+    assert get_profile_by_user_id('u1')['level'] == 3  # read before the update
+    assert get_profile_by_user_id('u1')['level'] == 5
+    assert get_profile_cache_stats()['stale_stores'] >= 1
+
+
+def test_store_skips_values_older_than_a_write():
+    cache = LRUCache('test_generation', maxsize=2, ttl=60)
+    generation = cache.generation()
+    cache.put('a', {'v': 'new'})
+    cache.store('a', {'v': 'old'}, generation)
+    assert cache.get('a') == {'v': 'new'}
+
+    generation = cache.generation()
+    cache.invalidate()
+    cache.store('b', {'v': 'old'}, generation)
+    assert cache.get('b') is MISSING
+    cache.store('b', {'v': 'fresh'}, cache.generation())
+    assert cache.get('b') == {'v': 'fresh'}
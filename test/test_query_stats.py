@@ -0,0 +1,85 @@
+"""
+Tests for per-request database query accounting
+Run with: python -m pytest test/test_query_stats.py
+"""
+
+import logging
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from postgrest import SyncPostgrestClient
+
+from lib import query_stats
+from lib.db import set_backend
+from lib.fanout import fan_out
+from lib.memory_db import InMemoryBackend
+from lib.pagination import apply_keyset, encode_cursor
+from services.mind_task_service import get_mind_task_by_id, get_user_mind_tasks
+from services.profile_service import get_profile_by_user_id
+
+
+def make_app():
+    app = Flask(__name__)
+    os.environ['QUERY_STATS_HEADER'] = 'true'
+    try:
+        query_stats.init_app(app)
+    finally:
+        os.environ.pop('QUERY_STATS_HEADER')
+
+    @app.route('/tasks')
+    def tasks():
+        for task in get_user_mind_tasks('u1'):
+            get_mind_task_by_id(task['id'])
+        return jsonify([]), 200
+
+    @app.route('/fan-out')
+    def fanned():
+        fan_out((get_user_mind_tasks, 'u1'), (get_profile_by_user_id, 'u1'))
+        return jsonify([]), 200
+
+    return app
+
+
+def setup_function():
+    backend = InMemoryBackend()
+    backend.seed('tasks_mind', [{'id': f't{i}', 'user_id': 'u1'} for i in range(4)])
+    backend.seed('profiles', [{'user_id': 'u1'}])
+    set_backend(backend)
+    query_stats.reset_route_stats()
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_headers_route_totals_and_n_plus_one_warning(caplog):
+    client = make_app().test_client()
+    with caplog.at_level(logging.WARNING, logger='lib.query_stats'):
+        response = client.get('/tasks')
+
+    assert response.headers['X-DB-Queries'] == '5'
+    assert response.headers['X-DB-Tables'] == 'tasks_mind:5'
+    assert 'possible N+1' in caplog.text and 'eq(id)' in caplog.text
+
+    client.get('/tasks')
+    totals = query_stats.get_route_stats()['GET /tasks']
+    assert totals['requests'] == 2 and totals['max_queries'] == 5 and totals['repeated_shapes'] == 2
+    assert client.get('/api/debug/query-stats').get_json()['GET /tasks']['avg_queries'] == 5
+
+
+def test_fan_out_queries_count_against_the_request():
+    response = make_app().test_client().get('/fan-out')
+    assert response.headers['X-DB-Queries'] == '2'
+
+
+def test_tracked_builder_passes_through_postgrest_params():
+    stats = query_stats.RequestQueryStats()
+    client = query_stats.TrackedBackend(SyncPostgrestClient('http://localhost/rest/v1'), stats)
+    query = client.from_('tasks_mind').select('*').eq('user_id', 'u1')
+    query = apply_keyset(query, 'created_at', cursor=encode_cursor('2025-01-01', 'x'), limit=5)
+    assert 'or=' in str(query.params) and 'limit=5' in str(query.params)
+    assert query._shape == 'tasks_mind select(*) eq(user_id) order(created_at.desc.nullslast,id) limit'
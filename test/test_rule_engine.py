@@ -0,0 +1,129 @@
+"""
+Tests for the compiled bot rule engine
+Run with: python -m pytest test/test_rule_engine.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from lib.rule_engine import RuleSet, compile_condition
+from services.bot_rule_service import (
+    create_bot_rule,
+    delete_bot_rule,
+    evaluate_bot_rules,
+    get_all_bot_rules,
+    get_rule_engine_stats,
+    update_bot_rule
+)
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def from_(self, table):
+        self.calls += 1
+        return super().from_(table)
+
+
+def setup_function():
+    global backend  # noqa: PLW0603
+    backend = CountingBackend()
+    backend.seed('bot_rules', [
+        {'id': 'streak', 'name': 'Streak', 'priority': 5, 'active': True,
+         'condition': {'event': 'task_completed', 'streak': {'gte': 7}}, 'action': {'type': 'award'}},
+        {'id': 'mind', 'name': 'Mind', 'priority': 10, 'active': True,
+         'condition': {'event': ['task_completed', 'failure_recorded'], 'category': 'mind'}, 'action': {}},
+        {'id': 'any', 'name': 'Any event', 'priority': 1, 'active': True, 'condition': {}, 'action': {}},
+        {'id': 'off', 'name': 'Inactive', 'priority': 99, 'active': False, 'condition': {}, 'action': {}},
+        {'id': 'morning', 'name': 'Morning', 'priority': 3, 'active': True,
+         'condition': {'time': '08:00', 'days': ['monday', 'friday']}, 'action': {}},
+    ])
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def ids(rules):
+    return [rule['id'] for rule in rules]
+
+
+def test_condition_operators():
+    predicate = compile_condition({
+        'score': {'gt': 3, 'lte': 10},
+        'tags': {'contains': 'focus'},
+        'task.category': ['mind', 'body'],
+        'deleted': {'exists': False},
+        'any': [{'mood': 'good'}, {'energy': {'gte': 5}}],
+        'not': {'source': 'bot'},
+    })
+    event = {'score': 5, 'tags': ['focus'], 'task': {'category': 'mind'}, 'energy': 6, 'source': 'user'}
+    assert predicate(event)
+    assert not predicate(dict(event, score=11))
+    assert not predicate(dict(event, score='5'))
+    assert not predicate(dict(event, deleted=True))
+    assert not predicate(dict(event, energy=1))
+    assert not predicate({k: v for k, v in event.items() if k != 'task'})
+
+    for bad in ({'x': {'between': [1, 2]}}, {'x': {'in': 3}}, {'any': {}}, []):
+        try:
+            compile_condition(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {bad!r}")
+
+
+def test_rule_set_only_tests_relevant_rules_in_priority_order():
+    rules = [
+        {'id': 'a', 'priority': 1, 'condition': {'event': 'chat_message'}},
+        {'id': 'b', 'priority': 9, 'condition': {'mood': 'sad'}},
+        {'id': 'c', 'priority': 5, 'condition': {'event': 'chat_message', 'mood': 'sad'}},
+        {'id': 'd', 'priority': 7, 'condition': {'event': 'task_completed'}},
+        {'id': 'e', 'priority': 2, 'condition': {'x': {'nope': 1}}},
+        {'id': 'u', 'priority': 0, 'user_id': 'u2', 'condition': {'event': 'chat_message'}},
+    ]
+    rule_set = RuleSet(rules)
+    event = {'type': 'chat_message', 'mood': 'sad', 'user_id': 'u1'}
+
+    assert ids(rule_set.match(event)) == ['b', 'c', 'a']
+    assert ids(rule_set.match(event, limit=1)) == ['b']
+    assert sum(len(bucket) for bucket in rule_set.candidates({'type': 'chat_message'})) == 1
+    assert rule_set.invalid == ['e']
+    assert ids(rule_set.match(dict(event, user_id='u2'))) == ['b', 'c', 'a', 'u']
+
+
+def test_service_evaluates_loaded_rules_once():
+    assert ids(evaluate_bot_rules({'type': 'task_completed', 'category': 'mind', 'streak': 8})) == \
+        ['mind', 'streak', 'any']
+    assert ids(evaluate_bot_rules({'type': 'schedule', 'time': '08:00', 'day': 'friday'})) == ['morning', 'any']
+    assert ids(get_all_bot_rules(active_only=True, fields='id')) == ['mind', 'streak', 'morning', 'any']
+    assert backend.calls == 1
+
+
+def test_rule_writes_rebuild_the_engine():
+    evaluate_bot_rules({'type': 'chat_message'})
+    loads = get_rule_engine_stats()['loads']
+
+    create_bot_rule({'id': 'chat', 'name': 'Chat', 'priority': 50, 'active': True,
+                     'condition': {'event': 'chat_message'}, 'action': {}})
+    assert ids(evaluate_bot_rules({'type': 'chat_message'})) == ['chat', 'any']
+    update_bot_rule('chat', {'active': False})
+    assert ids(evaluate_bot_rules({'type': 'chat_message'})) == ['any']
+    delete_bot_rule('any')
+    assert evaluate_bot_rules({'type': 'chat_message'}) == []
+    assert get_rule_engine_stats()['loads'] - loads == 3
+
+    try:
+        create_bot_rule({'name': 'Bad', 'condition': {'x': {'between': 1}}, 'action': {}})
+    except ValueError:
+        assert len(backend.rows('bot_rules')) == 5
+    else:
+        raise AssertionError("expected ValueError")
@@ -0,0 +1,29 @@
+"""
+Tests for the application factory and startup report
+Run with: python -m pytest test/test_startup.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import BLUEPRINTS, create_app
+from lib.startup_report import format_report, measure
+
+
+def test_factory_registers_every_blueprint_without_swagger():
+    app = create_app({'SWAGGER_ENABLED': False, 'TESTING': True})
+    assert len(app.blueprints) == len(BLUEPRINTS)
+    assert 'flasgger' not in app.blueprints
+    assert app.config['STARTUP_TIME_MS'] > 0
+    assert app.test_client().get('/api/profile/').status_code == 401
+
+
+def test_boot_does_not_import_heavy_modules():
+    report = measure({'SWAGGER_ENABLED': 'false'})
+    assert report['loaded'] == []
+    assert report['boot_ms'] > 0
+    assert any(row['module'] == 'app' for row in report['imports'])
+    assert 'Heavy modules loaded at boot' in format_report(report, top=3)
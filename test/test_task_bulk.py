@@ -0,0 +1,141 @@
+"""
+Tests for bulk task creation and completion
+Run with: python -m pytest test/test_task_bulk.py
+"""
+
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from postgrest.exceptions import APIError
+
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from services.body_task_service import create_body_tasks
+from services.task_bulk_service import MAX_BULK_TASKS, complete_tasks_bulk, create_tasks_bulk
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.tables = []
+
+    def from_(self, table):
+        self.tables.append(table)
+        return super().from_(table)
+
+
+def setup_function():
+    global backend  # noqa: PLW0603
+    backend = CountingBackend()
+    backend.seed('task_templates', [
+        {'id': f'tpl-{i}', 'key': f'run_{i}', 'name': f'Run {i}', 'category': 'body', 'reward_xp': 10 * (i % 2 + 1)}
+        for i in range(20)
+    ])
+    backend.seed('task_templates', [{'id': 'tpl-mind', 'key': 'read', 'reward_xp': 15}])
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_onboarding_batch_uses_constant_roundtrips():
+    items = [{'template_key': f'run_{i}', 'created_by': 'bot', 'scheduled_at': f'2025-01-{i + 1:02d}'}
+             for i in range(20)]
+    results = create_tasks_bulk(items, 'u1', create_body_tasks)
+
+    assert [r['status'] for r in results] == [201] * 20
+    assert [r['task']['template_id'] for r in results] == [f'tpl-{i}' for i in range(20)]
+    assert all(r['task']['user_id'] == 'u1' for r in results)
+    assert backend.tables.count('tasks_body') == 1
+    assert backend.tables.count('task_templates') == 1
+
+
+def test_per_item_errors_do_not_block_valid_items():
+    items = [
+        {'template_id': 'tpl-1', 'created_by': 'user'},
+        {'template_id': 'missing', 'created_by': 'user'},
+        {'template_key': 'run_2'},
+        {'template_key': 'run_3', 'created_by': 'user', 'status': 'bogus'},
+        {'template_key': 'run_4', 'created_by': 'user', 'user_id': 'someone-else'},
+    ]
+    results = create_tasks_bulk(items, 'u1', create_body_tasks)
+
+    assert [r['status'] for r in results] == [201, 404, 400, 400, 201]
+    assert results[4]['task']['user_id'] == 'u1'
+    assert len(backend.rows('tasks_body')) == 2
+
+
+def test_non_string_template_references_are_per_item_errors():
+    items = [
+        {'template_id': ['tpl-1'], 'created_by': 'user'},
+        {'template_key': {'key': 'run_2'}, 'created_by': 'user'},
+        {'template_key': 'run_3', 'created_by': 'user'},
+    ]
+    results = create_tasks_bulk(items, 'u1', create_body_tasks)
+    assert [r['status'] for r in results] == [400, 400, 201]
+    assert results[0]['error'] == 'template_id must be a string'
+
+
+def test_refused_insert_is_reported_per_item():
+    def insert(rows):
+        # PostgREST refuses the whole insert when one row violates a constraint
+        if any(row.get('scheduled_at') == 'not a date' for row in rows):
+            raise APIError({'code': '22007', 'message': 'invalid input syntax for type timestamp'})
+        return create_body_tasks(rows)
+
+    items = [{'template_key': f'run_{i}', 'created_by': 'user', 'scheduled_at': '2025-01-01'} for i in range(3)]
+    items[1]['scheduled_at'] = 'not a date'
+    results = create_tasks_bulk(items, 'u1', insert)
+
+    assert [r['status'] for r in results] == [201, 400, 201]
+    assert 'invalid input syntax' in results[1]['error']
+    assert len(backend.rows('tasks_body')) == 2
+
+
+def test_unreachable_database_fails_the_items_without_retries():
+    calls = []
+
+    def insert(rows):
+        calls.append(len(rows))
+        raise ConnectionError('connection refused')
+
+    items = [{'template_key': f'run_{i}', 'created_by': 'user'} for i in range(3)]
+    results = create_tasks_bulk(items, 'u1', insert)
+    assert [r['status'] for r in results] == [500] * 3 and calls == [3]
+
+
+def test_rejects_non_lists_and_oversized_batches():
+    for items in ({'template_id': 'tpl-1'}, [], [{}] * (MAX_BULK_TASKS + 1)):
+        try:
+            create_tasks_bulk(items, 'u1', create_body_tasks)
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {items!r:.40}")
+
+
+def test_complete_mixed_batch_awards_template_xp():
+    backend.seed('tasks_body', [
+        {'id': f'b{i}', 'user_id': 'u1', 'template_id': f'tpl-{i}', 'status': 'pending'} for i in range(6)
+    ])
+    backend.seed('tasks_mind', [
+        {'id': 'm0', 'user_id': 'u1', 'template_id': 'tpl-mind', 'status': 'pending'},
+        {'id': 'm1', 'user_id': 'u1', 'template_id': 'tpl-mind', 'status': 'completed'},
+        {'id': 'm2', 'user_id': 'other', 'template_id': 'tpl-mind', 'status': 'pending'},
+    ])
+    backend.tables.clear()
+
+    result = complete_tasks_bulk('u1', ['m0', 'm1', 'm2'], [f'b{i}' for i in range(6)])
+
+    assert sorted(row['id'] for row in result['completed']) == ['b0', 'b1', 'b2', 'b3', 'b4', 'b5', 'm0']
+    assert result['total_xp'] == 15 + 3 * 10 + 3 * 20
+    assert {(s['id'], s['reason']) for s in result['skipped']} == {('m1', 'already_completed'), ('m2', 'not_found')}
+    assert backend.rows('tasks_mind')[2]['status'] == 'pending'
+    # One read per task type plus one update per (type, reward) group.
+    assert len(backend.tables) == 2 + 3
+
+    again = complete_tasks_bulk('u1', [], ['b0'])
+    assert again['completed'] == [] and again['total_xp'] == 0
@@ -0,0 +1,96 @@
+"""
+Tests for the task template read-through cache
+Run with: python -m pytest test/test_template_cache.py
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.cache import SnapshotCache
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from services.task_template_service import (
+    create_task_template,
+    delete_task_template,
+    get_all_task_templates,
+    get_task_template_by_id,
+    get_task_template_by_key,
+    get_task_templates_by_keys,
+    get_template_cache_stats,
+    get_templates_by_category,
+    update_task_template
+)
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def from_(self, table):
+        self.calls += 1
+        return super().from_(table)
+
+
+def setup_function():
+    global backend  # noqa: PLW0603
+    backend = CountingBackend()
+    backend.seed('task_templates', [
+        {'id': 'tpl-1', 'key': 'meditate', 'name': 'Meditate', 'category': 'mind', 'reward_xp': 20},
+        {'id': 'tpl-2', 'key': 'run', 'name': 'Run', 'category': 'body', 'reward_xp': 30},
+    ])
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_warm_reads_do_not_query():
+    before = get_template_cache_stats()
+    assert get_task_template_by_key('run')['id'] == 'tpl-2'
+    assert get_task_template_by_id('tpl-1')['key'] == 'meditate'
+    assert [t['id'] for t in get_templates_by_category('body')] == ['tpl-2']
+    assert get_all_task_templates(fields='id,key') == [{'id': 'tpl-1', 'key': 'meditate'}, {'id': 'tpl-2', 'key': 'run'}]
+    assert [t['id'] for t in get_task_templates_by_keys(['run', 'missing', 'meditate'])] == ['tpl-2', 'tpl-1']
+    assert get_task_template_by_key('missing') is None
+    assert backend.calls == 1
+    stats = get_template_cache_stats()
+    assert stats['loads'] - before['loads'] == 1
+    assert stats['hits'] - before['hits'] == 5
+    assert stats['size'] == 2
+
+
+def test_writes_update_the_cache_in_place():
+    get_all_task_templates()
+    create_task_template({'id': 'tpl-3', 'key': 'read', 'category': 'mind'})
+    update_task_template('tpl-1', {'category': 'body'})
+    delete_task_template('tpl-2')
+    calls = backend.calls
+
+    assert [t['id'] for t in get_templates_by_category('body')] == ['tpl-1']
+    assert [t['id'] for t in get_templates_by_category('mind')] == ['tpl-3']
+    assert get_task_template_by_key('run') is None
+    assert backend.calls == calls
+
+
+def test_returned_rows_are_copies():
+    get_task_template_by_id('tpl-1')['name'] = 'changed'
+    assert get_task_template_by_id('tpl-1')['name'] == 'Meditate'
+
+
+def test_ttl_and_disabled_cache():
+    loads = []
+    cache = SnapshotCache('ttl_test', lambda: loads.append(1) or [{'id': 1}], ttl=0.05)
+    cache.all()
+    cache.all()
+    time.sleep(0.06)
+    cache.all()
+    assert len(loads) == 2
+
+    disabled = SnapshotCache('disabled_test', lambda: [{'id': 1}], ttl=0)
+    assert disabled.all() is None and disabled.find('id', 1) is None
@@ -0,0 +1,95 @@
+"""
+Tests for concurrent execution of the tool calls of one agent turn
+Run with: python -m pytest test/test_tool_calls.py
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from lib.agent import AIAgent
+
+PARAMS = {'type': 'object', 'properties': {}}
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('TOOL_CALL_CONCURRENCY', '4')
+    agent = AIAgent(name='ToolAgent')
+    agent.spans = []
+    lock = threading.Lock()
+
+    def recorder(name, delay):
+        def func(**kwargs):
+            start = time.perf_counter()
+            time.sleep(delay)
+            with lock:
+                agent.spans.append((name, start, time.perf_counter()))
+            return {'name': name, **kwargs}
+        return func
+
+    for name in ('get_user_tasks', 'get_user_stats', 'get_task_templates'):
+        agent.register_function(name, name, PARAMS)(recorder(name, 0.1))
+    agent.register_function('create_mind_task', 'write', PARAMS, serial=True)(recorder('create_mind_task', 0.05))
+    agent.register_function('slow_report', 'slow', PARAMS, timeout=0.05)(recorder('slow_report', 0.3))
+    return agent
+
+
+def call(name, arguments='{}', call_id=None):
+    return SimpleNamespace(id=call_id or f'call_{name}', function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def test_independent_calls_run_concurrently_in_order(agent):
+    calls = [call('get_user_tasks', '{"user_id": "u1"}'), call('get_user_stats'), call('get_task_templates')]
+    start = time.perf_counter()
+    results = asyncio.run(agent.process_tool_calls_async(calls))
+    assert time.perf_counter() - start < 0.25
+    assert [r['tool_call_id'] for r in results] == ['call_get_user_tasks', 'call_get_user_stats', 'call_get_task_templates']
+    assert results[0]['result'] == {'success': True, 'result': {'name': 'get_user_tasks', 'user_id': 'u1'}}
+
+
+def test_serial_calls_never_overlap(agent):
+    calls = [call('get_user_tasks'), call('create_mind_task'), call('get_user_stats'), call('get_task_templates')]
+    results = asyncio.run(agent.process_tool_calls_async(calls))
+    assert [r['function_name'] for r in results] == [c.function.name for c in calls]
+
+    spans = {name: (start, end) for name, start, end in agent.spans}
+    write_start, write_end = spans['create_mind_task']
+    assert spans['get_user_tasks'][1] <= write_start
+    assert write_end <= spans['get_user_stats'][0] and write_end <= spans['get_task_templates'][0]
+    # the two reads after the write still overlap each other
+    assert spans['get_user_stats'][0] < spans['get_task_templates'][1]
+
+
+def test_concurrency_is_bounded(agent):
+    agent.tool_concurrency = 2
+    start = time.perf_counter()
+    asyncio.run(agent.process_tool_calls_async([call('get_user_stats', call_id=str(i)) for i in range(4)]))
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_timeouts_and_bad_arguments_become_error_results(agent):
+    before = agent.get_stats()['function_timeouts']
+    results = agent.process_tool_calls([call('slow_report'), call('get_user_stats', '{not json'), call('get_user_tasks')])
+    assert results[0]['result'] == {'success': False, 'error': "Function 'slow_report' timed out after 0.05s"}
+    assert results[1]['result']['success'] is False and 'Invalid arguments' in results[1]['result']['error']
+    assert results[2]['result']['success'] is True
+    assert agent.get_stats()['function_timeouts'] == before + 1
+
+
+def test_write_tools_register_as_serial(agent):
+    from tools import CreateBodyTaskTool, CreateMindTaskTool, GetUserStatsTool, ToolRegistry
+
+    ToolRegistry(agent).register_tools([CreateMindTaskTool(), CreateBodyTaskTool(), GetUserStatsTool()])
+    options = agent.function_registry.get_options
+    assert options('create_mind_task')['serial'] and options('create_body_task')['serial']
+    assert not options('get_user_stats')['serial']
@@ -0,0 +1,186 @@
+"""
+Tests for the write-behind buffer used for task logs
+Run with: python -m pytest test/test_write_buffer.py
+"""
+
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from postgrest.exceptions import APIError
+
+from lib.db import set_backend
+from lib.memory_db import InMemoryBackend
+from lib.write_buffer import WriteBehindBuffer
+
+
+def setup_function():
+    global backend  # noqa: PLW0603
+    backend = InMemoryBackend()
+    set_backend(backend)
+
+
+def teardown_function():
+    set_backend(None)
+
+
+def test_flushes_by_size_and_on_close(tmp_path):
+    buffer = WriteBehindBuffer('task_logs', str(tmp_path), flush_size=5, flush_interval=60,
+                               timestamp_column='timestamp')
+    rows = [buffer.add({'action': 'started', 'n': i}) for i in range(7)]
+    assert all(row['id'] and row['timestamp'] for row in rows)
+
+    deadline = time.time() + 2
+    while len(backend.rows('task_logs')) < 5 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(backend.rows('task_logs')) >= 5
+
+    buffer.close()
+    assert [row['n'] for row in backend.rows('task_logs')] == list(range(7))
+    assert not os.path.exists(buffer.spill_path)
+
+
+def test_failed_flush_keeps_rows_spilled(tmp_path):
+    buffer = WriteBehindBuffer('task_logs', str(tmp_path), flush_size=100, flush_interval=60)
+    buffer.add({'action': 'started'})
+    set_backend(None)
+    os.environ['DB_BACKEND'] = 'invalid'
+    try:
+        assert buffer.flush() == 0
+    finally:
+        os.environ.pop('DB_BACKEND')
+        set_backend(backend)
+    assert buffer.pending() == 1
+    with open(buffer.spill_path) as spill:
+        assert json.loads(spill.readline())['action'] == 'started'
+    buffer.close()
+    assert len(backend.rows('task_logs')) == 1
+
+
+def test_orphaned_spill_file_is_recovered_without_duplicates(tmp_path):
+    # A worker that died (pid 999999999 is never alive) after inserting one of its rows.
+    backend.seed('task_logs', [{'id': 'log-1', 'action': 'started'}])
+    with open(tmp_path / 'task_logs-999999999.jsonl', 'w') as spill:
+        spill.write(json.dumps({'id': 'log-1', 'action': 'started'}) + '\n')
+        spill.write(json.dumps({'id': 'log-2', 'action': 'completed'}) + '\n')
+
+    buffer = WriteBehindBuffer('task_logs', str(tmp_path), flush_size=100, flush_interval=60)
+    assert buffer.get_stats()['recovered'] == 2
+    buffer.close()
+
+    assert sorted(row['id'] for row in backend.rows('task_logs')) == ['log-1', 'log-2']
+    assert os.listdir(tmp_path) == []
+
+
+class RejectingBuffer(WriteBehindBuffer):
+    """Refuses inserts containing a 'bad' row, as PostgREST does on a foreign key violation."""
+
+    def _insert(self, rows):
+        if any(row.get('action') == 'bad' for row in rows):
+            raise APIError({'code': '23503', 'message': 'violates foreign key constraint'})
+        super()._insert(rows)
+
+
+def test_refused_rows_are_dead_lettered_and_the_rest_written(tmp_path):
+    buffer = RejectingBuffer('task_logs', str(tmp_path), flush_size=100, flush_interval=60)
+    for i in range(6):
+        buffer.add({'action': 'bad' if i == 3 else 'started', 'n': i})
+    buffer.add({'action': 'started', 'notes': 'other columns'})
+
+    assert buffer.flush() == 6
+    assert sorted(row.get('n', -1) for row in backend.rows('task_logs')) == [-1, 0, 1, 2, 4, 5]
+    assert buffer.pending() == 0 and buffer.get_stats()['dead_lettered'] == 1
+    with open(buffer.dead_letter_path) as dead_letter:
+        entry = json.loads(dead_letter.readline())
+    assert entry['row']['n'] == 3 and 'foreign key' in entry['error']
+    buffer.close()
+
+
+def test_rows_with_different_columns_go_in_separate_inserts(tmp_path):
+    inserts = []
+
+    class RecordingBuffer(WriteBehindBuffer):
+        def _insert(self, rows):
+            assert len({frozenset(row) for row in rows}) == 1
+            inserts.append(len(rows))
+            super()._insert(rows)
+
+    buffer = RecordingBuffer('task_logs', str(tmp_path), flush_size=100, flush_interval=60)
+    buffer.add({'action': 'started'})
+    buffer.add({'action': 'completed', 'notes': 'done'})
+    buffer.add({'action': 'started'})
+    assert buffer.flush() == 3
+    assert sorted(inserts) == [1, 2]
+    buffer.close()
+
+
+def test_orphaned_spill_file_is_recovered_on_a_later_flush(tmp_path):
+    buffer = WriteBehindBuffer('task_logs', str(tmp_path), flush_size=100, flush_interval=60)
+    with open(tmp_path / 'task_logs-999999999.jsonl', 'w') as spill:
+        spill.write(json.dumps({'id': 'log-9', 'action': 'started'}) + '\n')
+    assert buffer.flush() == 1
+    assert [row['id'] for row in backend.rows('task_logs')] == ['log-9']
+    buffer.close()
+
+
+def test_queued_logs_keep_only_known_columns(tmp_path, monkeypatch):
+    from services import task_log_service
+
+    buffer = WriteBehindBuffer('task_logs', str(tmp_path), flush_size=100, flush_interval=60)
+    monkeypatch.setattr(task_log_service, '_task_log_buffer', lambda: buffer)
+    row = task_log_service.enqueue_task_log({'id': 'someone-elses-log', 'user_id': 'u1', 'task_table': 'tasks_mind',
+                                             'task_id': 't1', 'action': 'completed', 'mood': 'great'})
+    assert row['id'] != 'someone-elses-log' and 'mood' not in row
+    buffer.close()
+
+
+def test_torn_spill_line_is_dead_lettered_and_the_rest_recovered(tmp_path):
+    with open(tmp_path / 'task_logs-999999999.jsonl', 'w') as spill:
+        spill.write(json.dumps({'id': 'log-1', 'action': 'started'}) + '\n')
+        spill.write('{"id": "log-2", "us')  # the worker died mid-write
+
+    buffer = WriteBehindBuffer('task_logs', str(tmp_path), flush_size=100, flush_interval=60)
+    stats = buffer.get_stats()
+    assert (stats['recovered'], stats['dead_lettered']) == (1, 1)
+    with open(buffer.dead_letter_path) as dead_letter:
+        assert json.loads(dead_letter.readline())['line'] == '{"id": "log-2", "us'
+    buffer.close()
+    assert [row['id'] for row in backend.rows('task_logs')] == ['log-1']
+    assert os.listdir(tmp_path) == ['task_logs.dead-letter.jsonl']
+
+
+def test_file_claimed_by_a_dead_process_is_recovered(tmp_path):
+    with open(tmp_path / 'task_logs-999999998.jsonl.claimed-999999999', 'w') as spill:
+        spill.write(json.dumps({'id': 'log-1', 'action': 'started'}) + '\n')
+
+    buffer = WriteBehindBuffer('task_logs', str(tmp_path), flush_size=100, flush_interval=60)
+    buffer.close()
+    assert [row['id'] for row in backend.rows('task_logs')] == ['log-1']
+    assert os.listdir(tmp_path) == []
+
+
+def test_flusher_survives_errors_and_is_restarted(tmp_path, monkeypatch):
+    buffer = WriteBehindBuffer('task_logs', str(tmp_path), flush_size=1, flush_interval=0.05)
+
+    def broken_recover(include_own=False):
+        raise OSError('spill directory unavailable')
+
+    monkeypatch.setattr(buffer, '_recover', broken_recover)
+    buffer.add({'action': 'started'})
+    deadline = time.time() + 2
+    while buffer.get_stats()['errors'] < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert buffer.get_stats()['errors'] >= 2 and buffer._thread.is_alive()
+    monkeypatch.undo()
+
+    # A flusher that is gone anyway (stopped here) is started again by the next add()
+    buffer.close()
+    buffer._stopped = False
+    buffer.add({'action': 'completed'})
+    assert buffer._thread.is_alive()
+    buffer.close()
+    assert len(backend.rows('task_logs')) == 2
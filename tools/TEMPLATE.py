@@ -17,6 +17,13 @@ class YourToolNameHere(BaseTool):
     This tool allows the agent to... [explain the capability]
     """
     
+    # Set to True if the tool writes (creates/updates rows): the agent then
+    # runs it on its own instead of concurrently with other tool calls
+    serial = False
+    
+    # Optional: seconds a call may take (None uses TOOL_CALL_TIMEOUT)
+    # timeout = 10
+    
     @property
     def name(self) -> str:
         """
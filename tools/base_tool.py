@@ -17,6 +17,13 @@ class BaseTool(ABC):
     Each tool should inherit from this class and implement the required methods
     """
     
+    # Tools that write (create or update rows) set this to True: the agent
+    # then never runs them concurrently with other tool calls of the turn
+    serial: bool = False
+    
+    # Seconds a single call may take (None: the agent's TOOL_CALL_TIMEOUT)
+    timeout: Optional[float] = None
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -122,7 +129,9 @@ class ToolRegistry:
             self.agent.register_function(
                 name=tool.name,
                 description=tool.description,
-                parameters=tool.parameters
+                parameters=tool.parameters,
+                serial=tool.serial,
+                timeout=tool.timeout
             )(tool_wrapper)
             
             # Store in registry
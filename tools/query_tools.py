@@ -6,6 +6,7 @@ Tools for retrieving information about tasks, stats, etc.
 import logging
 from typing import Dict, Any
 from .base_tool import BaseTool
+from lib.fanout import fan_out
 from services.mind_task_service import get_user_mind_tasks
 from services.body_task_service import get_user_body_tasks
 from services.profile_service import get_profile_by_user_id
@@ -69,21 +70,17 @@ This helps you provide personalized recommendations based on what they already h
             # Convert status filter
             status_filter = None if status == 'all' else status
             
+            # Get mind and/or body tasks (fetched concurrently)
+            mind_tasks, body_tasks = fan_out(
+                lambda: get_user_mind_tasks(user_id, status_filter) if task_type in ['mind', 'both'] else [],
+                lambda: get_user_body_tasks(user_id, status_filter) if task_type in ['body', 'both'] else []
+            )
+            
             tasks = {
-                "mind_tasks": [],
-                "body_tasks": []
+                "mind_tasks": mind_tasks or [],
+                "body_tasks": body_tasks or []
             }
             
-            # Get mind tasks
-            if task_type in ['mind', 'both']:
-                mind_tasks = get_user_mind_tasks(user_id, status_filter)
-                tasks["mind_tasks"] = mind_tasks or []
-            
-            # Get body tasks
-            if task_type in ['body', 'both']:
-                body_tasks = get_user_body_tasks(user_id, status_filter)
-                tasks["body_tasks"] = body_tasks or []
-            
             total_tasks = len(tasks["mind_tasks"]) + len(tasks["body_tasks"])
             
             # Build a friendly summary
@@ -151,14 +148,12 @@ This provides insights into their productivity and wellness journey."""
         try:
             user_id = kwargs.get('user_id')
             
-            # Get profile data
-            profile = get_profile_by_user_id(user_id)
-            
-            # Get latest snapshot
-            latest_snapshot = get_latest_snapshot(user_id)
-            
-            # Get stats summary (last 30 days)
-            stats_summary = get_stats_summary(user_id, days=30)
+            # Profile, latest snapshot and 30-day summary are independent reads
+            profile, latest_snapshot, stats_summary = fan_out(
+                (get_profile_by_user_id, user_id),
+                (get_latest_snapshot, user_id),
+                lambda: get_stats_summary(user_id, days=30)
+            )
             
             if not profile:
                 return {
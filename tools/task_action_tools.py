@@ -23,6 +23,9 @@ logger = logging.getLogger(__name__)
 class CompleteTaskTool(BaseTool):
     """Tool for marking tasks as completed"""
     
+    # Writes to the database: never run alongside other tool calls
+    serial = True
+    
     @property
     def name(self) -> str:
         return "complete_task"
@@ -128,6 +131,9 @@ use get_user_tasks first to find the task."""
 class UpdateTaskTool(BaseTool):
     """Tool for updating task details"""
     
+    # Writes to the database: never run alongside other tool calls
+    serial = True
+    
     @property
     def name(self) -> str:
         return "update_task"
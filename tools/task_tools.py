@@ -16,6 +16,9 @@ logger = logging.getLogger(__name__)
 class CreateMindTaskTool(BaseTool):
     """Tool for creating mental/cognitive tasks"""
     
+    # Writes to the database: never run alongside other tool calls
+    serial = True
+    
     @property
     def name(self) -> str:
         return "create_mind_task"
@@ -168,6 +171,9 @@ The task will be automatically added to the user's mind tasks list."""
 class CreateBodyTaskTool(BaseTool):
     """Tool for creating physical/body tasks"""
     
+    # Writes to the database: never run alongside other tool calls
+    serial = True
+    
     @property
     def name(self) -> str:
         return "create_body_task"